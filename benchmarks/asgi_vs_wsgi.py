@@ -0,0 +1,95 @@
+""" Benchmark quote throughput of the WSGI (DRF) and native ASGI quote paths
+
+Run from the project folder:
+    python benchmarks/asgi_vs_wsgi.py --donuts 1000 --cart-size 20 --concurrency 1,10,100,1000
+
+Requests are driven in process through Django's test handlers against a throwaway
+test database, so no server needs to be started. WSGI requests run on a thread pool
+of `concurrency` threads, ASGI requests are `concurrency` coroutines on one event loop.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dronut.settings')
+
+import django  # pylint: disable=wrong-import-position
+
+django.setup()
+
+# pylint: disable=wrong-import-position
+from django.test import AsyncClient, Client
+from django.urls import reverse
+from benchmarks.synthetic import donut_code, seed_donuts, throwaway_database
+
+
+def build_cart(donut_count, cart_size):
+    """ Build a quote request body of `cart_size` lines"""
+    return {'donuts': [{'donut_code': donut_code(line * 7919 % donut_count),
+                        'quantity': line % 12 + 1} for line in range(cart_size)]}
+
+
+def run_wsgi(body, requests, concurrency):
+    """ Send `requests` quotes to the DRF view from `concurrency` threads, returns seconds"""
+    url = reverse('dronut_app:donuts-quotes')
+
+    def worker(count):
+        client = Client()
+        for _ in range(count):
+            client.post(url, data=body, content_type='application/json')
+
+    shares = [requests // concurrency + (index < requests % concurrency)
+              for index in range(concurrency)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(worker, shares))
+    return time.perf_counter() - started
+
+
+def run_asgi(body, requests, concurrency):
+    """ Send `requests` quotes to the async view from `concurrency` coroutines, returns seconds"""
+    url = reverse('dronut_app:donuts-quotes-async')
+
+    async def drive():
+        client = AsyncClient()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def send():
+            async with semaphore:
+                await client.post(url, data=body, content_type='application/json')
+
+        await asyncio.gather(*(send() for _ in range(requests)))
+
+    started = time.perf_counter()
+    asyncio.run(drive())
+    return time.perf_counter() - started
+
+
+def main():
+    """ Run the benchmark and print one JSON result per line"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--donuts', type=int, default=1000)
+    parser.add_argument('--cart-size', type=int, default=20)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', default='1,10,100,1000')
+    args = parser.parse_args()
+
+    with throwaway_database():
+        seed_donuts(args.donuts)
+        body = json.dumps(build_cart(args.donuts, args.cart_size))
+        for concurrency in (int(value) for value in args.concurrency.split(',')):
+            for mode, runner in (('wsgi', run_wsgi), ('asgi', run_asgi)):
+                elapsed = runner(body, args.requests, concurrency)
+                print(json.dumps({'mode': mode, 'concurrency': concurrency,
+                                  'requests': args.requests, 'cart_size': args.cart_size,
+                                  'seconds': round(elapsed, 3),
+                                  'requests_per_second': round(args.requests / elapsed, 1)}))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+""" Benchmark list encoding throughput of DonutSerializer and the lean row encoder
+
+Run from the project folder:
+    python benchmarks/lean_reads.py --donuts 10000 --page-size 1000
+
+Both paths read the same page from a throwaway test database and produce the
+same JSON bytes; the result lines report rows/s for each.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dronut.settings')
+
+import django  # pylint: disable=wrong-import-position
+
+django.setup()
+
+# pylint: disable=wrong-import-position
+from rest_framework.renderers import JSONRenderer
+from benchmarks.synthetic import seed_donuts, throwaway_database
+from dronut_app.encoders import get_donut_row_encoder
+from dronut_app.models import Donuts
+from dronut_app.serializers import DonutSerializer
+
+
+def serializer_page(page_size):
+    """ Encode a page the way ModelViewSet.list does"""
+    queryset = Donuts.objects.order_by('donut_code')[:page_size]
+    return JSONRenderer().render(DonutSerializer(queryset, many=True).data)
+
+
+def lean_page(page_size):
+    """ Encode a page from named values rows with the row encoder"""
+    row_encoder = get_donut_row_encoder()
+    rows = Donuts.objects.order_by('donut_code').values_list(*row_encoder.fields,
+                                                             named=True)[:page_size]
+    return row_encoder.to_bytes(row_encoder.encode_rows(rows))
+
+
+def main():
+    """ Run the benchmark and print one JSON result per line"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--donuts', type=int, default=10000)
+    parser.add_argument('--page-size', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    with throwaway_database():
+        seed_donuts(args.donuts)
+        if serializer_page(args.page_size) != lean_page(args.page_size):
+            raise SystemExit('lean encoding differs from the serializer output')
+        for mode, encode_page in (('serializer', serializer_page), ('lean', lean_page)):
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                encode_page(args.page_size)
+            elapsed = time.perf_counter() - started
+            rows = args.repeat * min(args.page_size, args.donuts)
+            print(json.dumps({'mode': mode, 'page_size': args.page_size, 'rows': rows,
+                              'seconds': round(elapsed, 3),
+                              'rows_per_second': round(rows / elapsed)}))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,204 @@
+""" Load test the hot API routes against synthetic catalogs of configurable size
+
+Run from the project folder:
+    python benchmarks/load.py --sizes 1000,10000,100000 --output results.json
+    python benchmarks/load.py --sizes 1000,10000 --baseline results.json --tolerance 0.25
+
+For each catalog size the donuts are bulk inserted into a throwaway test database
+and every scenario is driven in process through Django's test client, so the whole
+middleware stack runs but no server is needed. Scenarios:
+    list_first        - first cursor page of the list
+    list_cursor_walk  - successive cursor pages following the `next` links
+    list_offset_deep  - the last page with limit/offset pagination
+    detail            - detail reads of spread out ids
+    search            - list filtered with `?q=` on a code prefix
+    fulltext          - list filtered with `?search=` on the words of a description
+    quotes_<lines>    - quotes of carts with <lines> lines, one scenario per cart size
+Each result records requests per second, p50/p99 latency in milliseconds and the
+database queries per request. With --baseline the run exits with status 1 when a
+result is slower than the baseline by more than the tolerance, or runs more queries.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dronut.settings')
+
+import django  # pylint: disable=wrong-import-position
+
+django.setup()
+
+# pylint: disable=wrong-import-position
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+from benchmarks.synthetic import donut_code, seed_donuts, throwaway_database
+from dronut_app.middleware import QueryTimer
+from dronut_app.models import Donuts
+
+PAGE_SIZE = 100
+
+
+def percentile(sorted_values, fraction):
+    """ Nearest rank percentile of an already sorted list"""
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def measure(name, catalog_size, requests, warmup):
+    """
+    Time `requests` calls of each request function, after `warmup` untimed calls.
+    `requests` is a list of callables returning a response
+    """
+    for send in requests[:warmup]:
+        send()
+    latencies = []
+    queries = []
+    started = time.perf_counter()
+    for send in requests[warmup:]:
+        timer = QueryTimer()
+        request_started = time.perf_counter()
+        with connection.execute_wrapper(timer):
+            response = send()
+        latencies.append(time.perf_counter() - request_started)
+        queries.append(timer.count)
+        if response.status_code != 200:
+            raise SystemExit(f'{name}: unexpected status {response.status_code}')
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'catalog_size': catalog_size,
+        'scenario': name,
+        'requests': len(latencies),
+        'requests_per_second': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'queries_per_request': round(sum(queries) / len(queries), 2),
+        'max_queries': max(queries),
+    }
+
+
+def spread_indexes(catalog_size, count):
+    """ `count` donut indexes spread over the whole catalog"""
+    return [index * 7919 % catalog_size for index in range(count)]
+
+
+def cursor_walk(client, count):
+    """ Request functions following the `next` links from the first page"""
+    state = {'url': f'{reverse("dronut_app:donuts-list")}?page_size={PAGE_SIZE}'}
+
+    def send():
+        response = client.get(state['url'])
+        state['url'] = response.json()['next'] or state['url']
+        return response
+    return [send] * count
+
+
+def build_scenarios(client, catalog_size, args):
+    """ Return (name, request functions) pairs of every scenario"""
+    count = args.warmup + args.requests
+    list_url = reverse('dronut_app:donuts-list')
+    quotes_url = reverse('dronut_app:donuts-quotes')
+    ids = Donuts.objects.order_by('donut_code').values_list('id', flat=True)
+    ids = [ids[index] for index in spread_indexes(catalog_size, min(count, catalog_size))]
+    scenarios = [
+        ('list_first', [lambda: client.get(list_url, {'page_size': PAGE_SIZE})] * count),
+        ('list_cursor_walk', cursor_walk(client, count)),
+        ('list_offset_deep', [lambda: client.get(list_url, {
+            'limit': PAGE_SIZE, 'offset': max(0, catalog_size - PAGE_SIZE)})] * count),
+        ('detail', [lambda donut_id=donut_id: client.get(
+            reverse('dronut_app:donuts-detail', args=[donut_id]))
+                    for donut_id in ids * (count // len(ids) + 1)][:count]),
+        ('search', [lambda prefix=donut_code(index)[:-1]: client.get(
+            list_url, {'q': prefix.lower(), 'page_size': PAGE_SIZE})
+                    for index in spread_indexes(catalog_size, count)]),
+        ('fulltext', [lambda text=f'number {index} sprinkles': client.get(
+            list_url, {'search': text, 'page_size': PAGE_SIZE})
+                      for index in spread_indexes(catalog_size, count)]),
+    ]
+    for cart_lines in args.cart_sizes:
+        # a different quantity per request so the quote cache never answers
+        bodies = [{'donuts': [{'donut_code': donut_code(index), 'quantity': request + 1}
+                              for index in spread_indexes(catalog_size, cart_lines)]}
+                  for request in range(count)]
+        scenarios.append((f'quotes_{cart_lines}', [
+            lambda body=body: client.post(quotes_url, data=body, content_type='application/json')
+            for body in bodies]))
+    return scenarios
+
+
+def find_regressions(results, baseline, tolerance):
+    """ Compare results with a baseline run, returns a list of regression messages"""
+    baseline = {(result['catalog_size'], result['scenario']): result
+                for result in baseline['results']}
+    regressions = []
+    for result in results:
+        key = (result['catalog_size'], result['scenario'])
+        if key not in baseline:
+            continue
+        before = baseline[key]
+        label = f'{result["scenario"]} at {result["catalog_size"]} donuts'
+        if result['requests_per_second'] < before['requests_per_second'] * (1 - tolerance):
+            regressions.append(f'{label}: {result["requests_per_second"]} req/s, '
+                               f'baseline {before["requests_per_second"]}')
+        for metric in ('p50_ms', 'p99_ms'):
+            if result[metric] > before[metric] * (1 + tolerance):
+                regressions.append(f'{label}: {metric} {result[metric]}, '
+                                   f'baseline {before[metric]}')
+        # query counts are deterministic, any increase is a regression
+        if result['max_queries'] > before['max_queries']:
+            regressions.append(f'{label}: {result["max_queries"]} queries, '
+                               f'baseline {before["max_queries"]}')
+    return regressions
+
+
+def int_list(value):
+    """ argparse type for a comma separated list of integers"""
+    return [int(item) for item in value.split(',')]
+
+
+def main():
+    """ Run the scenarios for every catalog size and report the results as JSON"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int_list, default=[1000, 10000, 100000])
+    parser.add_argument('--cart-sizes', type=int_list, default=[1, 100, 10000])
+    parser.add_argument('--requests', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--baseline', help='JSON results of an earlier run to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='allowed slowdown against the baseline, 0.2 is 20%%')
+    args = parser.parse_args()
+
+    results = []
+    with throwaway_database():
+        client = Client()
+        seeded = 0
+        for catalog_size in sorted(args.sizes):
+            seed_donuts(catalog_size, start=seeded)
+            seeded = catalog_size
+            for name, requests in build_scenarios(client, catalog_size, args):
+                result = measure(name, catalog_size, requests, args.warmup)
+                print(json.dumps(result))
+                results.append(result)
+
+    document = {'config': {'sizes': args.sizes, 'cart_sizes': args.cart_sizes,
+                           'requests': args.requests, 'warmup': args.warmup},
+                'results': results}
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            json.dump(document, output, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as baseline:
+            regressions = find_regressions(results, json.load(baseline), args.tolerance)
+        for regression in regressions:
+            print(f'REGRESSION {regression}', file=sys.stderr)
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
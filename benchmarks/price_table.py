@@ -0,0 +1,124 @@
+""" Benchmark the memory of per worker price catalogs against the shared price table
+
+Run from the project folder:
+    python benchmarks/price_table.py --size 100000 --workers 16
+
+A synthetic catalog is bulk inserted into a throwaway SQLite database file, then
+`--workers` processes are forked for each mode:
+    catalog - every worker loads its own PriceCatalog from the database
+    table   - every worker maps the price table file written once by the first one
+While all workers of a mode are alive each one reads the growth of its proportional
+set size (Pss, shared pages divided between the processes mapping them) and times
+price lookups. One JSON result line is printed per mode.
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dronut.settings')
+
+import django  # pylint: disable=wrong-import-position
+
+django.setup()
+
+# pylint: disable=wrong-import-position
+from django.db import connection
+from dronut_app.catalog import PriceCatalog
+from dronut_app.price_table import SharedPriceTable
+from benchmarks.synthetic import donut_code, seed_donuts, throwaway_database
+
+LOOKUPS = 10000
+
+
+def pss_kb():
+    """ Proportional set size of this process in kB"""
+    with open('/proc/self/smaps_rollup', encoding='utf-8') as smaps:
+        for line in smaps:
+            if line.startswith('Pss:'):
+                return int(line.split()[1])
+    return 0
+
+
+def load_catalog(mode, table_path):
+    """ Load the prices of `mode` in this worker, returns the price lookup object"""
+    if mode == 'catalog':
+        catalog = PriceCatalog()
+        catalog.refresh()
+        return catalog
+    catalog = SharedPriceTable(table_path)
+    # read every page of the mapping so it all counts in the Pss
+    hashlib.sha256(catalog.refresh().buffer).digest()
+    return catalog
+
+
+def run_worker(mode, table_path, codes, barrier, results):
+    """ Load the catalog, measure memory and lookups while every worker is alive"""
+    # the forked database connection belongs to the parent
+    connection.close()
+    before = pss_kb()
+    catalog = load_catalog(mode, table_path)
+    barrier.wait()
+    loaded = pss_kb()
+    started = time.perf_counter()
+    for code in codes:
+        catalog.lookup_units([code])
+    elapsed = time.perf_counter() - started
+    results.put({'pss_kb': loaded - before, 'lookup_us': elapsed / len(codes) * 1e6,
+                 'builds': getattr(catalog, 'builds', 0)})
+    barrier.wait()
+
+
+def run_mode(mode, size, workers, table_path):
+    """ Fork `workers` processes loading the catalog of `mode`, returns the JSON result"""
+    context = multiprocessing.get_context('fork')
+    barrier = context.Barrier(workers)
+    results = context.Queue()
+    codes = [donut_code(random.randrange(size)) for _ in range(LOOKUPS)]
+    processes = [context.Process(target=run_worker,
+                                 args=(mode, table_path, codes, barrier, results))
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+    measures = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    lookups = sorted(measure['lookup_us'] for measure in measures)
+    return {
+        'mode': mode,
+        'catalog_size': size,
+        'workers': workers,
+        'total_pss_mb': round(sum(measure['pss_kb'] for measure in measures) / 1024, 1),
+        'lookup_us_p50': round(lookups[len(lookups) // 2], 2),
+        'builds': sum(measure['builds'] for measure in measures),
+    }
+
+
+def main():
+    """ Compare the memory of both modes on one synthetic catalog"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=100000)
+    parser.add_argument('--workers', type=int, default=16)
+    args = parser.parse_args()
+    folder = tempfile.mkdtemp()
+    # a database file, so the forked workers can open their own connections
+    connection.settings_dict['TEST']['NAME'] = os.path.join(folder, 'benchmark.sqlite3')
+    with throwaway_database():
+        seed_donuts(args.size)
+        for mode in ('catalog', 'table'):
+            result = run_mode(mode, args.size, args.workers,
+                              os.path.join(folder, 'prices.table'))
+            print(json.dumps(result), flush=True)
+    for name in os.listdir(folder):
+        os.unlink(os.path.join(folder, name))
+    os.rmdir(folder)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+""" Benchmark integer unit quotes against Decimal quotes without a database
+
+Run from the project folder:
+    python benchmarks/pricing.py --lines 100,10000 --codes 1000
+
+Carts of random catalog codes and quantities are priced from integer unit prices,
+as the catalogs hold them, and with Decimal arithmetic. Both are checked to give
+the same quotes, and one JSON result line with the best time of `--repeat` runs
+is printed per cart size and path.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import timeit
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dronut.settings')
+
+import django  # pylint: disable=wrong-import-position
+
+django.setup()
+
+# pylint: disable=wrong-import-position
+from dronut_app.pricing import PricingEngine
+
+
+def int_list(value):
+    """ Parse a comma separated list of integers"""
+    return [int(item) for item in value.split(',')]
+
+
+def main():
+    """ Time both pricing paths for every cart size"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--lines', type=int_list, default=[100, 10000])
+    parser.add_argument('--codes', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    prices = {f'DONUT_{index:07d}': Decimal(random.randrange(100, 5000)).scaleb(-2)
+              for index in range(args.codes)}
+    units, scale = PricingEngine().to_units(prices)
+    codes = list(prices)
+    for lines in args.lines:
+        parsed_lines = [(random.choice(codes), random.randrange(1, 50), None)
+                        for _ in range(lines)]
+        paths = {
+            'units': lambda cart=parsed_lines: PricingEngine.build_quote_units(cart, units, scale),
+            'decimal': lambda cart=parsed_lines: PricingEngine.build_quote_decimal(cart, prices),
+        }
+        assert paths['units']() == paths['decimal']()
+        number = max(1, 100000 // lines)
+        for path, build_quote in paths.items():
+            best = min(timeit.repeat(build_quote, number=number, repeat=args.repeat)) / number
+            print(json.dumps({'lines': lines, 'path': path,
+                              'ms_per_quote': round(best * 1000, 3)}), flush=True)
+
+
+if __name__ == '__main__':
+    main()
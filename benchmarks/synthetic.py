@@ -0,0 +1,33 @@
+""" Synthetic catalogs in a throwaway test database for the benchmarks"""
+import contextlib
+from django.db import connection
+from django.test.utils import setup_test_environment
+from dronut_app.catalog import bump_catalog_version
+from dronut_app.models import Donuts
+
+
+def donut_code(index):
+    """ Donut code of the `index`-th synthetic donut"""
+    return f'DONUT_{index:07d}'
+
+
+def seed_donuts(count, batch_size=1000, start=0):
+    """ Fill the database with donuts `start` to `count` - 1 using bulk inserts"""
+    Donuts.objects.bulk_create(
+        (Donuts(donut_code=donut_code(index), search_key=donut_code(index),
+                description=f'donut number {index} with sprinkles and a chocolate glaze',
+                price_per_unit=f'{index % 50 + 1}.{index % 100:02d}')
+         for index in range(start, count)), batch_size=batch_size)
+    # bulk_create sends no signals, so invalidate the price catalog here
+    bump_catalog_version()
+
+
+@contextlib.contextmanager
+def throwaway_database():
+    """ Create the test database for the duration of the block"""
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
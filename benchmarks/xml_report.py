@@ -0,0 +1,97 @@
+""" Benchmark wall time and peak memory of the DOM and streaming Cobertura writers
+
+Run from the project folder:
+    python benchmarks/xml_report.py --packages 50 --files 40 --statements 400
+
+A synthetic source tree is written to a temporary folder. Each writer reports on
+it in a separate process, so the peak RSS of one does not hide the other's. Both
+reports are checked to be identical, apart from their timestamps, and one JSON
+result line is printed per writer.
+"""
+import argparse
+import json
+import os
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pylint: disable=wrong-import-position
+import coverage
+from xmlreporter import StreamingXmlReporter, XmlReporter
+
+WRITERS = {'dom': XmlReporter, 'streaming': StreamingXmlReporter}
+
+
+def write_tree(root, packages, files, statements):
+    """ Write `packages` folders of `files` modules with `statements` lines each"""
+    paths = []
+    for package in range(packages):
+        folder = os.path.join(root, f'package_{package:03d}')
+        os.makedirs(folder)
+        for module in range(files):
+            path = os.path.join(folder, f'module_{module:03d}.py')
+            with open(path, 'w', encoding='utf-8') as source:
+                source.writelines(f'value_{line} = {line}\n' for line in range(statements))
+            paths.append(path)
+    return paths
+
+
+def peak_rss_mb():
+    """ Peak resident set size of this process in MB"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_writer(writer, root, statements):
+    """ Report on the tree under `root` with one writer, print the JSON result"""
+    os.chdir(root)
+    paths = sorted(os.path.join(root, folder, name) for folder in os.listdir(root)
+                   if os.path.isdir(folder) for name in os.listdir(folder))
+    cov = coverage.Coverage(data_file=None)
+    # every other statement was executed
+    cov.get_data().add_lines({path: range(1, statements + 1, 2) for path in paths})
+    rss_before = peak_rss_mb()
+    started = time.perf_counter()
+    with open(f'coverage-{writer}.xml', 'w', encoding='utf8') as outfile:
+        WRITERS[writer](cov).report(paths, outfile=outfile)
+    elapsed = time.perf_counter() - started
+    print(json.dumps({'writer': writer, 'files': len(paths), 'seconds': round(elapsed, 3),
+                      'peak_rss_mb': round(peak_rss_mb(), 1),
+                      'report_rss_mb': round(peak_rss_mb() - rss_before, 1)}))
+
+
+def read_report(path):
+    """ Read a report without its timestamp"""
+    with open(path, encoding='utf8') as report:
+        return re.sub(r'timestamp="\d+"', '', report.read())
+
+
+def main():
+    """ Build the tree and run each writer in its own process"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--packages', type=int, default=50)
+    parser.add_argument('--files', type=int, default=40)
+    parser.add_argument('--statements', type=int, default=400)
+    parser.add_argument('--writer', choices=WRITERS, help=argparse.SUPPRESS)
+    parser.add_argument('--root', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.writer:
+        run_writer(args.writer, args.root, args.statements)
+        return
+    with tempfile.TemporaryDirectory() as root:
+        write_tree(root, args.packages, args.files, args.statements)
+        for writer in WRITERS:
+            subprocess.run([sys.executable, os.path.abspath(__file__), '--writer', writer,
+                            '--root', root, '--statements', str(args.statements)], check=True)
+        if read_report(os.path.join(root, 'coverage-dom.xml')) != \
+                read_report(os.path.join(root, 'coverage-streaming.xml')):
+            raise SystemExit('the streaming report differs from the DOM report')
+
+
+if __name__ == '__main__':
+    main()
@@ -53,6 +53,8 @@ NOSE_ARGS = [
 ]
 
 MIDDLEWARE = [
+    # first, so the timings cover the whole middleware stack
+    'dronut_app.middleware.performance_middleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -94,6 +96,32 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+# The catalog version counter lives in the default cache. Use a backend shared
+# by all worker processes (memcached, redis, file) when running more than one.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'dronut',
+    },
+    # memoized quotes, a bounded LRU whose entries expire after TIMEOUT seconds
+    'quotes': {
+        'BACKEND': 'dronut_app.cache.MeteredLocMemCache',
+        'LOCATION': 'dronut-quotes',
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+}
+
+# Price table file memory-mapped by every worker process to price quotes, pick a
+# local path writable by the workers. None keeps the per process price catalog.
+# The default cache must then be shared by the workers, not the LocMemCache above
+DRONUT_PRICE_TABLE = None
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
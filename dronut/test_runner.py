@@ -0,0 +1,144 @@
+""" Test runner writing a nose compatible xunit report, also when running with --parallel"""
+import time
+import unittest
+from xml.etree import ElementTree
+from django.test.runner import (DiscoverRunner, ParallelTestSuite, RemoteTestResult,
+                                RemoteTestRunner)
+
+
+class TimedRemoteTestResult(RemoteTestResult):
+    """ RemoteTestResult also sending the duration of each test to the parent process"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.started = None
+
+    def startTest(self, test):
+        self.started = time.perf_counter()
+        super().startTest(test)
+
+    def stopTest(self, test):
+        self.events.append(('addDuration', self.test_index, time.perf_counter() - self.started))
+        super().stopTest(test)
+
+
+class TimedRemoteTestRunner(RemoteTestRunner):  # pylint: disable=too-few-public-methods
+    """ RemoteTestRunner of the parallel workers"""
+    resultclass = TimedRemoteTestResult
+
+
+class XunitParallelTestSuite(ParallelTestSuite):
+    """ ParallelTestSuite whose workers report the test durations"""
+    runner_class = TimedRemoteTestRunner
+
+
+class XunitTestResult(unittest.TextTestResult):
+    """
+    TextTestResult keeping the outcome and duration of each test for the xunit report.
+    In parallel runs the events of a worker are replayed here once its tests are
+    done, so the durations measured by the worker are used instead
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.test_cases = []
+        self.current = None
+
+    def startTest(self, test):
+        super().startTest(test)
+        self.current = {'test': test, 'started': time.perf_counter(), 'duration': None,
+                        'outcomes': []}
+
+    def addDuration(self, test, elapsed):  # pylint: disable=invalid-name,unused-argument
+        """ Duration of the current test as measured by a parallel worker"""
+        self.current['duration'] = elapsed
+
+    def stopTest(self, test):
+        if self.current['duration'] is None:
+            self.current['duration'] = time.perf_counter() - self.current['started']
+        self.test_cases.append(self.current)
+        self.current = None
+        super().stopTest(test)
+
+    def add_outcome(self, test, kind, err=None, message=''):
+        """ Record an outcome, errors in class or module fixtures get a test case of their own"""
+        if err is not None:
+            message = self._exc_info_to_string(err, test)
+        if self.current is None:
+            self.test_cases.append({'test': test, 'duration': 0, 'outcomes': []})
+            self.test_cases[-1]['outcomes'].append((kind, message))
+        else:
+            self.current['outcomes'].append((kind, message))
+
+    def addError(self, test, err):
+        super().addError(test, err)
+        self.add_outcome(test, 'error', err)
+
+    def addFailure(self, test, err):
+        super().addFailure(test, err)
+        self.add_outcome(test, 'failure', err)
+
+    def addSubTest(self, test, subtest, err):
+        super().addSubTest(test, subtest, err)
+        if err is not None:
+            kind = 'failure' if issubclass(err[0], test.failureException) else 'error'
+            self.add_outcome(test, kind, err)
+
+    def addSkip(self, test, reason):
+        super().addSkip(test, reason)
+        self.add_outcome(test, 'skipped', message=reason)
+
+    def addUnexpectedSuccess(self, test):
+        super().addUnexpectedSuccess(test)
+        self.add_outcome(test, 'failure', message='Unexpected success')
+
+    def to_xunit(self):
+        """ Build the xunit document, laid out like the nose xunit plugin's"""
+        counts = {'error': 0, 'failure': 0, 'skipped': 0}
+        suite = ElementTree.Element('testsuite')
+        for test_case in self.test_cases:
+            test = test_case['test']
+            test_id = test.id()
+            classname, _, name = test_id.rpartition('.')
+            case = ElementTree.SubElement(suite, 'testcase', classname=classname or test_id,
+                                          name=name, time=f'{test_case["duration"]:.3f}')
+            for kind, message in test_case['outcomes'][:1]:
+                counts[kind] += 1
+                first_line = message.strip().splitlines()[-1] if message.strip() else ''
+                outcome = ElementTree.SubElement(case, kind, message=first_line)
+                outcome.text = message
+        suite.attrib.update({'name': 'nosetests', 'tests': str(len(self.test_cases)),
+                             'errors': str(counts['error']), 'failures': str(counts['failure']),
+                             'skip': str(counts['skipped'])})
+        return ElementTree.ElementTree(suite)
+
+    def write_xunit(self, path):
+        """ Write the xunit report to `path`"""
+        self.to_xunit().write(path, encoding='UTF-8', xml_declaration=True)
+
+
+class XunitDiscoverRunner(DiscoverRunner):
+    """
+    DiscoverRunner writing an xunit report of the run.
+    Works with --parallel, the workers send their outcomes and durations back
+    """
+    parallel_test_suite = XunitParallelTestSuite
+
+    def __init__(self, xunit_file='xunittest.xml', **kwargs):
+        super().__init__(**kwargs)
+        self.xunit_file = xunit_file
+
+    @classmethod
+    def add_arguments(cls, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--xunit-file', default='xunittest.xml',
+                            help='Path of the xunit report, xunittest.xml by default')
+
+    def get_resultclass(self):
+        return super().get_resultclass() or XunitTestResult
+
+    def run_suite(self, suite, **kwargs):
+        result = super().run_suite(suite, **kwargs)
+        if isinstance(result, XunitTestResult):
+            result.write_xunit(self.xunit_file)
+        return result
@@ -1,7 +1,7 @@
 """ Admin Module to for configuring admin items"""
 
 from django.contrib import admin
-from dronut_app.models import Donuts
+from dronut_app.models import DonutChange, Donuts
 
 
 # Register your models here.
@@ -13,3 +13,22 @@ class DonutDatAdmin(admin.ModelAdmin):
 
 
 admin.site.register(Donuts, DonutDatAdmin)
+
+
+class DonutChangeAdmin(admin.ModelAdmin):
+    """ For browsing the donut change feed, which only the donut writes add to"""
+    list_display = ['seq', 'action', 'donut_code', 'price_per_unit', 'changed_at']
+    list_filter = ['action']
+    search_fields = ['donut_code']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+admin.site.register(DonutChange, DonutChangeAdmin)
@@ -1,45 +1,299 @@
 """ Module for building API end points"""
-from rest_framework import viewsets, permissions, decorators, response
+import uuid
+from django.db import transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from rest_framework import (viewsets, permissions, decorators, response, renderers, exceptions,
+                            status)
 from django_filters.rest_framework import DjangoFilterBackend
+from dronut_app.bulk import bulk_upsert
+from dronut_app.catalog import price_catalog
+from dronut_app.changes import parse_changes_params, read_changes
+from dronut_app.conditional import catalog_condition, donut_condition, get_donut_entry
+from dronut_app.encoders import get_donut_row_encoder
+from dronut_app.export import export_rows
 from dronut_app.models import Donuts
+from dronut_app.pagination import (DonutCursorPagination, DonutLimitOffsetPagination,
+                                   DonutSearchCursorPagination, OFFSET_PAGINATION_PARAMS)
+from dronut_app.price_table import get_donut_catalog, get_price_catalog
+from dronut_app.pricing import PricingEngine
+from dronut_app.quote_cache import quote_memo
+from dronut_app.renderers import CSVRenderer, NDJSONRenderer
+from dronut_app.search import autocomplete_codes, fulltext_search, prefix_filter
 from dronut_app.serializers import DonutSerializer
 
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_MAX_LIMIT = 50
+QUOTE_BATCH_MAX_CARTS = 1000
+# keys of a multi-get, short enough for the URL of a GET request
+DONUT_BATCH_MAX_KEYS = 200
+# multi-get key parameters and the fields they match
+DONUT_BATCH_KEYS = {'ids': 'id', 'codes': 'donut_code'}
+# actions honouring the ?fields= sparse fieldset
+SPARSE_FIELDSET_ACTIONS = ('list', 'retrieve', 'batch')
+# query parameters the catalog backed retrieve can serve
+CATALOG_RETRIEVE_PARAMS = {'fields', 'format'}
 
-class DronutsDataViewSet(viewsets.ModelViewSet):  # pylint: disable=too-many-ancestors
+
+class DronutsDataViewSet(  # pylint: disable=too-many-ancestors,too-many-public-methods
+        viewsets.ModelViewSet):
     """ API endpoints to create, update , delete Dronut data"""
     queryset = Donuts.objects.all()
     serializer_class = DonutSerializer
     permission_classes = [permissions.AllowAny]  # TODO : Add authentication and change permissions
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['donut_code']
+    pagination_class = DonutCursorPagination
+    # encode list and detail reads from values rows instead of DonutSerializer
+    lean_reads = True
+
+    @property
+    def paginator(self):
+        # clients sending limit or offset keep the legacy offset pagination, and
+        # full-text search results are paged in rank order
+        # pylint: disable=attribute-defined-outside-init
+        if not hasattr(self, '_paginator') and self.request is not None:
+            query_params = self.request.query_params
+            if any(param in query_params for param in OFFSET_PAGINATION_PARAMS):
+                self._paginator = DonutLimitOffsetPagination()
+            elif 'search' in query_params:
+                self._paginator = DonutSearchCursorPagination()
+        return super().paginator
 
     def get_queryset(self):
+        queryset = self.queryset
         query_val = self.request.query_params.get('q')
         # if there is q query parameter then filter by it
         if query_val is not None:
-            return self.queryset.filter(donut_code__istartswith=query_val)
-        return self.queryset
+            queryset = queryset.filter(**prefix_filter(query_val))
+        # ?search= matches words in the code and description, ranked
+        search = self.request.query_params.get('search')
+        if search is not None:
+            queryset = fulltext_search(queryset, search)
+        fields = self.get_requested_fields()
+        # only read the columns of a sparse fieldset
+        if fields is not None:
+            queryset = queryset.only(*(column for column in self.get_read_columns(fields)
+                                       if column not in queryset.query.annotations))
+        return queryset
+
+    def get_requested_fields(self):
+        """ Return the ?fields= sparse fieldset as a tuple in serializer order, or None"""
+        value = self.request.query_params.get('fields')
+        if not value or self.action not in SPARSE_FIELDSET_ACTIONS:
+            return None
+        requested = {name.strip() for name in value.split(',') if name.strip()}
+        available = get_donut_row_encoder().names
+        unknown = requested.difference(available)
+        if unknown:
+            raise exceptions.ValidationError({'fields': [f'Unknown field: {name}'
+                                                         for name in sorted(unknown)]})
+        return tuple(name for name in available if name in requested)
+
+    def get_read_columns(self, fields):
+        """ Model columns to read for `fields`, plus the ordering the paginator pages on"""
+        columns = list(get_donut_row_encoder(fields).fields)
+        ordering = getattr(self.paginator, 'ordering', None)
+        for name in ([ordering] if isinstance(ordering, str) else ordering or []):
+            if name.lstrip('-') not in columns:
+                columns.append(name.lstrip('-'))
+        return columns
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('fields', self.get_requested_fields())
+        return super().get_serializer(*args, **kwargs)
+
+    def use_lean_reads(self, request):
+        """ Whether the response can be encoded by the row encoder, compact JSON only"""
+        return self.lean_reads and isinstance(request.accepted_renderer, renderers.JSONRenderer) \
+            and 'indent' not in request.accepted_media_type
+
+    @staticmethod
+    def json_response(document):
+        """ Response for a document encoded by the row encoder"""
+        return HttpResponse(get_donut_row_encoder().to_bytes(document),
+                            content_type=renderers.JSONRenderer.media_type)
+
+    # a donut write and its change feed row, recorded by the model signals, are
+    # committed together or not at all, and in the same order as the other writes
+
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            super().perform_create(serializer)
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            super().perform_update(serializer)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            super().perform_destroy(instance)
+
+    @method_decorator(catalog_condition)
+    def list(self, request, *args, **kwargs):
+        """ API end point for a page of donuts, 304 when the catalog did not change"""
+        if not self.use_lean_reads(request):
+            return super().list(request, *args, **kwargs)
+        fields = self.get_requested_fields()
+        row_encoder = get_donut_row_encoder(fields)
+        columns = self.get_read_columns(fields)
+        queryset = self.filter_queryset(self.get_queryset()).values_list(*columns, named=True)
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return self.json_response(row_encoder.encode_rows(queryset))
+        envelope = self.get_paginated_response([]).data
+        return self.json_response(row_encoder.encode_envelope(envelope, page))
+
+    @method_decorator(donut_condition)
+    def retrieve(self, request, *args, **kwargs):
+        """ API end point for retrieving a donut information"""
+        # serve plain detail reads from the in-process catalog, anything the
+        # catalog does not know falls back to the database lookup
+        if CATALOG_RETRIEVE_PARAMS.issuperset(request.query_params):
+            entry = get_donut_entry(request, kwargs[self.lookup_field])
+            if entry is not None and self.use_lean_reads(request):
+                row_encoder = get_donut_row_encoder(self.get_requested_fields())
+                return self.json_response(row_encoder.encode_row(entry))
+            if entry is not None:
+                serializer = self.get_serializer(price_catalog.to_instance(entry))
+                return response.Response(serializer.data)
+        return super().retrieve(request, *args, **kwargs)
+
+    def get_batch_keys(self):
+        """
+        Parse the ?ids= or ?codes= comma separated keys of a multi-get, returns the
+        matched field and the (key, lookup value) pairs, None for an invalid id
+        """
+        params = [param for param in DONUT_BATCH_KEYS if param in self.request.query_params]
+        if len(params) != 1:
+            raise ValueError('Pass either ids or codes')
+        keys = [key.strip() for key in self.request.query_params[params[0]].split(',')
+                if key.strip()]
+        if len(keys) > DONUT_BATCH_MAX_KEYS:
+            raise ValueError(f'at most {DONUT_BATCH_MAX_KEYS} {params[0]} per batch')
+        field_name = DONUT_BATCH_KEYS[params[0]]
+        if field_name != 'id':
+            return field_name, [(key, key) for key in keys]
+        lookups = []
+        for key in keys:
+            try:
+                lookups.append((key, uuid.UUID(key)))
+            except ValueError:
+                lookups.append((key, None))
+        return field_name, lookups
+
+    @decorators.action(detail=False, methods=['get'])
+    def batch(self, request):
+        """
+        API end point for many donuts by ?ids= or ?codes=, read with one query.
+        Results follow the order of the keys, with null for a key not found, and
+        the keys not found are listed in missing
+        """
+        try:
+            field_name, lookups = self.get_batch_keys()
+        except ValueError as exc:
+            return response.Response({'error': str(exc), 'info': 'Error encountered'})
+        fields = self.get_requested_fields()
+        row_encoder = get_donut_row_encoder(fields)
+        columns = list(dict.fromkeys([*row_encoder.fields, field_name]))
+        values = {value for _, value in lookups if value is not None}
+        rows = {}
+        if values:
+            rows = {getattr(row, field_name): row for row in self.queryset.filter(
+                **{f'{field_name}__in': values}).values_list(*columns, named=True)}
+        results = [rows.get(value) for _, value in lookups]
+        envelope = {'results': [], 'missing': [key for (key, _), row in zip(lookups, results)
+                                               if row is None]}
+        if self.use_lean_reads(request):
+            return self.json_response(row_encoder.encode_envelope(envelope, results))
+        envelope['results'] = [None if row is None else self.get_serializer(row).data
+                               for row in results]
+        return response.Response(envelope)
 
     @decorators.action(detail=False, methods=['post'])
     def quotes(self, request):
         """ API end point for getting donut quotes"""
         try:
-            req_data = request.data['donuts']
-            quote_line_item = []
-            quote_total = 0
-            # Iterate over the request data
-            # Check if the donut code exists in table and quantity is an integer
-            # build line item from the donut code and multiply quantity by donut price
-            # return the json response with line item and total
-            # if there are exceptions return json format error
-            for donut_item in req_data:
-                donut_obj = self.queryset.filter(donut_code=donut_item['donut_code']).first()
-                if donut_obj and isinstance(donut_item['quantity'], int):
-                    line_value = donut_obj.price_per_unit * donut_item['quantity']
-                    line_item = {'donut_code': donut_obj.donut_code,
-                                 'line_value': line_value}
-                    quote_line_item.append(line_item)
-                    quote_total += line_value
+            # all donut codes of the cart are resolved with a single catalog lookup,
+            # invalid lines and unknown codes are reported per line in quote_errors
+            pricing_engine = PricingEngine(self.queryset, catalog=get_price_catalog())
+            # repeated carts are answered from the quote cache
+            quote = quote_memo.quote(pricing_engine, request.data['donuts'])
         except Exception as exc:
             return response.Response({'error': str(exc), 'info': 'Error encountered'})
-        return response.Response({'quote_line_item': quote_line_item, 'quote_total': quote_total})
+        return response.Response(quote)
+
+    @decorators.action(detail=False, methods=['post'], url_path='quotes/batch')
+    def quotes_batch(self, request):
+        """ API end point for getting the quotes of many carts in one request"""
+        try:
+            carts = request.data['carts']
+            if len(carts) > QUOTE_BATCH_MAX_CARTS:
+                raise ValueError(f'at most {QUOTE_BATCH_MAX_CARTS} carts per batch')
+            pricing_engine = PricingEngine(self.queryset, catalog=get_price_catalog())
+            quotes = pricing_engine.quote_batch(carts)
+        except Exception as exc:
+            return response.Response({'error': str(exc), 'info': 'Error encountered'})
+        return response.Response({'quotes': quotes})
+
+    @decorators.action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """ API end point for creating or updating many donuts keyed by donut code"""
+        try:
+            records = request.data['donuts'] if isinstance(request.data, dict) else request.data
+            summary = bulk_upsert(records)
+        except exceptions.ValidationError as exc:
+            # a body that is not a list of donuts, invalid rows are reported in the summary
+            return response.Response(exc.detail, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as exc:
+            return response.Response({'error': str(exc), 'info': 'Error encountered'})
+        return response.Response(summary)
+
+    @decorators.action(detail=False, methods=['get'],
+                       renderer_classes=[NDJSONRenderer, CSVRenderer])
+    def export(self, request):
+        """ API end point for streaming the whole catalog as ?format=ndjson or ?format=csv"""
+        renderer = request.accepted_renderer
+        streaming_response = StreamingHttpResponse(export_rows(self.queryset, renderer.format),
+                                                   content_type=renderer.media_type)
+        streaming_response['Content-Disposition'] = \
+            f'attachment; filename="donuts.{renderer.format}"'
+        return streaming_response
+
+    @decorators.action(detail=False, methods=['get'])
+    def changes(self, request):
+        """
+        API end point for the donut creates, updates and deletes after ?since=<seq>,
+        in sequence order. Under ASGI async/donuts/changes/ can also wait for them
+        """
+        try:
+            since, limit, _ = parse_changes_params(request.query_params)
+        except ValueError as exc:
+            return response.Response({'error': str(exc), 'info': 'Error encountered'})
+        return response.Response(read_changes(since, limit))
+
+    @decorators.action(detail=False, methods=['get'])
+    def autocomplete(self, request):
+        """ API end point for donut code type-ahead, returns the first matching codes"""
+        try:
+            limit = min(int(request.query_params.get('limit', AUTOCOMPLETE_LIMIT)),
+                        AUTOCOMPLETE_MAX_LIMIT)
+        except ValueError:
+            return response.Response({'error': 'limit must be an integer',
+                                      'info': 'Error encountered'})
+        prefix = request.query_params.get('q', '')
+        catalog = get_donut_catalog()
+        if catalog is None:
+            return response.Response({'results': autocomplete_codes(self.queryset, prefix,
+                                                                    max(limit, 0))})
+        return response.Response({'results': catalog.autocomplete(prefix, max(limit, 0))})
+
+    @decorators.action(detail=False, methods=['get'], url_path='catalog-stats')
+    def catalog_stats(self, request):  # pylint: disable=unused-argument
+        """ API end point for the price catalog hit, miss and rebuild counters"""
+        return response.Response(price_catalog.stats())
+
+    @decorators.action(detail=False, methods=['get'], url_path='quote-cache-stats')
+    def quote_cache_stats(self, request):  # pylint: disable=unused-argument
+        """ API end point for the quote cache hit rate, evictions and memory use"""
+        return response.Response(quote_memo.stats())
@@ -6,3 +6,8 @@ class DronutAppConfig(AppConfig):
     """ App class for Dronut App"""
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'dronut_app'
+
+    def ready(self):
+        """ Connect the catalog, change feed and query timer signal handlers, register the checks"""
+        # pylint: disable=import-outside-toplevel,unused-import
+        from dronut_app import checks, signals
@@ -0,0 +1,76 @@
+""" Module for bulk writes to the donut catalog"""
+from django.db import connections, transaction
+from dronut_app.catalog import publish_catalog_change
+from dronut_app.changes import change_for, record_changes
+from dronut_app.models import DonutChange, Donuts
+from dronut_app.pricing import batched
+from dronut_app.serializers import DonutBulkSerializer
+
+BULK_BATCH_SIZE = 1000
+UPSERT_UPDATE_FIELDS = ['description', 'price_per_unit', 'search_key', 'updated_at']
+# fields an update keeps from the stored donut when a row leaves them out
+UPSERT_MERGE_FIELDS = ['id', 'description', 'price_per_unit']
+
+
+def build_donut(row, stored=None):
+    """
+    Build an unsaved Donuts instance from a validated row, on top of the
+    `stored` values dict of the donut it updates
+    """
+    donut = Donuts(**{**(stored or {}), **row})
+    # bulk_create does not call save(), so keep the search key in sync here
+    donut.search_key = Donuts.search_key_for(donut.donut_code)
+    return donut
+
+
+def upsert_batch(rows, using='default'):
+    """
+    Insert or update validated rows keyed by donut_code in one transaction,
+    an update only changes the fields its row sends. Returns a (created, updated) tuple
+    """
+    # rows with the same code are merged in order, later fields win
+    rows_by_code = {}
+    for row in rows:
+        rows_by_code.setdefault(row['donut_code'], {}).update(row)
+    if not rows_by_code:
+        return 0, 0
+    lookup_size = connections[using].features.max_query_params or len(rows_by_code)
+    with transaction.atomic(using=using):
+        # read in the transaction, so the merged values are the ones being replaced
+        existing = {}
+        for codes in batched(rows_by_code, lookup_size):
+            existing.update((stored.pop('donut_code'), stored) for stored in
+                            Donuts.objects.using(using).filter(donut_code__in=codes)
+                            .values('donut_code', *UPSERT_MERGE_FIELDS))
+        donuts = [build_donut(row, existing.get(code)) for code, row in rows_by_code.items()]
+        Donuts.objects.using(using).bulk_create(donuts, update_conflicts=True,
+                                                unique_fields=['donut_code'],
+                                                update_fields=UPSERT_UPDATE_FIELDS)
+        # bulk_create sends no model signals
+        record_changes([change_for(donut, DonutChange.UPDATE if donut.donut_code in existing
+                                   else DonutChange.CREATE) for donut in donuts], using)
+        publish_catalog_change()
+    return len(donuts) - len(existing), len(existing)
+
+
+def bulk_upsert(records, batch_size=BULK_BATCH_SIZE):
+    """
+    Validate `records` in one pass and upsert the valid ones in batched transactions.
+    Returns a summary with the created and updated counts and the per-row errors
+    """
+    # many=True builds a DonutBulkListSerializer, which collects the row errors
+    serializer = DonutBulkSerializer(data=records, many=True)
+    serializer.is_valid(raise_exception=True)
+    row_errors = serializer.row_errors  # pylint: disable=no-member
+    created = updated = 0
+    for rows in batched(serializer.validated_data, batch_size):
+        batch_created, batch_updated = upsert_batch(rows)
+        created += batch_created
+        updated += batch_updated
+    return {
+        'received': len(records),
+        'created': created,
+        'updated': updated,
+        'failed': len(row_errors),
+        'errors': row_errors,
+    }
@@ -0,0 +1,27 @@
+""" Cache backends for the Dronut App are defined here"""
+from collections import Counter
+from django.core.cache.backends.locmem import LocMemCache
+
+# eviction counts per cache location, shared by the per-thread backend instances
+_evictions = Counter()
+
+
+class MeteredLocMemCache(LocMemCache):
+    """ Bounded LRU LocMemCache that reports its size, memory use and evictions"""
+
+    def __init__(self, name, params):
+        super().__init__(name, params)
+        self._name = name
+
+    def _cull(self):
+        before = len(self._cache)
+        super()._cull()
+        _evictions[self._name] += before - len(self._cache)
+
+    def stats(self):
+        """ Return the entry count, the pickled size of the entries in bytes and evictions"""
+        with self._lock:
+            memory = sum(len(pickled) for pickled in self._cache.values())
+            entries = len(self._cache)
+        return {'entries': entries, 'max_entries': self._max_entries,
+                'memory_bytes': memory, 'evictions': _evictions[self._name]}
@@ -0,0 +1,196 @@
+""" Module for the in-process donut price catalog"""
+import bisect
+import threading
+import time
+import uuid
+from collections import namedtuple
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import transaction
+from dronut_app.models import Donuts
+from dronut_app.pricing import price_scale
+from dronut_app.search import prefix_range
+
+CATALOG_VERSION_KEY = 'dronut_app:catalog_version'
+CATALOG_MODIFIED_KEY = 'dronut_app:catalog_modified'
+
+CatalogEntry = namedtuple('CatalogEntry',
+                          ['id', 'donut_code', 'price_per_unit', 'description', 'updated_at'])
+
+
+def get_catalog_version():
+    """ Return the shared catalog version, initialising it when the cache has none"""
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        # start from the clock so an evicted counter never repeats an older version
+        cache.add(CATALOG_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+def get_catalog_modified():
+    """ Return the time of the last catalog change as a timestamp, None if unknown"""
+    return cache.get(CATALOG_MODIFIED_KEY)
+
+
+def bump_catalog_version():
+    """ Invalidate every worker's catalog by incrementing the shared version"""
+    cache.set(CATALOG_MODIFIED_KEY, time.time(), timeout=None)
+    try:
+        return cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.add(CATALOG_VERSION_KEY, time.time_ns(), timeout=None)
+        return cache.get(CATALOG_VERSION_KEY)
+
+
+def publish_catalog_change():
+    """ Invalidate the catalog after a write to the Donuts table"""
+    # bump now so this worker sees its own write, and again once committed so a
+    # worker that reloaded before the commit does not keep the old prices
+    bump_catalog_version()
+    transaction.on_commit(bump_catalog_version)
+
+
+class PriceCatalog:
+    """
+    Versioned in-memory copy of the Donuts table, held by each worker.
+    The catalog is loaded lazily and rebuilt on the next read after the shared
+    version has been bumped. Counters:
+    hits     - codes or ids found in the catalog
+    misses   - codes or ids not found in the catalog
+    rebuilds - number of times the catalog was loaded from the database
+    """
+
+    def __init__(self, queryset=None):
+        self.queryset = Donuts.objects.all() if queryset is None else queryset
+        self._lock = threading.Lock()
+        self._version = None
+        self._indexes = ({}, {}, ([], []), ({}, price_scale(self.queryset.model)))
+        self.hits = 0
+        self.misses = 0
+        self.rebuilds = 0
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    def _load(self, version):
+        """ Build the code, id, search key and price unit indexes from the database"""
+        by_code = {}
+        by_id = {}
+        # prices are also held as integer units of the field's smallest step
+        scale = price_scale(self.queryset.model)
+        steps = 1 / scale
+        units_by_code = {}
+        rows = self.queryset.values_list(*CatalogEntry._fields)
+        for row in rows.iterator():
+            entry = CatalogEntry(*row)
+            by_code[entry.donut_code] = entry
+            by_id[entry.id] = entry
+            units_by_code[entry.donut_code] = int(entry.price_per_unit * steps)
+        search_pairs = sorted((self.queryset.model.search_key_for(code), code) for code in by_code)
+        search_index = ([key for key, _ in search_pairs], [code for _, code in search_pairs])
+        # swap all indexes at once so readers never see a half built catalog
+        self._indexes = (by_code, by_id, search_index, (units_by_code, scale))
+        self._version = version
+        self.rebuilds += 1
+
+    def refresh(self):
+        """ Reload the catalog if the shared version moved, returns the indexes"""
+        version = get_catalog_version()
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._load(version)
+        return self._indexes
+
+    async def arefresh(self):
+        """ Async refresh, only a reload leaves the event loop for a worker thread"""
+        # the version check is a cache read, cheap enough to run on the event loop
+        if get_catalog_version() != self._version:
+            await sync_to_async(self.refresh)()
+        return self._indexes
+
+    def invalidate(self):
+        """ Drop the local copy, the next read loads the catalog again"""
+        with self._lock:
+            self._version = None
+
+    def _count(self, found, total):
+        self.hits += found
+        self.misses += total - found
+
+    def _lookup(self, indexes, donut_codes):
+        by_code = indexes[0]
+        donut_codes = set(donut_codes)
+        entries = {code: by_code[code] for code in donut_codes if code in by_code}
+        self._count(len(entries), len(donut_codes))
+        return entries
+
+    def _get_by_id(self, indexes, donut_id):
+        try:
+            entry = indexes[1].get(uuid.UUID(str(donut_id)))
+        except ValueError:
+            entry = None
+        self._count(int(entry is not None), 1)
+        return entry
+
+    def lookup(self, donut_codes):
+        """ Return a dict of code -> CatalogEntry for the known codes in `donut_codes`"""
+        return self._lookup(self.refresh(), donut_codes)
+
+    async def alookup(self, donut_codes):
+        """ Async version of lookup"""
+        return self._lookup(await self.arefresh(), donut_codes)
+
+    def _lookup_units(self, indexes, donut_codes):
+        units_by_code, scale = indexes[3]
+        donut_codes = set(donut_codes)
+        units = {code: units_by_code[code] for code in donut_codes if code in units_by_code}
+        self._count(len(units), len(donut_codes))
+        return units, scale
+
+    def lookup_units(self, donut_codes):
+        """
+        Return the prices of the known codes in `donut_codes` as a
+        (code -> integer units dict, scale) tuple, see PricingEngine.lookup_units
+        """
+        return self._lookup_units(self.refresh(), donut_codes)
+
+    async def alookup_units(self, donut_codes):
+        """ Async version of lookup_units"""
+        return self._lookup_units(await self.arefresh(), donut_codes)
+
+    def get_by_id(self, donut_id):
+        """ Return the CatalogEntry for a donut id, or None if it is unknown or invalid"""
+        return self._get_by_id(self.refresh(), donut_id)
+
+    async def aget_by_id(self, donut_id):
+        """ Async version of get_by_id"""
+        return self._get_by_id(await self.arefresh(), donut_id)
+
+    def autocomplete(self, prefix, limit):
+        """ Return up to `limit` donut codes starting with `prefix`, ignoring case"""
+        _, _, (search_keys, codes), _ = self.refresh()
+        low, high = prefix_range(prefix)
+        # binary search on the sorted search keys, the matches are contiguous
+        start = bisect.bisect_left(search_keys, low)
+        end = min(bisect.bisect_left(search_keys, high, lo=start), start + limit)
+        return codes[start:end]
+
+    def to_instance(self, entry):
+        """ Build an unsaved Donuts instance from a catalog entry, for serializers"""
+        return self.queryset.model(**entry._asdict())
+
+    def stats(self):
+        """ Return the catalog counters"""
+        return {
+            'version': self._version,
+            'size': len(self._indexes[0]),
+            'hits': self.hits,
+            'misses': self.misses,
+            'rebuilds': self.rebuilds,
+        }
+
+
+# one catalog per worker process
+price_catalog = PriceCatalog()
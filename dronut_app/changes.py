@@ -0,0 +1,101 @@
+""" Module for the donut change feed"""
+import asyncio
+import time
+from dronut_app.catalog import get_catalog_version
+from dronut_app.models import DonutChange
+from dronut_app.serializers import DonutChangeSerializer
+
+CHANGES_LIMIT = 100
+CHANGES_MAX_LIMIT = 1000
+CHANGES_MAX_WAIT = 30
+# a waiting long poll reads the shared catalog version this often, and the
+# changes table when the version moved or at least every CHANGES_RECHECK seconds
+CHANGES_POLL_INTERVAL = 0.25
+CHANGES_RECHECK = 2
+
+# Sequence numbers are the primary keys of the change rows. SQLite holds the write
+# lock from the first write to the commit, so they become visible in sequence order,
+# and a new key is always above the newest one, which is never deleted
+
+
+def change_for(donut, action):
+    """ Build an unsaved change recording `action` on `donut` with its current values"""
+    return DonutChange(action=action, donut_id=donut.id,
+                       donut_code=donut.donut_code, description=donut.description,
+                       price_per_unit=donut.price_per_unit)
+
+
+def record_change(donut, action, using='default'):
+    """ Record one change of `donut`, the next sequence number is assigned on insert"""
+    change_for(donut, action).save(using=using)
+
+
+def record_changes(changes, using='default'):
+    """ Record many unsaved changes with bulk inserts, in the order given"""
+    DonutChange.objects.using(using).bulk_create(changes)
+
+
+def parse_changes_params(query_params, max_wait=0):
+    """
+    Validate the ?since=, ?limit= and ?wait= query parameters, returns a
+    (since, limit, wait) tuple, raises ValueError for invalid values
+    """
+    try:
+        since = int(query_params.get('since', 0))
+        limit = int(query_params.get('limit', CHANGES_LIMIT))
+        wait = float(query_params.get('wait', 0))
+    except ValueError as exc:
+        raise ValueError('since and limit must be integers, wait a number of seconds') from exc
+    if since < 0 or not 0 <= wait < float('inf'):
+        raise ValueError('since and wait must not be negative')
+    return since, max(1, min(limit, CHANGES_MAX_LIMIT)), min(wait, max_wait)
+
+
+def changes_since(since, limit):
+    """ Queryset of the changes after sequence number `since`, one more than `limit`"""
+    return DonutChange.objects.filter(seq__gt=since).order_by('seq')[:limit + 1]
+
+
+def changes_page(changes, since, limit):
+    """
+    Page of changes in sequence order. `last_seq` is the `since` of the next
+    request, and `has_more` tells whether it will find changes without waiting
+    """
+    results = DonutChangeSerializer(changes[:limit], many=True).data
+    return {
+        'results': results,
+        'last_seq': results[-1]['seq'] if results else since,
+        'has_more': len(changes) > limit,
+    }
+
+
+def read_changes(since, limit):
+    """ Page of at most `limit` changes after sequence number `since`"""
+    return changes_page(list(changes_since(since, limit)), since, limit)
+
+
+async def aread_changes(since, limit):
+    """ Async version of read_changes"""
+    return changes_page([change async for change in changes_since(since, limit)], since, limit)
+
+
+async def await_changes(since, limit, wait):
+    """
+    Long poll for the changes after sequence number `since`, waiting up to `wait`
+    seconds for one when there are none yet. Every write bumps the catalog version
+    once committed, so while waiting the changes table is only read again when the
+    version moved, or every CHANGES_RECHECK seconds for a cache not shared by the
+    workers. Returns a page of changes, empty when the wait timed out
+    """
+    deadline = time.monotonic() + wait
+    version = get_catalog_version()
+    page = await aread_changes(since, limit)
+    checked = time.monotonic()
+    while not page['results'] and time.monotonic() < deadline:
+        await asyncio.sleep(max(0, min(CHANGES_POLL_INTERVAL, deadline - time.monotonic())))
+        current = get_catalog_version()
+        if current != version or time.monotonic() - checked >= CHANGES_RECHECK:
+            version = current
+            page = await aread_changes(since, limit)
+            checked = time.monotonic()
+    return page
@@ -0,0 +1,25 @@
+""" System checks of the Dronut App settings are defined here"""
+from django.conf import settings
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, Tags, register
+from django.utils.module_loading import import_string
+
+# cache backends keeping their values in each process, or not keeping them at all
+PROCESS_LOCAL_CACHES = (LocMemCache, DummyCache)
+
+
+@register(Tags.caches)
+def check_price_table_cache(app_configs, **kwargs):  # pylint: disable=unused-argument
+    """ The shared price table needs the catalog version in a cache shared by the workers"""
+    if not settings.DRONUT_PRICE_TABLE:
+        return []
+    backend = import_string(settings.CACHES['default']['BACKEND'])
+    if not issubclass(backend, PROCESS_LOCAL_CACHES):
+        return []
+    return [Error(
+        'DRONUT_PRICE_TABLE needs a default cache shared by the worker processes.',
+        hint=f'{backend.__name__} keeps the catalog version in each process, so the '
+             'workers would rebuild the table over each other and keep serving prices '
+             'changed by another worker. Use e.g. Redis, Memcached or the database cache.',
+        obj='CACHES["default"]', id='dronut_app.E001')]
@@ -0,0 +1,78 @@
+""" Module for conditional GET support, ETag and Last-Modified values of API reads"""
+import datetime
+import hashlib
+from django.core.exceptions import ValidationError
+from django.views.decorators.http import condition
+from dronut_app.catalog import CatalogEntry, get_catalog_modified, get_catalog_version
+from dronut_app.models import Donuts
+from dronut_app.price_table import get_donut_catalog
+
+# request attribute memoizing the (donut id, catalog entry) of a detail read
+DONUT_ENTRY_ATTRIBUTE = '_dronut_donut_entry'
+
+
+def catalog_etag(request, *args, **kwargs):  # pylint: disable=unused-argument
+    """
+    ETag of a list response: the catalog revision plus everything the
+    representation depends on, the full URL and the accepted media types
+    """
+    representation = '|'.join([str(get_catalog_version()), request.build_absolute_uri(),
+                               request.META.get('HTTP_ACCEPT', '')])
+    return hashlib.sha1(representation.encode('utf-8')).hexdigest()
+
+
+def catalog_last_modified(request, *args, **kwargs):  # pylint: disable=unused-argument
+    """ Last-Modified of a list response, the time of the last catalog change"""
+    modified = get_catalog_modified()
+    if modified is None:
+        return None
+    return datetime.datetime.fromtimestamp(modified, tz=datetime.timezone.utc)
+
+
+def read_donut_entry(donut_id):
+    """ Read the catalog entry fields of a donut from the database, None if unknown"""
+    try:
+        return Donuts.objects.filter(pk=donut_id).values_list(*CatalogEntry._fields,
+                                                              named=True).first()
+    except ValidationError:
+        return None
+
+
+def get_donut_entry(request, donut_id):
+    """
+    Return the catalog entry of the donut a detail request reads, or None. It is
+    looked up once per request and shared by the validators and the view, so a
+    detail read counts one catalog hit or miss, or runs one query when the shared
+    price table replaces the catalog
+    """
+    memo = getattr(request, DONUT_ENTRY_ATTRIBUTE, None)
+    if memo is None or memo[0] != donut_id:
+        catalog = get_donut_catalog()
+        entry = read_donut_entry(donut_id) if catalog is None else catalog.get_by_id(donut_id)
+        memo = (donut_id, entry)
+        setattr(request, DONUT_ENTRY_ATTRIBUTE, memo)
+    return memo[1]
+
+
+def donut_etag(request, *args, **kwargs):
+    """
+    ETag of a detail response, the donut id and the time it was last written,
+    plus the query string and accepted media types the representation depends on
+    """
+    entry = get_donut_entry(request, kwargs.get('pk'))
+    if entry is None:
+        return None
+    representation = '|'.join([str(entry.id), entry.updated_at.isoformat(),
+                               request.get_full_path(), request.META.get('HTTP_ACCEPT', '')])
+    return hashlib.sha1(representation.encode('utf-8')).hexdigest()
+
+
+def donut_last_modified(request, *args, **kwargs):  # pylint: disable=unused-argument
+    """ Last-Modified of a detail response"""
+    entry = get_donut_entry(request, kwargs.get('pk'))
+    return None if entry is None else entry.updated_at
+
+
+# answer If-None-Match / If-Modified-Since with 304 before the view runs
+catalog_condition = condition(etag_func=catalog_etag, last_modified_func=catalog_last_modified)
+donut_condition = condition(etag_func=donut_etag, last_modified_func=donut_last_modified)
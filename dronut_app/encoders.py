@@ -0,0 +1,104 @@
+""" Module for encoding donut rows straight to JSON, bypassing the serializer"""
+import functools
+import json
+from decimal import Decimal
+from json.encoder import encode_basestring, encode_basestring_ascii
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+from dronut_app.serializers import DonutSerializer
+
+
+def string_formatter(encode_string, allow_null):
+    """ Return a formatter for str values"""
+    if allow_null:
+        return lambda value: 'null' if value is None else encode_string(value)
+    return encode_string
+
+
+def uuid_formatter(allow_null):
+    """ Return a formatter for UUID values, hex_verbose like serializers.UUIDField"""
+    if allow_null:
+        return lambda value: 'null' if value is None else f'"{value}"'
+    return lambda value: f'"{value}"'
+
+
+def decimal_formatter(field):
+    """ Return a formatter for Decimal values, quantized like serializers.DecimalField"""
+    quantum = Decimal(1).scaleb(-field.decimal_places)
+    if getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING):
+        def format_decimal(value):
+            return f'"{value.quantize(quantum):f}"'
+    else:
+        def format_decimal(value):
+            return json.dumps(value.quantize(quantum), cls=JSONEncoder)
+    if field.allow_null:
+        return lambda value: 'null' if value is None else format_decimal(value)
+    return format_decimal
+
+
+class RowEncoder:
+    """
+    JSON encoder for model rows, compiled once from a serializer's fields.
+    Rows are any objects exposing the field sources as attributes, e.g. named
+    values_list tuples, and encode to the bytes the serializer and JSONRenderer
+    produce. Only the field types the Donuts serializer uses are supported.
+    """
+
+    def __init__(self, serializer, renderer=None):
+        renderer = renderer or JSONRenderer()
+        encode_string = encode_basestring_ascii if renderer.ensure_ascii else encode_basestring
+        self.separators = (',', ':') if renderer.compact else (', ', ': ')
+        self.encoder = JSONEncoder(ensure_ascii=renderer.ensure_ascii,
+                                   allow_nan=not renderer.strict, separators=self.separators)
+        self.names = list(serializer.fields)
+        self.fields = []
+        formatters = []
+        for name, field in serializer.fields.items():
+            if isinstance(field, serializers.UUIDField):
+                formatters.append(uuid_formatter(field.allow_null))
+            elif isinstance(field, serializers.DecimalField):
+                formatters.append(decimal_formatter(field))
+            elif isinstance(field, serializers.CharField):
+                formatters.append(string_formatter(encode_string, field.allow_null))
+            else:
+                raise TypeError(f'No row formatter for {field.__class__.__name__} {name}')
+            self.fields.append(field.source)
+        item_separator, key_separator = self.separators
+        self.template = '{' + item_separator.join(
+            encode_string(name) + key_separator + '%s' for name in self.names) + '}'
+        self.formatters = tuple(zip(self.fields, formatters))
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    def encode_row(self, row):
+        """ Encode one row as a JSON object string"""
+        return self.template % tuple(format_value(getattr(row, name))
+                                     for name, format_value in self.formatters)
+
+    def encode_rows(self, rows):
+        """ Encode rows as a JSON array string, None rows as null"""
+        return '[' + self.separators[0].join(
+            'null' if row is None else self.encode_row(row) for row in rows) + ']'
+
+    def encode_envelope(self, envelope, rows, rows_key='results'):
+        """ Encode a dict holding the encoded rows under `rows_key`, e.g. a paginated response"""
+        item_separator, key_separator = self.separators
+        parts = []
+        for key, value in envelope.items():
+            encoded = self.encode_rows(rows) if key == rows_key else self.encoder.encode(value)
+            parts.append(self.encoder.encode(key) + key_separator + encoded)
+        return '{' + item_separator.join(parts) + '}'
+
+    @staticmethod
+    def to_bytes(document):
+        """ Finish a document like JSONRenderer, escaping the javascript line separators"""
+        return document.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029').encode()
+
+
+@functools.lru_cache(maxsize=None)
+def get_donut_row_encoder(fields=None):
+    """ Return the shared RowEncoder of DonutSerializer, or of a sparse fieldset tuple"""
+    return RowEncoder(DonutSerializer(fields=fields))
@@ -0,0 +1,69 @@
+""" Module for streaming exports of the donut catalog"""
+import csv
+import json
+import logging
+import time
+from django.db import transaction
+from dronut_app.models import Donuts
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FIELDS = ['id', 'donut_code', 'description', 'price_per_unit']
+EXPORT_CHUNK_SIZE = 2000
+
+
+class LineBuffer:
+    """ File-like object handing back what csv.writer writes"""
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    @staticmethod
+    def write(value):
+        """ Return the written value instead of storing it"""
+        return value
+
+
+def format_ndjson(row):
+    """ Format a values row as one JSON line"""
+    donut_id, donut_code, description, price_per_unit = row
+    return json.dumps({'id': str(donut_id), 'donut_code': donut_code,
+                       'description': description,
+                       'price_per_unit': str(price_per_unit)}) + '\n'
+
+
+def csv_formatter():
+    """ Return a function formatting a values row as one CSV line"""
+    writer = csv.writer(LineBuffer())
+    return writer.writerow
+
+
+def export_rows(queryset=None, export_format='ndjson', chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield the donut catalog as encoded chunks of NDJSON or CSV lines.
+    Rows are read with a chunked iterator inside one transaction, so memory stays
+    constant and the export reflects a single snapshot of the table
+    """
+    queryset = Donuts.objects.all() if queryset is None else queryset
+    if export_format == 'csv':
+        format_row = csv_formatter()
+        header = format_row(EXPORT_FIELDS)
+    else:
+        format_row = format_ndjson
+        header = ''
+    rows = queryset.order_by('donut_code').values_list(*EXPORT_FIELDS)
+    row_count = 0
+    started = time.monotonic()
+    with transaction.atomic(using=queryset.db):
+        lines = [header] if header else []
+        for row in rows.iterator(chunk_size=chunk_size):
+            lines.append(format_row(row))
+            row_count += 1
+            if len(lines) >= chunk_size:
+                yield ''.join(lines).encode('utf-8')
+                lines = []
+        if lines:
+            yield ''.join(lines).encode('utf-8')
+    elapsed = time.monotonic() - started
+    logger.info('Exported %d donuts as %s in %.2fs (%.0f rows/s)', row_count, export_format,
+                elapsed, row_count / elapsed if elapsed else 0)
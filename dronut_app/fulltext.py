@@ -0,0 +1,96 @@
+""" Module for the SQLite FTS5 full-text index of donut codes and descriptions"""
+import re
+from django.db import models
+
+SEARCH_TABLE = 'donuts_fts'
+# one row per donut, the rowid mirrors the rowid of the donut in the donuts table
+CREATE_SEARCH_TABLE = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+    donut_id UNINDEXED, donut_code, description,
+    tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+)"""
+INDEX_ROW = (f"INSERT INTO {SEARCH_TABLE}(rowid, donut_id, donut_code, description) "
+             "VALUES (new.rowid, new.id, new.donut_code, coalesce(new.description, ''));")
+UNINDEX_ROW = f"DELETE FROM {SEARCH_TABLE} WHERE rowid = old.rowid;"
+# triggers catch every write, including bulk_create and upserts which send no signals
+CREATE_SEARCH_TRIGGERS = (
+    f"CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_insert AFTER INSERT ON donuts "
+    f"BEGIN {INDEX_ROW} END",
+    f"CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_delete AFTER DELETE ON donuts "
+    f"BEGIN {UNINDEX_ROW} END",
+    f"CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_update "
+    f"AFTER UPDATE OF id, donut_code, description ON donuts "
+    f"BEGIN {UNINDEX_ROW} {INDEX_ROW} END",
+)
+DROP_SEARCH_INDEX = (
+    f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_insert",
+    f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_delete",
+    f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_update",
+    f"DROP TABLE IF EXISTS {SEARCH_TABLE}",
+)
+REBUILD_SEARCH_INDEX = (
+    f"DELETE FROM {SEARCH_TABLE}",
+    f"INSERT INTO {SEARCH_TABLE}(rowid, donut_id, donut_code, description) "
+    "SELECT rowid, id, donut_code, coalesce(description, '') FROM donuts",
+)
+
+
+class Match(models.Lookup):  # pylint: disable=abstract-method
+    """ FTS5 MATCH lookup, `document__match=query`"""
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', lhs_params + rhs_params
+
+
+class FullTextField(models.TextField):
+    """ The hidden column of an FTS5 table named after the table, supports __match"""
+
+
+FullTextField.register_lookup(Match)
+
+
+def create_search_index(connection):
+    """
+    Create the full-text table and its triggers and index the existing donuts.
+    SQLite rebuilds a table for some schema changes, which drops its triggers, so
+    migrations altering the donuts table run this again. VACUUM can renumber the
+    donuts rowids, run rebuild_search_index after it
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(CREATE_SEARCH_TABLE)
+        for statement in CREATE_SEARCH_TRIGGERS:
+            cursor.execute(statement)
+    rebuild_search_index(connection)
+
+
+def rebuild_search_index(connection):
+    """ Index every donut again"""
+    with connection.cursor() as cursor:
+        for statement in REBUILD_SEARCH_INDEX:
+            cursor.execute(statement)
+
+
+def drop_search_index(connection):
+    """ Drop the full-text table and its triggers"""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for statement in DROP_SEARCH_INDEX:
+            cursor.execute(statement)
+
+
+def search_query(text):
+    """
+    Build an FTS5 query matching every word of `text`, the last one as a prefix.
+    Words are quoted so the FTS5 query syntax in user input is never interpreted.
+    Returns None when `text` has no words
+    """
+    words = re.findall(r'\w+', text)
+    if not words:
+        return None
+    return ' '.join(f'"{word}"' for word in words) + '*'
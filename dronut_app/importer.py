@@ -0,0 +1,86 @@
+""" Module for streaming bulk imports of the donut catalog"""
+import csv
+import json
+import os
+from rest_framework import serializers
+from dronut_app.serializers import DonutBulkSerializer
+
+IMPORT_FORMATS = ('csv', 'ndjson')
+
+
+def detect_format(path):
+    """ Guess the import format from the file extension"""
+    return 'csv' if path.lower().endswith('.csv') else 'ndjson'
+
+
+def read_records(source, import_format, start=0):
+    """
+    Yield (record number, record, error) triples from an open text file.
+    The first `start` records are skipped without being parsed where possible
+    """
+    if import_format == 'csv':
+        for number, record in enumerate(csv.DictReader(source), 1):
+            if number > start:
+                yield number, record, None
+        return
+    number = 0
+    for line in source:
+        if not line.strip():
+            continue
+        number += 1
+        if number <= start:
+            continue
+        try:
+            yield number, json.loads(line), None
+        except ValueError as exc:
+            yield number, None, f'Invalid JSON: {exc}'
+
+
+def validate_records(records):
+    """ Validate the records of a (record number, record, error) stream"""
+    serializer = DonutBulkSerializer()
+    for number, record, error in records:
+        if error is None:
+            try:
+                record = serializer.run_validation(record)
+            except serializers.ValidationError as exc:
+                record, error = None, exc.detail
+        yield number, record, error
+
+
+class ImportCheckpoint:
+    """ Number of records of a source file already committed, persisted next to it"""
+
+    def __init__(self, path, source_path):
+        self.path = path
+        self.source = os.path.abspath(source_path)
+        self.source_size = os.path.getsize(source_path)
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    def load(self):
+        """
+        Return the number of committed records, 0 without a checkpoint.
+        Raises ValueError if the checkpoint belongs to another file
+        """
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path, encoding='utf-8') as checkpoint_file:
+            state = json.load(checkpoint_file)
+        if state.get('source') != self.source or state.get('size') != self.source_size:
+            raise ValueError(f'Checkpoint {self.path} does not match {self.source}')
+        return state['records']
+
+    def save(self, records):
+        """ Record the number of committed records, replacing the file atomically"""
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as checkpoint_file:
+            json.dump({'source': self.source, 'size': self.source_size, 'records': records},
+                      checkpoint_file)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        """ Remove the checkpoint once the import is complete"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
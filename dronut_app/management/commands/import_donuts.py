@@ -0,0 +1,68 @@
+""" Management command to stream a donut catalog file into the database"""
+import time
+from django.core.management.base import BaseCommand, CommandError
+from dronut_app.bulk import upsert_batch
+from dronut_app.importer import (IMPORT_FORMATS, ImportCheckpoint, detect_format, read_records,
+                                 validate_records)
+from dronut_app.pricing import batched
+
+DEFAULT_BATCH_SIZE = 5000
+
+
+class Command(BaseCommand):
+    """ Import donuts from a CSV or NDJSON file, resuming from a checkpoint after a failure"""
+    help = 'Stream donuts from a CSV or NDJSON file into the catalog, keyed by donut_code'
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', help='CSV or NDJSON file of donuts')
+        parser.add_argument('--format', choices=IMPORT_FORMATS,
+                            help='file format, guessed from the extension by default')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                            help='records written per transaction')
+        parser.add_argument('--checkpoint',
+                            help='checkpoint file, defaults to <file>.checkpoint')
+        parser.add_argument('--restart', action='store_true',
+                            help='ignore an existing checkpoint and import from the start')
+
+    def handle(self, *args, **options):
+        path = options['file']
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+        try:
+            checkpoint = ImportCheckpoint(options['checkpoint'] or path + '.checkpoint', path)
+            done = 0 if options['restart'] else checkpoint.load()
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc)) from exc
+        if done:
+            self.stdout.write(f'Resuming {path} after record {done}')
+
+        started = time.monotonic()
+        with open(path, newline='', encoding='utf-8') as source:
+            records = read_records(source, options['format'] or detect_format(path), start=done)
+            totals = self.import_records(validate_records(records), options['batch_size'],
+                                         checkpoint, started)
+        checkpoint.clear()
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {path}: {totals["created"]} created, {totals["updated"]} updated, '
+            f'{totals["failed"]} failed in {time.monotonic() - started:.2f}s'))
+
+    def import_records(self, records, batch_size, checkpoint, started):
+        """ Upsert validated records batch by batch, checkpointing after each commit"""
+        totals = {'created': 0, 'updated': 0, 'failed': 0, 'processed': 0}
+        for batch in batched(records, batch_size):
+            rows = []
+            for number, record, error in batch:
+                if error is None:
+                    rows.append(record)
+                else:
+                    totals['failed'] += 1
+                    self.stderr.write(f'Record {number}: {error}')
+            created, updated = upsert_batch(rows)
+            totals['created'] += created
+            totals['updated'] += updated
+            totals['processed'] += len(batch)
+            checkpoint.save(batch[-1][0])
+            elapsed = time.monotonic() - started
+            rate = totals['processed'] / elapsed if elapsed else 0
+            self.stdout.write(f'{batch[-1][0]} records ({rate:.0f} rows/s)')
+        return totals
@@ -0,0 +1,14 @@
+""" Management command to index every donut again in the full-text search table"""
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from dronut_app.fulltext import create_search_index
+
+
+class Command(BaseCommand):
+    """ Recreate the full-text search triggers and index every donut again"""
+    help = 'Rebuild the donuts full-text search index, run it after VACUUM or a manual restore'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            create_search_index(connection)
+        self.stdout.write(self.style.SUCCESS('Rebuilt the donuts full-text search index'))
@@ -0,0 +1,127 @@
+""" Module for in-process request metrics and their Prometheus text exposition"""
+import threading
+from collections import defaultdict
+
+# upper bounds of the histogram buckets
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+def escape_label(value):
+    """ Escape a label value for the Prometheus text format"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(labels):
+    """ Format a dict of labels as {name="value",...}"""
+    return '{' + ','.join(f'{name}="{escape_label(value)}"'
+                          for name, value in labels.items()) + '}'
+
+
+class Histogram:
+    """ Cumulative histogram of observed values, one series per label set"""
+
+    def __init__(self, name, documentation, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # label values -> [bucket counts..., sum, count]
+        self._series = defaultdict(lambda: [0] * len(self.buckets) + [0, 0])
+
+    def __str__(self):
+        return self.name
+
+    def observe(self, value, **labels):
+        """ Record one observation"""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series[key]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def collect(self):
+        """ Yield the exposition lines of the histogram"""
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} histogram'
+        with self._lock:
+            series = {key: list(values) for key, values in self._series.items()}
+        for key, values in sorted(series.items()):
+            labels = dict(key)
+            for bound, count in zip(self.buckets, values):
+                yield f'{self.name}_bucket{format_labels({**labels, "le": bound})} {count}'
+            yield f'{self.name}_bucket{format_labels({**labels, "le": "+Inf"})} {values[-1]}'
+            yield f'{self.name}_sum{format_labels(labels)} {values[-2]}'
+            yield f'{self.name}_count{format_labels(labels)} {values[-1]}'
+
+
+class Counter:
+    """ Monotonic counter, one series per label set"""
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self._lock = threading.Lock()
+        self._series = defaultdict(int)
+
+    def __str__(self):
+        return self.name
+
+    def inc(self, amount=1, **labels):
+        """ Add `amount` to the counter"""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._series[key] += amount
+
+    def collect(self):
+        """ Yield the exposition lines of the counter"""
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} counter'
+        with self._lock:
+            series = dict(self._series)
+        for key, value in sorted(series.items()):
+            yield f'{self.name}{format_labels(dict(key))} {value}'
+
+
+request_duration = Histogram('dronut_request_duration_seconds',
+                             'Wall time of a request by view', DURATION_BUCKETS)
+db_duration = Histogram('dronut_db_duration_seconds',
+                        'Time spent in database queries per request by view', DURATION_BUCKETS)
+db_queries = Histogram('dronut_db_queries', 'Database queries per request by view',
+                       QUERY_COUNT_BUCKETS)
+responses = Counter('dronut_responses_total', 'Responses by view and status code')
+
+REQUEST_METRICS = (request_duration, db_duration, db_queries, responses)
+
+
+def record_request(view, status, wall_time, db_time, query_count):
+    """ Record the measurements of one request"""
+    request_duration.observe(wall_time, view=view)
+    db_duration.observe(db_time, view=view)
+    db_queries.observe(query_count, view=view)
+    responses.inc(view=view, status=status)
+
+
+def collect_stats(name, documentation, stats):
+    """ Yield gauge lines for the numeric values of a stats dict, e.g. PriceCatalog.stats()"""
+    for key, value in sorted(stats.items()):
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield f'# HELP {name}_{key} {documentation} {key}'
+            yield f'# TYPE {name}_{key} gauge'
+            yield f'{name}_{key} {value}'
+
+
+def render_metrics(extra_stats=()):
+    """
+    Render every request metric, plus (name, documentation, stats dict) gauges,
+    in the Prometheus text format
+    """
+    lines = []
+    for metric in REQUEST_METRICS:
+        lines.extend(metric.collect())
+    for name, documentation, stats in extra_stats:
+        lines.extend(collect_stats(name, documentation, stats))
+    return '\n'.join(lines) + '\n'
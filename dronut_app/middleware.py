@@ -0,0 +1,96 @@
+""" Middleware for the Dronut App are defined here"""
+import asyncio
+import contextvars
+import time
+from django.db import connections
+from django.utils.decorators import sync_and_async_middleware
+from dronut_app.metrics import record_request
+
+UNRESOLVED_VIEW = 'unresolved'
+
+
+class QueryTimer:
+    """ Database execute wrapper counting queries and the time spent in them"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    def __call__(self, execute, sql, params, many, context):  # pylint: disable=too-many-arguments
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+
+
+# timer of the request being served, sync_to_async copies it to the thread running
+# the queries of an async request
+current_timer = contextvars.ContextVar('dronut_query_timer', default=None)
+
+
+def timed_execute(execute, sql, params, many, context):  # pylint: disable=too-many-arguments
+    """ Execute wrapper of every connection, timing the query with the current timer"""
+    timer = current_timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    return timer(execute, sql, params, many, context)
+
+
+def install_query_timer(connection, **kwargs):  # pylint: disable=unused-argument
+    """ Add timed_execute to a connection's execute wrappers, once"""
+    if timed_execute not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, timed_execute)
+
+
+def start_request():
+    """ Start timing a request, returns its QueryTimer and the context token to reset"""
+    # connections opened before the connection_created receiver was connected
+    for connection in connections.all(initialized_only=True):
+        install_query_timer(connection)
+    timer = QueryTimer()
+    return timer, current_timer.set(timer)
+
+
+def finish_request(request, response, started, timer):
+    """ Record the request metrics and add the Server-Timing header"""
+    wall_time = time.perf_counter() - started
+    match = getattr(request, 'resolver_match', None)
+    view = match.view_name if match is not None else UNRESOLVED_VIEW
+    record_request(view, response.status_code, wall_time, timer.duration, timer.count)
+    response['Server-Timing'] = (f'total;dur={wall_time * 1000:.2f}, '
+                                 f'db;dur={timer.duration * 1000:.2f};desc="{timer.count} queries"')
+    return response
+
+
+@sync_and_async_middleware
+def performance_middleware(get_response):
+    """
+    Record wall time, database time and query count per resolved URL name.
+    Queries are timed by an execute wrapper on every connection, with the timer
+    of the request held in a context variable, so under ASGI the queries an
+    async view runs in worker threads are counted too
+    """
+    if asyncio.iscoroutinefunction(get_response):
+        async def middleware(request):
+            timer, token = start_request()
+            started = time.perf_counter()
+            try:
+                response = await get_response(request)
+            finally:
+                current_timer.reset(token)
+            return finish_request(request, response, started, timer)
+    else:
+        def middleware(request):
+            timer, token = start_request()
+            started = time.perf_counter()
+            try:
+                response = get_response(request)
+            finally:
+                current_timer.reset(token)
+            return finish_request(request, response, started, timer)
+    return middleware
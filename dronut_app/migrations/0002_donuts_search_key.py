@@ -0,0 +1,26 @@
+# Generated by Django 4.1.2 on 2026-10-18 15:47
+
+from django.db import migrations, models
+
+
+def populate_search_key(apps, schema_editor):
+    """ Fill the search key of existing donuts"""
+    donuts_model = apps.get_model('dronut_app', 'Donuts')
+    for donut in donuts_model.objects.only('id', 'donut_code').iterator():
+        donuts_model.objects.filter(id=donut.id).update(search_key=donut.donut_code.upper())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dronut_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='donuts',
+            name='search_key',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=150),
+        ),
+        migrations.RunPython(populate_search_key, migrations.RunPython.noop),
+    ]
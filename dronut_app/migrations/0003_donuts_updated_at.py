@@ -0,0 +1,20 @@
+# Generated by Django 4.1.2 on 2026-10-18 16:40
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dronut_app', '0002_donuts_search_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='donuts',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.1.2 on 2026-10-18 16:21
+
+from django.db import migrations, models
+import django.db.models.deletion
+import dronut_app.fulltext
+
+
+def create_search_index(apps, schema_editor):  # pylint: disable=unused-argument
+    """ Create the FTS5 table and triggers and index the existing donuts"""
+    dronut_app.fulltext.create_search_index(schema_editor.connection)
+
+
+def drop_search_index(apps, schema_editor):  # pylint: disable=unused-argument
+    """ Drop the FTS5 table and triggers"""
+    dronut_app.fulltext.drop_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dronut_app', '0003_donuts_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DonutSearch',
+            fields=[
+                ('donut', models.OneToOneField(db_column='donut_id', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='dronut_app.donuts')),
+                ('donut_code', models.TextField()),
+                ('description', models.TextField()),
+                ('document', dronut_app.fulltext.FullTextField(db_column='donuts_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'donuts_fts',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.1.2 on 2026-10-18 16:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dronut_app', '0004_donuts_fulltext_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DonutChange',
+            fields=[
+                ('seq', models.BigAutoField(primary_key=True, serialize=False)),
+                ('action', models.CharField(choices=[('create', 'Create'), ('update', 'Update'), ('delete', 'Delete')], max_length=6)),
+                ('donut_id', models.UUIDField()),
+                ('donut_code', models.CharField(max_length=50)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('price_per_unit', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('changed_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'donut change',
+                'verbose_name_plural': 'donut changes',
+                'db_table': 'donut_changes',
+            },
+        ),
+    ]
@@ -1,6 +1,7 @@
 """ Models are defined here"""
 import uuid
 from django.db import models
+from dronut_app.fulltext import FullTextField, SEARCH_TABLE
 
 
 # Create your models here.
@@ -12,8 +13,63 @@ class Donuts(models.Model):
     donut_code = models.CharField(max_length=50, verbose_name='Donut Code', unique=True)
     description = models.TextField(blank=True, null=True)
     price_per_unit = models.DecimalField(decimal_places=2, max_digits=12)
+    # upper cased donut code, indexed for case-insensitive prefix searches
+    search_key = models.CharField(max_length=150, db_index=True, editable=False, default='')
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         db_table = 'donuts'
         verbose_name = 'donut'
         verbose_name_plural = 'donuts'
+
+    @staticmethod
+    def search_key_for(donut_code):
+        """ Return the normalized search key of a donut code"""
+        return donut_code.upper()
+
+    def save(self, *args, **kwargs):
+        self.search_key = self.search_key_for(self.donut_code)
+        super().save(*args, **kwargs)
+
+
+class DonutSearch(models.Model):
+    """
+    Row of the donuts_fts full-text index, created and maintained in the
+    database by triggers on the donuts table, see dronut_app.fulltext
+    """
+    donut = models.OneToOneField(Donuts, primary_key=True, db_column='donut_id',
+                                 related_name='search_entry', on_delete=models.DO_NOTHING)
+    donut_code = models.TextField()
+    description = models.TextField()
+    # hidden FTS5 columns, the table named column takes MATCH queries
+    document = FullTextField(db_column=SEARCH_TABLE)
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = SEARCH_TABLE
+
+
+class DonutChange(models.Model):
+    """
+    One create, update or delete of a donut with the values it left behind,
+    numbered by `seq` in the order the changes were made, see dronut_app.changes
+    """
+    CREATE = 'create'
+    UPDATE = 'update'
+    DELETE = 'delete'
+    ACTION_CHOICES = [(CREATE, 'Create'), (UPDATE, 'Update'), (DELETE, 'Delete')]
+
+    seq = models.BigAutoField(primary_key=True)
+    action = models.CharField(max_length=6, choices=ACTION_CHOICES)
+    # no foreign key, the changes of a deleted donut are kept
+    donut_id = models.UUIDField()
+    donut_code = models.CharField(max_length=50)
+    description = models.TextField(blank=True, null=True)
+    price_per_unit = models.DecimalField(decimal_places=2, max_digits=12)
+    changed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'donut_changes'
+        verbose_name = 'donut change'
+        verbose_name_plural = 'donut changes'
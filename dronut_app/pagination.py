@@ -0,0 +1,33 @@
+""" Pagination classes for the Dronut API are defined here"""
+from rest_framework import pagination
+from dronut_app.search import SEARCH_RANK
+
+# query parameters which select the legacy limit/offset pagination
+OFFSET_PAGINATION_PARAMS = ('limit', 'offset')
+
+
+class DonutCursorPagination(pagination.CursorPagination):
+    """
+    Keyset pagination on the unique, indexed donut_code.
+    Pages are fetched with an index seek instead of an OFFSET scan and no total
+    count is computed, so deep pages cost the same as the first one.
+    """
+    ordering = 'donut_code'
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+
+class DonutSearchCursorPagination(DonutCursorPagination):
+    """ Keyset pagination of full-text search results, best rank first"""
+    ordering = (SEARCH_RANK, 'donut_code')
+
+
+class DonutLimitOffsetPagination(pagination.LimitOffsetPagination):
+    """ Limit/offset pagination kept for existing clients, with a stable ordering"""
+    ordering = 'donut_code'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not queryset.ordered:
+            queryset = queryset.order_by(self.ordering)
+        return super().paginate_queryset(queryset, request, view)
@@ -0,0 +1,265 @@
+""" Module for the memory-mapped price table shared by worker processes"""
+import bisect
+import contextlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import uuid
+from array import array
+from decimal import Decimal
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from dronut_app.catalog import get_catalog_version, price_catalog
+from dronut_app.models import Donuts
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover, no cross process build lock on Windows
+    fcntl = None
+
+TABLE_MAGIC = b'DRPT'
+TABLE_FORMAT = 1
+# magic, format, code width, row count, catalog version, price decimal places
+TABLE_HEADER = struct.Struct('<4sHHQQI4x')
+ID_WIDTH = 16
+
+
+def table_layout(count, code_width):
+    """ Offsets of the price, id and code arrays of a table of `count` rows"""
+    prices_offset = TABLE_HEADER.size
+    ids_offset = prices_offset + 8 * count
+    codes_offset = ids_offset + ID_WIDTH * count
+    return prices_offset, ids_offset, codes_offset, codes_offset + code_width * count
+
+
+def write_price_table(path, queryset, version):
+    """
+    Write the prices of `queryset` to the table file at `path`, labelled `version`.
+    The table is written to a temporary file in the same folder and renamed over
+    `path`, so readers only ever map a complete table. Processes which mapped the
+    previous table keep reading it until they map the new one
+    """
+    places = queryset.model._meta.get_field('price_per_unit').decimal_places
+    rows = sorted((donut_code.encode('utf-8'), int(price_per_unit.scaleb(places)), donut_id)
+                  for donut_code, price_per_unit, donut_id
+                  in queryset.values_list('donut_code', 'price_per_unit', 'id').iterator())
+    code_width = max((len(code) for code, _, _ in rows), default=0)
+    # native byte order, the table is read on the machine that wrote it
+    prices = array('q', (price for _, price, _ in rows))
+    folder = os.path.dirname(os.path.abspath(path))
+    with tempfile.NamedTemporaryFile(dir=folder, prefix='.price-table-', delete=False) as table:
+        try:
+            table.write(TABLE_HEADER.pack(TABLE_MAGIC, TABLE_FORMAT, code_width, len(rows),
+                                          version, places))
+            table.write(prices.tobytes())
+            table.writelines(donut_id.bytes for _, _, donut_id in rows)
+            # codes are padded with NUL, which sorts before every character of a code
+            table.writelines(code.ljust(code_width, b'\0') for code, _, _ in rows)
+            table.flush()
+            os.fsync(table.fileno())
+        except BaseException:
+            os.unlink(table.name)
+            raise
+    os.replace(table.name, path)
+    return len(rows)
+
+
+class CodeColumn:
+    """ Sequence view of the fixed width codes of a mapped table, for bisect"""
+
+    def __init__(self, buffer, offset, width, count):
+        self.buffer = buffer
+        self.offset = offset
+        self.width = width
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        start = self.offset + index * self.width
+        return self.buffer[start:start + self.width]
+
+
+class PriceTable:
+    """
+    A price table file mapped read-only. Rows are sorted by donut code and
+    found by binary search, prices are fixed-point integers in steps of
+    `scale`. The pages are shared by every process mapping the file
+    """
+
+    def __init__(self, buffer):
+        magic, table_format, code_width, count, version, places = \
+            TABLE_HEADER.unpack_from(buffer)
+        if magic != TABLE_MAGIC or table_format != TABLE_FORMAT:
+            raise ValueError('Not a price table')
+        self.buffer = buffer
+        self.version = version
+        self.code_width = code_width
+        self.scale = Decimal((0, (1,), -places))
+        prices_offset, self.ids_offset, codes_offset, size = table_layout(count, code_width)
+        if len(buffer) < size:
+            raise ValueError('Truncated price table')
+        self.prices = memoryview(buffer)[prices_offset:self.ids_offset].cast('q')
+        self.codes = CodeColumn(buffer, codes_offset, code_width, count)
+
+    def __len__(self):
+        return len(self.codes)
+
+    @classmethod
+    def open(cls, path):
+        """ Map the table file at `path`, None when there is no readable table"""
+        try:
+            with open(path, 'rb') as table:
+                return cls(mmap.mmap(table.fileno(), 0, access=mmap.ACCESS_READ))
+        except (OSError, ValueError, struct.error):
+            return None
+
+    def index_of(self, donut_code):
+        """ Row of `donut_code`, None when the code is not in the table"""
+        key = donut_code.encode('utf-8')
+        if len(key) > self.code_width:
+            return None
+        key = key.ljust(self.code_width, b'\0')
+        index = bisect.bisect_left(self.codes, key)
+        if index < len(self.codes) and self.codes[index] == key:
+            return index
+        return None
+
+    def price_at(self, index):
+        """ Price per unit of a row"""
+        return self.scale * self.prices[index]
+
+    def id_at(self, index):
+        """ Donut id of a row"""
+        start = self.ids_offset + index * ID_WIDTH
+        return uuid.UUID(bytes=self.buffer[start:start + ID_WIDTH])
+
+    def lookup_units(self, donut_codes):
+        """ Return a dict of code -> fixed-point price for the known codes in `donut_codes`"""
+        units = {}
+        for donut_code in set(donut_codes):
+            index = self.index_of(donut_code)
+            if index is not None:
+                units[donut_code] = self.prices[index]
+        return units
+
+
+@contextlib.contextmanager
+def build_lock(path):
+    """ Hold an exclusive lock on `path` across processes, where the OS supports it"""
+    if fcntl is None:
+        yield
+        return
+    with open(path, 'a', encoding='utf-8') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+class SharedPriceTable:
+    """
+    Price lookups from a price table file shared by the workers of a server.
+    The table is rebuilt from the database, by whichever worker first sees a
+    new catalog version, and mapped again by the others. It needs a cache shared
+    by the workers to hold the catalog version, see dronut_app.checks. Counters:
+    hits   - codes found in the table
+    misses - codes not found in the table
+    builds - number of times this process wrote the table
+    """
+
+    def __init__(self, path, queryset=None):
+        self.path = path
+        self.queryset = Donuts.objects.all() if queryset is None else queryset
+        self._lock = threading.Lock()
+        self._table = None
+        self.hits = 0
+        self.misses = 0
+        self.builds = 0
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    def _map(self, version):
+        """ Map the table of `version`, writing it first when the file is older"""
+        table = PriceTable.open(self.path)
+        if table is None or table.version != version:
+            # one worker writes the table, the others wait and map its file
+            with build_lock(self.path + '.lock'):
+                table = PriceTable.open(self.path)
+                if table is None or table.version != version:
+                    write_price_table(self.path, self.queryset, version)
+                    self.builds += 1
+                    table = PriceTable.open(self.path)
+        return table
+
+    def refresh(self):
+        """ Map the table again if the shared version moved, returns the table"""
+        version = get_catalog_version()
+        table = self._table
+        if table is None or table.version != version:
+            with self._lock:
+                table = self._table
+                if table is None or table.version != version:
+                    # readers still holding the old table keep a valid mapping
+                    table = self._table = self._map(version)
+        return table
+
+    def lookup_units(self, donut_codes):
+        """
+        Return the prices of the known codes in `donut_codes` as a
+        (code -> integer units dict, scale) tuple, see PricingEngine.lookup_units
+        """
+        donut_codes = set(donut_codes)
+        table = self.refresh()
+        units = table.lookup_units(donut_codes)
+        self.hits += len(units)
+        self.misses += len(donut_codes) - len(units)
+        return units, table.scale
+
+    async def alookup_units(self, donut_codes):
+        """ Async version of lookup_units"""
+        await self.arefresh()
+        return self.lookup_units(donut_codes)
+
+    async def arefresh(self):
+        """ Async refresh, only mapping a new table leaves the event loop"""
+        table = self._table
+        if table is None or table.version != get_catalog_version():
+            table = await sync_to_async(self.refresh)()
+        return table
+
+    def stats(self):
+        """ Return the table counters"""
+        table = self._table
+        return {
+            'version': None if table is None else table.version,
+            'size': 0 if table is None else len(table),
+            'bytes': 0 if table is None else len(table.buffer),
+            'hits': self.hits,
+            'misses': self.misses,
+            'builds': self.builds,
+        }
+
+
+# the table of this worker process, when settings.DRONUT_PRICE_TABLE names its file
+shared_price_table = SharedPriceTable(settings.DRONUT_PRICE_TABLE) \
+    if settings.DRONUT_PRICE_TABLE else None
+
+
+def get_price_catalog():
+    """ The catalog quotes read prices from, the shared price table when configured"""
+    return price_catalog if shared_price_table is None else shared_price_table
+
+
+def get_donut_catalog():
+    """
+    The catalog detail reads and autocomplete are served from, None when the shared
+    price table is configured. The table only holds codes, ids and prices, so they
+    read the database then instead of loading a full catalog in every worker
+    """
+    return price_catalog if shared_price_table is None else None
@@ -0,0 +1,261 @@
+""" Module for pricing donut quotes with bulk catalog lookups"""
+from decimal import Decimal, getcontext
+from operator import itemgetter, mul
+from django.db import connections
+from dronut_app.models import Donuts
+
+ERROR_UNKNOWN_CODE = 'Unknown donut code'
+ERROR_MISSING_CODE = 'Missing donut code'
+ERROR_BAD_QUANTITY = 'Quantity must be a positive integer'
+ERROR_BAD_LINE = 'Line item must be an object'
+ERROR_BAD_CART = 'Cart must be an object with a donuts list'
+
+
+def batched(values, size):
+    """ Yield successive lists of at most `size` items from `values`"""
+    batch = []
+    for value in values:
+        batch.append(value)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def price_scale(model):
+    """ Smallest price step of a model's price_per_unit field, e.g. Decimal('0.01')"""
+    return Decimal((0, (1,), -model._meta.get_field('price_per_unit').decimal_places))
+
+
+def price_lines_in_units(parsed_lines, units):
+    """
+    Price parsed cart lines from integer unit prices.
+    Returns the codes of the priced lines, their line values in units and the
+    quote errors of the other lines, each in cart order
+    """
+    donut_codes = [donut_code for donut_code, _, error in parsed_lines
+                   if error is None and donut_code in units]
+    if len(donut_codes) == len(parsed_lines):
+        quantities = list(map(itemgetter(1), parsed_lines))
+        quote_errors = []
+    else:
+        quantities = [quantity for donut_code, quantity, error in parsed_lines
+                      if error is None and donut_code in units]
+        quote_errors = [{'line': line, 'donut_code': donut_code,
+                         'error': error or ERROR_UNKNOWN_CODE}
+                        for line, (donut_code, _, error) in enumerate(parsed_lines)
+                        if error is not None or donut_code not in units]
+    line_units = list(map(mul, map(units.__getitem__, donut_codes), quantities))
+    return donut_codes, line_units, quote_errors
+
+
+class QuoteTotal:
+    """
+    Running total of quote line values in integer units of `scale`, 0 until a
+    line is added. While no running total can outgrow the Decimal precision the
+    units are summed exactly, after that the Decimal line values are added up in
+    order, so the total rounds like adding the line values one by one does
+    """
+
+    def __init__(self, scale):
+        self.scale = scale
+        self.limit = 10 ** getcontext().prec
+        self.units = 0
+        self.size = 0
+        self.lines = 0
+        self.inexact_total = None
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    def add(self, line_units, line_values):
+        """ Add lines given as integer units and the matching Decimal values, in cart order"""
+        if not line_units:
+            return
+        if self.inexact_total is None:
+            self.size += sum(line_units) if min(line_units) >= 0 else sum(map(abs, line_units))
+            if self.size < self.limit:
+                self.units += sum(line_units)
+                self.lines += len(line_units)
+                return
+            self.inexact_total = self.value
+        self.inexact_total = sum(line_values, self.inexact_total)
+        self.lines += len(line_units)
+
+    @property
+    def value(self):
+        """ The total so far"""
+        if self.inexact_total is not None:
+            return self.inexact_total
+        return self.scale * self.units if self.lines else 0
+
+
+def parse_cart_line(donut_item):
+    """
+    Validate a single cart line.
+    Returns a (donut_code, quantity, error) tuple where error is None for a valid line
+    """
+    if not isinstance(donut_item, dict):
+        return None, None, ERROR_BAD_LINE
+    donut_code = donut_item.get('donut_code')
+    if not isinstance(donut_code, str) or not donut_code:
+        return None, None, ERROR_MISSING_CODE
+    quantity = donut_item.get('quantity')
+    # bool is a subclass of int, but True is not a quantity
+    if not isinstance(quantity, int) or isinstance(quantity, bool) or quantity < 1:
+        return donut_code, None, ERROR_BAD_QUANTITY
+    return donut_code, quantity, None
+
+
+class PricingEngine:
+    """
+    Price carts of donuts.
+    All codes of a cart are resolved with one bulk lookup, so the number of
+    queries does not grow with the number of cart lines. When a `catalog` is
+    given prices are read from it instead of the database.
+    """
+
+    def __init__(self, queryset=None, catalog=None):
+        self.queryset = Donuts.objects.all() if queryset is None else queryset
+        self.catalog = catalog
+        self.price_scale = price_scale(self.queryset.model)
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    def lookup_prices(self, donut_codes):
+        """ Read the prices of donut codes from the database, returns a dict of code -> price"""
+        donut_codes = sorted(set(donut_codes))
+        if not donut_codes:
+            return {}
+        # stay below the backend limit on query parameters, one query per batch
+        batch_size = connections[self.queryset.db].features.max_query_params or len(donut_codes)
+        prices = {}
+        for codes in batched(donut_codes, batch_size):
+            prices.update(self.queryset.filter(donut_code__in=codes)
+                          .values_list('donut_code', 'price_per_unit'))
+        return prices
+
+    async def alookup_prices(self, donut_codes):
+        """ Async version of lookup_prices"""
+        donut_codes = sorted(set(donut_codes))
+        if not donut_codes:
+            return {}
+        batch_size = connections[self.queryset.db].features.max_query_params or len(donut_codes)
+        prices = {}
+        for codes in batched(donut_codes, batch_size):
+            rows = self.queryset.filter(donut_code__in=codes).values_list('donut_code',
+                                                                          'price_per_unit')
+            async for donut_code, price_per_unit in rows:
+                prices[donut_code] = price_per_unit
+        return prices
+
+    def to_units(self, prices):
+        """ Convert prices read from the price_per_unit field to integer units"""
+        steps = 1 / self.price_scale
+        return ({donut_code: int(price * steps) for donut_code, price in prices.items()},
+                self.price_scale)
+
+    def lookup_units(self, donut_codes):
+        """
+        Resolve donut codes to their price per unit in integer units, returns a
+        (code -> units dict, scale) tuple, e.g. Decimal('8.50') is 850 units of
+        Decimal('0.01')
+        """
+        if self.catalog is not None:
+            return self.catalog.lookup_units(donut_codes)
+        return self.to_units(self.lookup_prices(donut_codes))
+
+    async def alookup_units(self, donut_codes):
+        """ Async version of lookup_units"""
+        if self.catalog is not None:
+            return await self.catalog.alookup_units(donut_codes)
+        return self.to_units(await self.alookup_prices(donut_codes))
+
+    @staticmethod
+    def parse_cart(cart_lines):
+        """ Validate every line of a cart, returns the parsed lines and the valid codes"""
+        if not isinstance(cart_lines, list):
+            raise TypeError('donuts must be a list of line items')
+        parsed_lines = [parse_cart_line(donut_item) for donut_item in cart_lines]
+        donut_codes = [donut_code for donut_code, _, error in parsed_lines if error is None]
+        return parsed_lines, donut_codes
+
+    def quote(self, cart_lines):
+        """
+        Build a quote for `cart_lines`, a list of {'donut_code', 'quantity'} dicts.
+        Invalid lines are reported in quote_errors with their position in the cart
+        """
+        parsed_lines, donut_codes = self.parse_cart(cart_lines)
+        return self.price_lines(parsed_lines, donut_codes)
+
+    def price_lines(self, parsed_lines, donut_codes):
+        """ Build the quote of parsed cart lines, resolving the prices of `donut_codes`"""
+        return self.build_quote_units(parsed_lines, *self.lookup_units(donut_codes))
+
+    def quote_batch(self, carts):
+        """
+        Build the quotes of many carts, each a {'donuts': [...]} dict, in input order.
+        The codes of every cart are resolved together with one lookup, a cart that
+        cannot be read gets an error entry instead of a quote
+        """
+        if not isinstance(carts, list):
+            raise TypeError('carts must be a list of carts')
+        parsed_carts = []
+        donut_codes = set()
+        for cart in carts:
+            try:
+                parsed_lines, cart_codes = self.parse_cart(cart['donuts'])
+            except (KeyError, TypeError):
+                parsed_carts.append(None)
+                continue
+            parsed_carts.append(parsed_lines)
+            donut_codes.update(cart_codes)
+        units, scale = self.lookup_units(donut_codes)
+        return [self.build_quote_units(parsed_lines, units, scale) if parsed_lines is not None
+                else {'error': ERROR_BAD_CART, 'info': 'Error encountered'}
+                for parsed_lines in parsed_carts]
+
+    async def aquote(self, cart_lines):
+        """ Async version of quote"""
+        parsed_lines, donut_codes = self.parse_cart(cart_lines)
+        return self.build_quote_units(parsed_lines, *await self.alookup_units(donut_codes))
+
+    @staticmethod
+    def build_quote_units(parsed_lines, units, scale):
+        """
+        Build the quote response from parsed cart lines and prices in integer units
+        of `scale`, as returned by lookup_units. Line values and the total are
+        computed over lists of integer units, each line value only becomes a
+        Decimal for the response
+        """
+        donut_codes, line_units, quote_errors = price_lines_in_units(parsed_lines, units)
+        # scale * units rounds like price * quantity when a value outgrows the precision
+        quote_line_item = [{'donut_code': donut_code, 'line_value': line_value}
+                           for donut_code, line_value
+                           in zip(donut_codes, map(scale.__mul__, line_units))]
+        quote_total = QuoteTotal(scale)
+        quote_total.add(line_units, map(itemgetter('line_value'), quote_line_item))
+        return {'quote_line_item': quote_line_item,
+                'quote_total': quote_total.value,
+                'quote_errors': quote_errors}
+
+    @staticmethod
+    def build_quote_decimal(parsed_lines, prices):
+        """ Build the quote response with Decimal arithmetic, line by line"""
+        quote_line_item = []
+        quote_errors = []
+        quote_total = 0
+        for line, (donut_code, quantity, error) in enumerate(parsed_lines):
+            if error is None and donut_code not in prices:
+                error = ERROR_UNKNOWN_CODE
+            if error is not None:
+                quote_errors.append({'line': line, 'donut_code': donut_code, 'error': error})
+                continue
+            line_value = prices[donut_code] * quantity
+            quote_line_item.append({'donut_code': donut_code, 'line_value': line_value})
+            quote_total += line_value
+        return {'quote_line_item': quote_line_item,
+                'quote_total': quote_total,
+                'quote_errors': quote_errors}
@@ -0,0 +1,92 @@
+""" Module for memoizing quotes by a canonical cart fingerprint"""
+import hashlib
+import json
+from django.core.cache import caches
+from dronut_app.catalog import get_catalog_version
+from dronut_app.pricing import ERROR_UNKNOWN_CODE
+
+QUOTE_CACHE_ALIAS = 'quotes'
+
+
+def cart_fingerprint(parsed_lines, catalog_version):
+    """
+    Return the cache key of a cart, a hash of its sorted (donut_code, quantity) pairs.
+    The catalog version is part of the key, so a price change retires every entry
+    """
+    pairs = sorted((donut_code, quantity) for donut_code, quantity, _ in parsed_lines)
+    digest = hashlib.sha256(json.dumps(pairs).encode('utf-8')).hexdigest()
+    return f'quote:{catalog_version}:{digest}'
+
+
+class QuoteMemo:
+    """
+    Quote results memoized in the Django cache.
+    An entry maps each (donut_code, quantity) pair of the cart to its line value,
+    so carts holding the same lines in another order share it. Carts with invalid
+    lines are priced without the cache.
+    """
+
+    def __init__(self, cache_alias=QUOTE_CACHE_ALIAS):
+        self.cache_alias = cache_alias
+        self.hits = 0
+        self.misses = 0
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    @property
+    def cache(self):
+        """ The Django cache holding the quotes"""
+        return caches[self.cache_alias]
+
+    def quote(self, pricing_engine, cart_lines):
+        """ Return the quote of `cart_lines`, from the cache when the same cart was priced"""
+        parsed_lines, donut_codes = pricing_engine.parse_cart(cart_lines)
+        if len(donut_codes) != len(parsed_lines):
+            return pricing_engine.price_lines(parsed_lines, donut_codes)
+        key = cart_fingerprint(parsed_lines, get_catalog_version())
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.hits += 1
+            return self.build_quote(parsed_lines, *cached)
+        self.misses += 1
+        quote = pricing_engine.price_lines(parsed_lines, donut_codes)
+        # every line of the cart is valid, so each is either a line item or an unknown code
+        unknown_lines = {error['line'] for error in quote['quote_errors']}
+        line_items = iter(quote['quote_line_item'])
+        line_values = {}
+        for line, (donut_code, quantity, _) in enumerate(parsed_lines):
+            line_values[(donut_code, quantity)] = \
+                None if line in unknown_lines else next(line_items)['line_value']
+        self.cache.set(key, (line_values, quote['quote_total']))
+        return quote
+
+    @staticmethod
+    def build_quote(parsed_lines, line_values, quote_total):
+        """ Rebuild a quote in the cart's line order from a cached entry"""
+        quote_line_item = []
+        quote_errors = []
+        for line, (donut_code, quantity, _) in enumerate(parsed_lines):
+            line_value = line_values[(donut_code, quantity)]
+            if line_value is None:
+                quote_errors.append({'line': line, 'donut_code': donut_code,
+                                     'error': ERROR_UNKNOWN_CODE})
+            else:
+                quote_line_item.append({'donut_code': donut_code, 'line_value': line_value})
+        return {'quote_line_item': quote_line_item,
+                'quote_total': quote_total,
+                'quote_errors': quote_errors}
+
+    def stats(self):
+        """ Return the hit rate counters and, when the backend reports them, its size"""
+        lookups = self.hits + self.misses
+        stats = {'hits': self.hits, 'misses': self.misses,
+                 'hit_rate': self.hits / lookups if lookups else 0.0}
+        backend_stats = getattr(self.cache, 'stats', None)
+        if backend_stats is not None:
+            stats.update(backend_stats())
+        return stats
+
+
+# one set of counters per worker process
+quote_memo = QuoteMemo()
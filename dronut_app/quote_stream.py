@@ -0,0 +1,90 @@
+""" Module for pricing NDJSON carts of any size in bounded memory"""
+import json
+from dronut_app.pricing import QuoteTotal, batched, parse_cart_line, price_lines_in_units
+
+QUOTE_STREAM_CHUNK_SIZE = 1000
+# a cart line is a small object, longer lines are rejected instead of buffered
+QUOTE_STREAM_MAX_LINE = 64 * 1024
+ERROR_BAD_JSON = 'Line is not valid JSON'
+ERROR_LONG_LINE = f'Line is longer than {QUOTE_STREAM_MAX_LINE} bytes'
+
+
+def read_lines(stream, max_line=QUOTE_STREAM_MAX_LINE):
+    """
+    Yield the non blank lines of a binary `stream` one by one, a line longer
+    than `max_line` bytes is skipped and yields None
+    """
+    while True:
+        line = stream.readline(max_line + 1)
+        if not line:
+            return
+        if len(line) > max_line:
+            # drop the rest of the line without holding it
+            while line and not line.endswith(b'\n'):
+                line = stream.readline(max_line)
+            yield None
+        elif line.strip():
+            yield line
+
+
+def parse_stream_line(line):
+    """ Validate one NDJSON cart line, returns a (donut_code, quantity, error) tuple"""
+    if line is None:
+        return None, None, ERROR_LONG_LINE
+    try:
+        donut_item = json.loads(line)
+    except ValueError:
+        return None, None, ERROR_BAD_JSON
+    return parse_cart_line(donut_item)
+
+
+def format_stream_line(line, donut_code, line_value=None, error=None):
+    """ Format one quote line as NDJSON, a line value or an error"""
+    if error is not None:
+        return json.dumps({'line': line, 'donut_code': donut_code, 'error': error}) + '\n'
+    return json.dumps({'line': line, 'donut_code': donut_code,
+                       'line_value': str(line_value)}) + '\n'
+
+
+def format_chunk(chunk_size, first_line, priced_lines, quote_errors):
+    """
+    Encode the quote lines of a chunk of cart lines in cart order, `priced_lines`
+    are the (donut_code, line_value) pairs of the lines without an error
+    """
+    errors = {error['line']: error for error in quote_errors}
+    priced_lines = iter(priced_lines)
+    lines = []
+    for line in range(chunk_size):
+        error = errors.get(line)
+        if error is not None:
+            lines.append(format_stream_line(first_line + line, error['donut_code'],
+                                            error=error['error']))
+        else:
+            lines.append(format_stream_line(first_line + line, *next(priced_lines)))
+    return ''.join(lines).encode('utf-8')
+
+
+def stream_quote(pricing_engine, stream, chunk_size=QUOTE_STREAM_CHUNK_SIZE):
+    """
+    Yield the quote of a cart read from a binary `stream` of NDJSON line items,
+    as encoded chunks of NDJSON. Each chunk of `chunk_size` cart lines is priced
+    with one lookup and written out before the next is read, one line per cart
+    line in cart order, then a last line with the quote total and line counts
+    """
+    quote_total = None
+    line_count = 0
+    error_count = 0
+    for chunk in batched(map(parse_stream_line, read_lines(stream)), chunk_size):
+        donut_codes = [donut_code for donut_code, _, error in chunk if error is None]
+        units, scale = pricing_engine.lookup_units(donut_codes)
+        if quote_total is None:
+            quote_total = QuoteTotal(scale)
+        donut_codes, line_units, quote_errors = price_lines_in_units(chunk, units)
+        line_values = list(map(scale.__mul__, line_units))
+        quote_total.add(line_units, line_values)
+        yield format_chunk(len(chunk), line_count, zip(donut_codes, line_values), quote_errors)
+        line_count += len(chunk)
+        error_count += len(quote_errors)
+    total = 0 if quote_total is None else quote_total.value
+    yield (json.dumps({'quote_total': str(total), 'lines': line_count,
+                       'errors': error_count}) + '\n').encode('utf-8')
@@ -0,0 +1,20 @@
+""" Renderers for the Dronut API are defined here"""
+import json
+from rest_framework import renderers
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class NDJSONRenderer(renderers.BaseRenderer):  # pylint: disable=too-few-public-methods
+    """ Newline delimited JSON, one object per line"""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # streamed responses bypass the renderer, this only renders error payloads
+        return (json.dumps(data, cls=JSONEncoder) + '\n').encode(self.charset)
+
+
+class CSVRenderer(NDJSONRenderer):  # pylint: disable=too-few-public-methods
+    """ Comma separated values with a header row"""
+    media_type = 'text/csv'
+    format = 'csv'
@@ -0,0 +1,48 @@
+""" Module for case-insensitive donut code prefix search and full-text search"""
+from django.db.models import F
+from dronut_app.fulltext import search_query
+from dronut_app.models import Donuts
+
+# sorts after every character a donut code can contain
+MAX_CHAR = chr(0x10FFFF)
+# annotation holding the FTS5 rank of a full-text match, lower is better
+SEARCH_RANK = 'search_rank'
+
+
+def prefix_range(prefix):
+    """ Return the (low, high) search key bounds of the codes starting with `prefix`"""
+    search_key = Donuts.search_key_for(prefix)
+    return search_key, search_key + MAX_CHAR
+
+
+def prefix_filter(prefix):
+    """
+    Return queryset filter kwargs matching codes starting with `prefix`, ignoring case.
+    A range on the indexed search_key can use the index, unlike UPPER(...) LIKE
+    """
+    low, high = prefix_range(prefix)
+    return {'search_key__gte': low, 'search_key__lt': high}
+
+
+def autocomplete_codes(queryset, prefix, limit):
+    """
+    Return up to `limit` donut codes starting with `prefix`, ignoring case, in the
+    order of the catalog autocomplete, read with an indexed range query
+    """
+    return list(queryset.filter(**prefix_filter(prefix)).order_by('search_key', 'donut_code')
+                .values_list('donut_code', flat=True)[:limit])
+
+
+def fulltext_search(queryset, text):
+    """
+    Filter `queryset` to the donuts whose code or description match every word
+    of `text`, the last word as a prefix, best matches first.
+    The match runs on the donuts_fts FTS5 index and each donut is annotated
+    with its rank, so the paginators can page on it
+    """
+    queryset = queryset.annotate(**{SEARCH_RANK: F('search_entry__rank')}) \
+        .order_by(SEARCH_RANK, 'donut_code')
+    query = search_query(text)
+    if query is None:
+        return queryset.none()
+    return queryset.filter(search_entry__document__match=query)
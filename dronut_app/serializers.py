@@ -1,10 +1,54 @@
 """Model serializers are defined here"""
 from rest_framework import serializers
-from dronut_app.models import Donuts
+from dronut_app.models import DonutChange, Donuts
 
 
 class DonutSerializer(serializers.ModelSerializer):
-    """ Donut Model serializer"""
+    """ Donut Model serializer, `fields` narrows it to a sparse fieldset"""
     class Meta:
         model = Donuts
-        fields = '__all__'
+        exclude = ['search_key', 'updated_at']
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class DonutBulkListSerializer(serializers.ListSerializer):  # pylint: disable=abstract-method
+    """ List serializer that keeps the valid rows and collects the errors of the others"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.row_errors = []
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            raise serializers.ValidationError({'non_field_errors': ['Expected a list of donuts']})
+        self.row_errors = []
+        valid_rows = []
+        for row, item in enumerate(data):
+            try:
+                valid_rows.append(self.child.run_validation(item))
+            except serializers.ValidationError as exc:
+                self.row_errors.append({'row': row, 'errors': exc.detail})
+        return valid_rows
+
+
+class DonutBulkSerializer(DonutSerializer):
+    """
+    Donut serializer for bulk upserts.
+    Rows are keyed by donut_code, so existing codes are not rejected as duplicates
+    """
+    class Meta(DonutSerializer.Meta):
+        list_serializer_class = DonutBulkListSerializer
+        extra_kwargs = {'donut_code': {'validators': []}}
+
+
+class DonutChangeSerializer(serializers.ModelSerializer):
+    """ Donut change feed entry serializer"""
+    class Meta:
+        model = DonutChange
+        fields = ['seq', 'action', 'donut_id', 'donut_code', 'description', 'price_per_unit',
+                  'changed_at']
@@ -0,0 +1,31 @@
+""" Model and database signal handlers are defined here"""
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from dronut_app.catalog import publish_catalog_change
+from dronut_app.changes import record_change
+from dronut_app.middleware import install_query_timer
+from dronut_app.models import DonutChange, Donuts
+
+
+@receiver(post_save, sender=Donuts, dispatch_uid='donuts_catalog_save')
+@receiver(post_delete, sender=Donuts, dispatch_uid='donuts_catalog_delete')
+def invalidate_catalog(sender, **kwargs):  # pylint: disable=unused-argument
+    """ Bump the catalog version when a donut is written"""
+    publish_catalog_change()
+
+
+@receiver(post_save, sender=Donuts, dispatch_uid='donuts_change_save')
+def record_save(sender, instance, created, using, **kwargs):  # pylint: disable=unused-argument
+    """ Record a created or updated donut in the change feed"""
+    record_change(instance, DonutChange.CREATE if created else DonutChange.UPDATE, using)
+
+
+@receiver(post_delete, sender=Donuts, dispatch_uid='donuts_change_delete')
+def record_delete(sender, instance, using, **kwargs):  # pylint: disable=unused-argument
+    """ Record a deleted donut in the change feed"""
+    record_change(instance, DonutChange.DELETE, using)
+
+
+# time the queries of every connection a request uses, in any thread
+connection_created.connect(install_query_timer, dispatch_uid='dronut_query_timer')
@@ -1,11 +1,19 @@
 """ Dronut app urls are defined here"""
 from django.urls import path, include
 from rest_framework import routers
-from dronut_app import api
+from dronut_app import api, views
 
 router = routers.DefaultRouter()
 router.register(r'donuts', api.DronutsDataViewSet)
 
 url_patterns = [
     path('', include(router.urls)),
+    # NDJSON carts of any size, priced while the body is read
+    path('donuts/quotes/stream/', views.quotes_stream, name='donuts-quotes-stream'),
+    # native async variants for ASGI deployments
+    path('async/donuts/', views.donut_list_async, name='donuts-list-async'),
+    path('async/donuts/quotes/', views.quotes_async, name='donuts-quotes-async'),
+    path('async/donuts/changes/', views.changes_async, name='donuts-changes-async'),
+    path('async/donuts/<str:pk>/', views.donut_detail_async, name='donuts-detail-async'),
+    path('metrics', views.metrics, name='metrics'),
 ]
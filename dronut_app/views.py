@@ -1,4 +1,132 @@
 """ Dajngo View views are defined here"""
-# from django.shortcuts import render
+import json
+from django.core.exceptions import ValidationError
+from django.http import HttpResponse, HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.urls import replace_query_param
+from dronut_app.catalog import price_catalog
+from dronut_app.changes import CHANGES_MAX_WAIT, await_changes, parse_changes_params
+from dronut_app.metrics import render_metrics
+from dronut_app.models import Donuts
+from dronut_app.pagination import DonutCursorPagination
+from dronut_app.price_table import get_donut_catalog, get_price_catalog
+from dronut_app.pricing import PricingEngine
+from dronut_app.quote_cache import quote_memo
+from dronut_app.quote_stream import stream_quote
+from dronut_app.search import prefix_filter
+from dronut_app.serializers import DonutSerializer
 
-# Create your views here.
+# Native async views, served without a thread pool hop when running under ASGI.
+# They mirror the DronutsDataViewSet responses for the hot read and quote paths.
+
+
+def async_csrf_exempt(view_func):
+    """ csrf_exempt for coroutine views, Django's decorator hides the coroutine function"""
+    view_func.csrf_exempt = True
+    return view_func
+
+
+def json_response(data, **kwargs):
+    """ JsonResponse encoding Decimal and UUID values like the DRF JSON renderer"""
+    return JsonResponse(data, encoder=JSONEncoder, safe=False, **kwargs)
+
+
+@async_csrf_exempt
+async def quotes_async(request):
+    """ Async API end point for getting donut quotes"""
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    try:
+        cart_lines = json.loads(request.body)['donuts']
+        quote = await PricingEngine(catalog=get_price_catalog()).aquote(cart_lines)
+    except Exception as exc:
+        return json_response({'error': str(exc), 'info': 'Error encountered'})
+    return json_response(quote)
+
+
+async def donut_detail_async(request, pk):
+    """ Async API end point for retrieving a donut information"""
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    catalog = get_donut_catalog()
+    entry = None if catalog is None else await catalog.aget_by_id(pk)
+    if entry is not None:
+        donut = catalog.to_instance(entry)
+    else:
+        try:
+            donut = await Donuts.objects.aget(pk=pk)
+        except (Donuts.DoesNotExist, ValidationError):
+            return json_response({'detail': 'Not found.'}, status=404)
+    return json_response(DonutSerializer(donut).data)
+
+
+async def donut_list_async(request):
+    """
+    Async API end point for a page of donuts ordered by donut code.
+    Pages are chained with ?after=<last donut code of the previous page>
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    try:
+        page_size = int(request.GET.get('page_size', DonutCursorPagination.page_size))
+    except ValueError:
+        return json_response({'error': 'page_size must be an integer',
+                              'info': 'Error encountered'})
+    page_size = max(1, min(page_size, DonutCursorPagination.max_page_size))
+    queryset = Donuts.objects.order_by('donut_code')
+    if request.GET.get('q') is not None:
+        queryset = queryset.filter(**prefix_filter(request.GET['q']))
+    if request.GET.get('after') is not None:
+        queryset = queryset.filter(donut_code__gt=request.GET['after'])
+    donuts = [donut async for donut in queryset[:page_size + 1]]
+    next_url = None
+    if len(donuts) > page_size:
+        donuts = donuts[:page_size]
+        next_url = replace_query_param(request.build_absolute_uri(), 'after',
+                                       donuts[-1].donut_code)
+    return json_response({'next': next_url,
+                          'results': DonutSerializer(donuts, many=True).data})
+
+
+async def changes_async(request):
+    """
+    Async API end point for the donut changes after ?since=<seq>. With ?wait=<seconds>
+    it long polls, answering as soon as a change is recorded or with no results once
+    the wait is over, without holding a worker thread while it waits
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    try:
+        since, limit, wait = parse_changes_params(request.GET, max_wait=CHANGES_MAX_WAIT)
+    except ValueError as exc:
+        return json_response({'error': str(exc), 'info': 'Error encountered'})
+    return json_response(await await_changes(since, limit, wait))
+
+
+@csrf_exempt
+def quotes_stream(request):
+    """
+    API end point pricing a cart posted as NDJSON, one {'donut_code', 'quantity'}
+    object per line. The quote is streamed back as NDJSON while the body is read,
+    a chunk of cart lines at a time, so memory does not grow with the cart
+    """
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    return StreamingHttpResponse(stream_quote(PricingEngine(catalog=get_price_catalog()), request),
+                                 content_type='application/x-ndjson')
+
+
+def metrics(request):
+    """ Request, catalog and quote cache metrics in the Prometheus text format"""
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    extra_stats = [
+        ('dronut_catalog', 'Price catalog', price_catalog.stats()),
+        ('dronut_quote_cache', 'Quote cache', quote_memo.stats()),
+    ]
+    quote_catalog = get_price_catalog()
+    if quote_catalog is not price_catalog:
+        extra_stats.append(('dronut_price_table', 'Shared price table', quote_catalog.stats()))
+    document = render_metrics(extra_stats)
+    return HttpResponse(document, content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -21,17 +21,20 @@ def main():
     if is_testing:
         import coverage
 
-        cov = coverage.coverage(source=['dronut_app', ],
-                                omit=['*/tests*', '*/migrations/*', '*/urls*', '*/setting*',
-                                      '*/__init__*', '*/wsgi*', '*/apps*', '*/management/commands/*', 'common/*'])
-        cov.set_option('report:show_missing', True)
-        cov.erase()
+        # source, omit and concurrency settings are in .coveragerc, where the
+        # workers of a --parallel run read them too
+        cov = coverage.coverage(config_file='.coveragerc')
+        # also drop worker data files left over by an interrupted run
+        cov.get_data().erase(parallel=True)
         cov.start()
     execute_from_command_line(sys.argv)
 
     if is_testing:
         cov.stop()
         cov.save()
+        # merge the data files of the parallel workers into .coverage
+        cov.combine()
+        cov.save()
 
         rel_dir = os.path.normcase(os.path.abspath(os.curdir) + os.sep)
         files = cov.get_data().measured_files()
@@ -47,9 +50,11 @@ def main():
         outfile = open(output_path, "w", **open_kwargs)
         file_to_close = outfile
         delete_file = False
-        from xmlreporter import XmlReporter
+        from xmlreporter import StreamingXmlReporter
         try:
-            xmlreporter = XmlReporter(cov)
+            # analyses of unchanged files are reused from the cache of the last run
+            xmlreporter = StreamingXmlReporter(cov, jobs=os.cpu_count() or 1,
+                                               cache_dir='.coverage-cache')
             xmlreporter.report(files_to_scan, outfile=outfile)
         except Exception:
             delete_file = True
@@ -1,5 +1,7 @@
 """ Module for setting db data"""
-from dronut_app.models import Donuts
+from dronut_app.catalog import bump_catalog_version
+from dronut_app.changes import change_for, record_changes
+from dronut_app.models import DonutChange, Donuts
 
 
 class DonutsDataSetup:
@@ -29,3 +31,37 @@ class DonutsDataSetup:
             obj = Donuts.objects.create(**data)
             donut_obj.append(obj)
         return donut_obj
+
+    def setup_catalog_data(self, count, start=0):
+        """ bulk create donuts `start` to `count` - 1 for catalogs of a given size"""
+        donuts = Donuts.objects.bulk_create(
+            Donuts(donut_code=self.catalog_code(index), search_key=self.catalog_code(index),
+                   description=f'catalog donut {index}', price_per_unit=f'{index % 20 + 1}.25')
+            for index in range(start, count))
+        # bulk_create sends no signals, so invalidate the price catalog and record
+        # the changes here
+        record_changes([change_for(donut, DonutChange.CREATE) for donut in donuts])
+        bump_catalog_version()
+
+    @staticmethod
+    def catalog_code(index):
+        """ donut code of the `index`-th catalog donut"""
+        return f'CATALOG_{index:05d}'
+
+
+class DonutsTestDataMixin:
+    """
+    TestCase mixin creating the Donuts data once per test class with setUpTestData,
+    each test is rolled back to it instead of creating the donuts again
+    """
+
+    @classmethod
+    def setUpTestData(cls):  # pylint: disable=invalid-name
+        """ create the Donuts records shared by the tests of the class"""
+        super().setUpTestData()
+        cls.donut_objs = DonutsDataSetup().setup_donuts_data()
+
+    def setUp(self):  # pylint: disable=invalid-name
+        """ drop catalogs holding writes of an earlier, rolled back, test"""
+        bump_catalog_version()
+        super().setUp()
@@ -0,0 +1,41 @@
+""" Module for asserting the database cost of test code"""
+import contextlib
+import functools
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+
+def format_queries(captured_queries):
+    """ Number the captured SQL statements, one per line"""
+    return '\n'.join(f'{number}. {query["sql"]}'
+                     for number, query in enumerate(captured_queries, start=1))
+
+
+class QueryBudgetMixin:  # pylint: disable=too-few-public-methods
+    """
+    TestCase mixin for query budgets. Unlike assertNumQueries a budget is an
+    upper bound, and a failure lists the SQL that was run
+    """
+
+    @contextlib.contextmanager
+    def assertQueryBudget(  # pylint: disable=invalid-name
+            self, budget, label='', using=DEFAULT_DB_ALIAS):
+        """ Fail when the block runs more than `budget` queries on the `using` database"""
+        with CaptureQueriesContext(connections[using]) as context:
+            yield context
+        executed = context.captured_queries
+        if len(executed) > budget:
+            label = f'{label}: ' if label else ''
+            self.fail(f'{label}{len(executed)} queries executed, budget is {budget}\n'
+                      f'{format_queries(executed)}')
+
+
+def query_budget(budget, using=DEFAULT_DB_ALIAS):
+    """ Decorator running a QueryBudgetMixin test method within a query budget"""
+    def decorator(test_method):
+        @functools.wraps(test_method)
+        def wrapper(self, *args, **kwargs):
+            with self.assertQueryBudget(budget, label=test_method.__name__, using=using):
+                return test_method(self, *args, **kwargs)
+        return wrapper
+    return decorator
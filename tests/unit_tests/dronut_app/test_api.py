@@ -1,11 +1,21 @@
 """ API endpoint test cases for Dronut App"""
+import csv
+import io
+import json
 from decimal import Decimal
+from unittest import mock
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APITestCase
-from tests.data_setup import DonutsDataSetup
+from dronut_app.api import DONUT_BATCH_MAX_KEYS, DronutsDataViewSet
+from dronut_app.catalog import price_catalog
+from dronut_app.models import DonutChange, Donuts
+from tests.data_setup import DonutsTestDataMixin
 
 
-class DronutsDataViewSetTests(APITestCase):
+class DronutsDataViewSetTests(DonutsTestDataMixin,  # pylint: disable=too-many-public-methods
+                              APITestCase):
     """ Class for testing Dronuts Data View"""
 
     def setUp(self):
@@ -13,7 +23,6 @@ class DronutsDataViewSetTests(APITestCase):
         self.url_quotes = 'dronut_app:donuts-quotes'
         self.url_detail = 'dronut_app:donuts-detail'
         self.response = None
-        self.donut_objs = DonutsDataSetup().setup_donuts_data()
         super().setUp()
 
     def test_retrieve_donuts_list(self):
@@ -21,9 +30,33 @@ class DronutsDataViewSetTests(APITestCase):
         DronutsDataViewSet: Test to verify API endpoint for a list of Donuts
         """
         self.response = self.client.get(reverse(self.url_list), format='json')
-        self.assertEqual(len(self.response.data), 2)
-        self.assertEqual(self.response.data[0]['donut_code'], 'THE_HOMER')
-        self.assertEqual(self.response.data[0]['price_per_unit'], '8.50')
+        self.assertEqual(len(self.response.json()['results']), 2)
+        self.assertEqual(self.response.json()['results'][0]['donut_code'], 'THE_HOMER')
+        self.assertEqual(self.response.json()['results'][0]['price_per_unit'], '8.50')
+
+    def test_retrieve_donuts_list_cursor_pages(self):
+        """
+        DronutsDataViewSet: Test to verify the list is paged by cursor without a total count
+        """
+        with self.assertNumQueries(1):
+            self.response = self.client.get(reverse(self.url_list) + '?page_size=1',
+                                            format='json')
+        self.assertNotIn('count', self.response.json())
+        self.assertIsNone(self.response.json()['previous'])
+        self.assertEqual(self.response.json()['results'][0]['donut_code'], 'THE_HOMER')
+        self.response = self.client.get(self.response.json()['next'], format='json')
+        self.assertEqual(self.response.json()['results'][0]['donut_code'], 'THE_MARGIE')
+        self.assertIsNone(self.response.json()['next'])
+        self.assertIsNotNone(self.response.json()['previous'])
+
+    def test_retrieve_donuts_list_offset_pages(self):
+        """
+        DronutsDataViewSet: Test to verify limit and offset select the legacy offset pagination
+        """
+        self.response = self.client.get(reverse(self.url_list) + '?limit=1&offset=1',
+                                        format='json')
+        self.assertEqual(self.response.json()['count'], 2)
+        self.assertEqual(self.response.json()['results'][0]['donut_code'], 'THE_MARGIE')
 
     def test_get_donut_information(self):
         """
@@ -32,8 +65,8 @@ class DronutsDataViewSetTests(APITestCase):
         self.response = self.client.get(reverse(self.url_detail,
                                                 kwargs={'pk': self.donut_objs[1].id}),
                                         format='json')
-        self.assertEqual(self.response.data['donut_code'], 'THE_MARGIE')
-        self.assertEqual(self.response.data['price_per_unit'], '10.50')
+        self.assertEqual(self.response.json()['donut_code'], 'THE_MARGIE')
+        self.assertEqual(self.response.json()['price_per_unit'], '10.50')
 
     def test_query_by_donut_code(self):
         """
@@ -41,8 +74,8 @@ class DronutsDataViewSetTests(APITestCase):
         a donut information by querying donut code
         """
         self.response = self.client.get(reverse(self.url_list) + '?q=THE_MAR', format='json')
-        self.assertEqual(self.response.data[0]['donut_code'], 'THE_MARGIE')
-        self.assertEqual(self.response.data[0]['price_per_unit'], '10.50')
+        self.assertEqual(self.response.json()['results'][0]['donut_code'], 'THE_MARGIE')
+        self.assertEqual(self.response.json()['results'][0]['price_per_unit'], '10.50')
 
     def test_donut_creation(self):
         """
@@ -99,3 +132,398 @@ class DronutsDataViewSetTests(APITestCase):
         data = {}
         self.response = self.client.post(reverse(self.url_quotes), data=data, format='json')
         self.assertEqual(self.response.data['info'], 'Error encountered')
+
+    def test_get_donut_quote_line_errors(self):
+        """
+        DronutsDataViewSet: Test to verify unknown codes and bad quantities are reported per line
+        """
+        data = {
+            "donuts": [
+                {"donut_code": "THE_HOMER", "quantity": 2},
+                {"donut_code": "THE_BART", "quantity": 1},
+                {"donut_code": "THE_MARGIE", "quantity": "ten"},
+                {"quantity": 4},
+            ]
+        }
+        self.response = self.client.post(reverse(self.url_quotes), data=data, format='json')
+        self.assertEqual(len(self.response.data['quote_line_item']), 1)
+        self.assertEqual(self.response.data['quote_total'], Decimal('17.00'))
+        self.assertEqual([error['line'] for error in self.response.data['quote_errors']], [1, 2, 3])
+        self.assertEqual(self.response.data['quote_errors'][0]['donut_code'], 'THE_BART')
+        self.assertEqual(self.response.data['quote_errors'][0]['error'], 'Unknown donut code')
+
+    def test_get_donut_quote_query_count(self):
+        """
+        DronutsDataViewSet: Test to verify the quote query count does not grow with the cart size
+        """
+        # the first quote loads the price catalog, later quotes are served from memory
+        self.client.post(reverse(self.url_quotes), data={"donuts": []}, format='json')
+        for cart_size in (2, 50, 500):
+            data = {
+                "donuts": [
+                    {"donut_code": ("THE_HOMER", "THE_MARGIE", "THE_BART")[line % 3],
+                     "quantity": line + 1}
+                    for line in range(cart_size)
+                ]
+            }
+            with self.assertNumQueries(0):
+                self.response = self.client.post(reverse(self.url_quotes), data=data,
+                                                 format='json')
+            self.assertEqual(len(self.response.data['quote_line_item']),
+                             cart_size - cart_size // 3)
+
+    def test_get_donut_information_after_update(self):
+        """
+        DronutsDataViewSet: Test to verify a donut read after a price change is not stale
+        """
+        url = reverse(self.url_detail, kwargs={'pk': self.donut_objs[0].id})
+        self.client.get(url, format='json')
+        self.client.patch(url, data={"price_per_unit": "9.25"})
+        self.response = self.client.get(url, format='json')
+        self.assertEqual(self.response.json()['price_per_unit'], '9.25')
+
+    def test_catalog_stats(self):
+        """
+        DronutsDataViewSet: Test to verify API endpoint for the price catalog counters
+        """
+        self.response = self.client.get(reverse('dronut_app:donuts-catalog-stats'), format='json')
+        self.assertEqual(set(self.response.data),
+                         {'version', 'size', 'hits', 'misses', 'rebuilds'})
+
+    def test_query_by_donut_code_ignores_case(self):
+        """
+        DronutsDataViewSet: Test to verify the donut code prefix query ignores case
+        """
+        self.response = self.client.get(reverse(self.url_list) + '?q=the_h', format='json')
+        self.assertEqual([donut['donut_code'] for donut in self.response.json()['results']],
+                         ['THE_HOMER'])
+        self.assertNotIn('search_key', self.response.json()['results'][0])
+
+    def test_autocomplete(self):
+        """
+        DronutsDataViewSet: Test to verify API endpoint for donut code type-ahead
+        """
+        url = reverse('dronut_app:donuts-autocomplete')
+        self.response = self.client.get(url + '?q=the_', format='json')
+        self.assertEqual(self.response.data['results'], ['THE_HOMER', 'THE_MARGIE'])
+        self.response = self.client.get(url + '?q=THE_M', format='json')
+        self.assertEqual(self.response.data['results'], ['THE_MARGIE'])
+        self.response = self.client.get(url + '?q=THE&limit=1', format='json')
+        self.assertEqual(self.response.data['results'], ['THE_HOMER'])
+        self.response = self.client.get(url + '?q=BART', format='json')
+        self.assertEqual(self.response.data['results'], [])
+        self.response = self.client.get(url + '?q=THE&limit=many', format='json')
+        self.assertEqual(self.response.data['info'], 'Error encountered')
+
+    def test_bulk_upsert(self):
+        """
+        DronutsDataViewSet: Test to verify API endpoint for creating and updating donuts in bulk
+        """
+        data = {
+            "donuts": [
+                {"donut_code": "THE_HOMER", "description": "sprinkles", "price_per_unit": "9.00"},
+                {"donut_code": "THE_BART", "price_per_unit": "4.75"},
+                {"donut_code": "THE_LISA", "price_per_unit": "cheap"},
+                {"price_per_unit": "2.00"},
+            ]
+        }
+        self.response = self.client.post(reverse('dronut_app:donuts-bulk'), data=data,
+                                         format='json')
+        self.assertEqual(self.response.data['received'], 4)
+        self.assertEqual(self.response.data['created'], 1)
+        self.assertEqual(self.response.data['updated'], 1)
+        self.assertEqual([error['row'] for error in self.response.data['errors']], [2, 3])
+        self.assertIn('price_per_unit', self.response.data['errors'][0]['errors'])
+        homer = Donuts.objects.get(donut_code='THE_HOMER')
+        self.assertEqual(homer.id, self.donut_objs[0].id)
+        self.assertEqual(homer.price_per_unit, Decimal('9.00'))
+        self.assertEqual(Donuts.objects.get(donut_code='THE_BART').search_key, 'THE_BART')
+        self.response = self.client.post(reverse(self.url_quotes),
+                                         data={"donuts": [{"donut_code": "THE_BART",
+                                                           "quantity": 2}]},
+                                         format='json')
+        self.assertEqual(self.response.data['quote_total'], Decimal('9.50'))
+
+    def test_bulk_upsert_partial_rows(self):
+        """
+        DronutsDataViewSet: Test to verify a bulk update keeps the fields its row leaves out
+        """
+        description = self.donut_objs[0].description
+        self.response = self.client.post(reverse('dronut_app:donuts-bulk'), data={"donuts": [
+            {"donut_code": "THE_HOMER", "price_per_unit": "9.00"},
+            {"donut_code": "THE_BART", "description": "plain", "price_per_unit": "4.75"},
+            {"donut_code": "THE_BART", "price_per_unit": "5.00"}]}, format='json')
+        self.assertEqual((self.response.data['created'], self.response.data['updated']), (1, 1))
+        homer = Donuts.objects.get(donut_code='THE_HOMER')
+        self.assertEqual((homer.description, homer.price_per_unit),
+                         (description, Decimal('9.00')))
+        bart = Donuts.objects.get(donut_code='THE_BART')
+        self.assertEqual((bart.description, bart.price_per_unit), ('plain', Decimal('5.00')))
+        change = DonutChange.objects.filter(donut_code='THE_HOMER').latest('seq')
+        self.assertEqual((change.action, change.description), ('update', description))
+
+    def test_bulk_upsert_error(self):
+        """
+        DronutsDataViewSet: Test to verify bulk writes reject a non list body with a 400 and
+        report invalid rows
+        """
+        self.response = self.client.post(reverse('dronut_app:donuts-bulk'),
+                                         data={"donuts": "THE_HOMER"}, format='json')
+        self.assertEqual(self.response.status_code, 400)
+        self.assertEqual(self.response.json(),
+                         {'non_field_errors': ['Expected a list of donuts']})
+        self.response = self.client.post(reverse('dronut_app:donuts-bulk'), data={"donuts": [
+            {"donut_code": "THE_LISA", "price_per_unit": "cheap"}, "THE_BART"]}, format='json')
+        self.assertEqual(self.response.status_code, 200)
+        self.assertEqual(self.response.json()['failed'], 2)
+        self.assertEqual(self.response.json()['errors'][0],
+                         {'row': 0, 'errors': {'price_per_unit': ['A valid number is required.']}})
+        self.response = self.client.post(reverse('dronut_app:donuts-bulk'), data={"carts": []},
+                                         format='json')
+        self.assertEqual(self.response.data['info'], 'Error encountered')
+
+    def test_export_ndjson(self):
+        """
+        DronutsDataViewSet: Test to verify API endpoint for streaming the catalog as NDJSON
+        """
+        self.response = self.client.get(reverse('dronut_app:donuts-export') + '?format=ndjson')
+        self.assertEqual(self.response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(self.response.streaming_content).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual([row['donut_code'] for row in rows], ['THE_HOMER', 'THE_MARGIE'])
+        self.assertEqual(rows[1]['price_per_unit'], '10.50')
+        self.assertEqual(rows[1]['id'], str(self.donut_objs[1].id))
+
+    def test_export_csv(self):
+        """
+        DronutsDataViewSet: Test to verify API endpoint for streaming the catalog as CSV
+        """
+        self.response = self.client.get(reverse('dronut_app:donuts-export') + '?format=csv')
+        self.assertEqual(self.response['Content-Type'], 'text/csv')
+        content = b''.join(self.response.streaming_content).decode()
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(rows[0], ['id', 'donut_code', 'description', 'price_per_unit'])
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[1][1:], ['THE_HOMER', 'cream filled donut with sprinkles', '8.50'])
+
+    def test_retrieve_donuts_list_not_modified(self):
+        """
+        DronutsDataViewSet: Test to verify a list poll gets 304 until the catalog changes
+        """
+        self.response = self.client.get(reverse(self.url_list), format='json')
+        etag = self.response['ETag']
+        with self.assertNumQueries(0):
+            self.response = self.client.get(reverse(self.url_list), format='json',
+                                            HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(self.response.status_code, 304)
+        self.client.patch(reverse(self.url_detail, kwargs={'pk': self.donut_objs[1].id}),
+                          data={"price_per_unit": "11.00"})
+        self.response = self.client.get(reverse(self.url_list), format='json',
+                                        HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(self.response.status_code, 200)
+        self.assertNotEqual(self.response['ETag'], etag)
+        self.assertTrue(self.response.has_header('Last-Modified'))
+
+    def test_get_donut_information_not_modified(self):
+        """
+        DronutsDataViewSet: Test to verify a detail poll gets 304 until the donut changes
+        """
+        url = reverse(self.url_detail, kwargs={'pk': self.donut_objs[0].id})
+        self.response = self.client.get(url, format='json')
+        etag = self.response['ETag']
+        last_modified = self.response['Last-Modified']
+        self.response = self.client.get(url, format='json', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(self.response.status_code, 304)
+        self.response = self.client.get(url, format='json', HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(self.response.status_code, 304)
+        other_url = reverse(self.url_detail, kwargs={'pk': self.donut_objs[1].id})
+        self.client.patch(other_url, data={"price_per_unit": "11.00"})
+        self.response = self.client.get(url, format='json', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(self.response.status_code, 304)
+        self.client.patch(url, data={"price_per_unit": "9.00"})
+        self.response = self.client.get(url, format='json', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(self.response.status_code, 200)
+        self.assertEqual(self.response.json()['price_per_unit'], '9.00')
+
+    def test_get_donut_information_one_catalog_lookup(self):
+        """
+        DronutsDataViewSet: Test to verify a detail read counts one catalog hit or miss
+        """
+        price_catalog.refresh()
+        for donut_id, counted in ((self.donut_objs[0].id, 'hits'), ('not-an-id', 'misses')):
+            before = price_catalog.stats()
+            self.client.get(reverse(self.url_detail, kwargs={'pk': donut_id}), format='json')
+            after = price_catalog.stats()
+            self.assertEqual({name: after[name] - before[name] for name in ('hits', 'misses')},
+                             {'hits': 0, 'misses': 0, counted: 1})
+
+    def test_get_donut_quotes_batch(self):
+        """
+        DronutsDataViewSet: Test to verify API endpoint for quoting many carts in one request
+        """
+        data = {
+            "carts": [
+                {"donuts": [{"donut_code": "THE_HOMER", "quantity": 3},
+                            {"donut_code": "THE_MARGIE", "quantity": 10}]},
+                {"donuts": "THE_HOMER"},
+                {"donuts": [{"donut_code": "THE_BART", "quantity": 1},
+                            {"donut_code": "THE_MARGIE", "quantity": 1}]},
+            ]
+        }
+        self.response = self.client.post(reverse('dronut_app:donuts-quotes-batch'), data=data,
+                                         format='json')
+        quotes = self.response.data['quotes']
+        self.assertEqual(len(quotes), 3)
+        self.assertEqual(quotes[0]['quote_total'], Decimal('130.50'))
+        self.assertEqual(quotes[1]['info'], 'Error encountered')
+        self.assertEqual(quotes[2]['quote_total'], Decimal('10.50'))
+        self.assertEqual(quotes[2]['quote_errors'][0]['donut_code'], 'THE_BART')
+
+    def test_get_donut_quotes_batch_error(self):
+        """
+        DronutsDataViewSet: Test to verify batch quotes reject a body without carts
+        """
+        self.response = self.client.post(reverse('dronut_app:donuts-quotes-batch'), data={},
+                                         format='json')
+        self.assertEqual(self.response.data['info'], 'Error encountered')
+
+    def test_quote_cache_stats(self):
+        """
+        DronutsDataViewSet: Test to verify API endpoint for the quote cache counters
+        """
+        data = {"donuts": [{"donut_code": "THE_HOMER", "quantity": 3}]}
+        for _ in range(2):
+            self.response = self.client.post(reverse(self.url_quotes), data=data, format='json')
+            self.assertEqual(self.response.data['quote_total'], Decimal('25.50'))
+        self.response = self.client.get(reverse('dronut_app:donuts-quote-cache-stats'),
+                                        format='json')
+        self.assertGreaterEqual(self.response.data['hits'], 1)
+        self.assertIn('memory_bytes', self.response.data)
+
+    def test_retrieve_donuts_list_sparse_fieldset(self):
+        """
+        DronutsDataViewSet: Test to verify ?fields= narrows the list and the columns read
+        """
+        with CaptureQueriesContext(connection) as queries:
+            self.response = self.client.get(
+                reverse(self.url_list) + '?fields=donut_code,price_per_unit', format='json')
+        self.assertEqual(self.response.json()['results'][0],
+                         {'donut_code': 'THE_HOMER', 'price_per_unit': '8.50'})
+        self.assertNotIn('description', queries.captured_queries[0]['sql'])
+        with mock.patch.object(DronutsDataViewSet, 'lean_reads', False):
+            with CaptureQueriesContext(connection) as queries:
+                full = self.client.get(
+                    reverse(self.url_list) + '?fields=donut_code,price_per_unit', format='json')
+        self.assertEqual(full.content, self.response.content)
+        self.assertNotIn('description', queries.captured_queries[0]['sql'])
+
+    def test_get_donut_information_sparse_fieldset(self):
+        """
+        DronutsDataViewSet: Test to verify ?fields= narrows a donut information
+        """
+        url = reverse(self.url_detail, kwargs={'pk': self.donut_objs[1].id})
+        self.response = self.client.get(url + '?fields=price_per_unit', format='json')
+        self.assertEqual(self.response.json(), {'price_per_unit': '10.50'})
+        full = self.client.get(url, format='json', HTTP_IF_NONE_MATCH=self.response['ETag'])
+        self.assertEqual(full.status_code, 200)
+
+    def test_batch_donuts(self):
+        """
+        DronutsDataViewSet: Test to verify a multi-get keeps the key order and lists misses
+        """
+        homer, margie = (str(donut.id) for donut in self.donut_objs)
+        url_batch = reverse('dronut_app:donuts-batch')
+        with self.assertNumQueries(1):
+            self.response = self.client.get(url_batch, {'codes': 'THE_MARGIE,THE_BART,THE_HOMER'})
+        results = self.response.json()['results']
+        self.assertEqual([donut and donut['donut_code'] for donut in results],
+                         ['THE_MARGIE', None, 'THE_HOMER'])
+        self.assertEqual((results[0]['id'], results[0]['price_per_unit']), (margie, '10.50'))
+        self.assertEqual(self.response.json()['missing'], ['THE_BART'])
+        self.response = self.client.get(url_batch, {'ids': f'{homer},not-an-id,{homer},{margie}',
+                                                    'fields': 'price_per_unit'})
+        self.assertEqual(self.response.json(), {
+            'results': [{'price_per_unit': '8.50'}, None, {'price_per_unit': '8.50'},
+                        {'price_per_unit': '10.50'}],
+            'missing': ['not-an-id']})
+        with mock.patch.object(DronutsDataViewSet, 'lean_reads', False):
+            full = self.client.get(url_batch, {'ids': f'{homer},not-an-id,{homer},{margie}',
+                                               'fields': 'price_per_unit'})
+        self.assertEqual(full.content, self.response.content)
+
+    def test_batch_donuts_error(self):
+        """
+        DronutsDataViewSet: Test to verify a multi-get takes one key list of a capped size
+        """
+        url_batch = reverse('dronut_app:donuts-batch')
+        for params in ({}, {'ids': '', 'codes': 'THE_HOMER'},
+                       {'codes': ','.join(['THE_HOMER'] * (DONUT_BATCH_MAX_KEYS + 1))}):
+            self.response = self.client.get(url_batch, params)
+            self.assertEqual(self.response.json()['info'], 'Error encountered')
+        self.response = self.client.get(url_batch, {'codes': ''})
+        self.assertEqual(self.response.json(), {'results': [], 'missing': []})
+
+    def test_sparse_fieldset_unknown_field(self):
+        """
+        DronutsDataViewSet: Test to verify ?fields= rejects unknown fields
+        """
+        self.response = self.client.get(reverse(self.url_list) + '?fields=donut_code,colour',
+                                        format='json')
+        self.assertEqual(self.response.status_code, 400)
+        self.assertEqual(self.response.data['fields'], ['Unknown field: colour'])
+
+    def test_search_donuts(self):
+        """
+        DronutsDataViewSet: Test to verify ?search= matches words of the code and description
+        """
+        self.response = self.client.get(reverse(self.url_list) + '?search=sprinkles',
+                                        format='json')
+        self.assertEqual([donut['donut_code'] for donut in self.response.json()['results']],
+                         ['THE_HOMER'])
+        self.response = self.client.get(reverse(self.url_list) + '?search=Marg', format='json')
+        self.assertEqual(self.response.json()['results'][0]['donut_code'], 'THE_MARGIE')
+        self.assertNotIn('search_rank', self.response.json()['results'][0])
+        self.response = self.client.get(reverse(self.url_list) + '?search=cream+twist',
+                                        format='json')
+        self.assertEqual(self.response.json()['results'], [])
+        self.response = self.client.get(reverse(self.url_list) + '?search="*)', format='json')
+        self.assertEqual(self.response.json()['results'], [])
+
+    def test_search_donuts_ranked_pages(self):
+        """
+        DronutsDataViewSet: Test to verify search results are paged best match first
+        """
+        Donuts.objects.create(donut_code='THE_BART', description='donut donut donut',
+                              price_per_unit='4.75')
+        url = reverse(self.url_list) + '?search=donut'
+        with self.assertNumQueries(1):
+            self.response = self.client.get(url + '&page_size=1', format='json')
+        self.assertEqual(self.response.json()['results'][0]['donut_code'], 'THE_BART')
+        self.response = self.client.get(self.response.json()['next'], format='json')
+        self.assertEqual(self.response.json()['results'][0]['donut_code'], 'THE_HOMER')
+        self.assertIsNone(self.response.json()['next'])
+        self.response = self.client.get(url + '&limit=1&offset=1', format='json')
+        self.assertEqual(self.response.json()['count'], 2)
+        self.assertEqual(self.response.json()['results'][0]['donut_code'], 'THE_HOMER')
+        self.response = self.client.get(url + '&fields=donut_code', format='json')
+        self.assertEqual(self.response.json()['results'],
+                         [{'donut_code': 'THE_BART'}, {'donut_code': 'THE_HOMER'}])
+
+    def test_search_index_follows_writes(self):
+        """
+        DronutsDataViewSet: Test to verify the search index follows creates, updates and deletes
+        """
+        url = reverse(self.url_list) + '?search='
+        self.client.patch(reverse(self.url_detail, kwargs={'pk': self.donut_objs[0].id}),
+                          data={'description': 'glazed ring'})
+        self.assertEqual(self.client.get(url + 'sprinkles', format='json').json()['results'], [])
+        self.assertEqual(len(self.client.get(url + 'glazed', format='json').json()['results']), 1)
+        self.client.post(reverse('dronut_app:donuts-bulk'),
+                         data={"donuts": [{"donut_code": "THE_BART", "description": "glazed",
+                                           "price_per_unit": "4.75"}]},
+                         format='json')
+        self.assertEqual(len(self.client.get(url + 'glazed', format='json').json()['results']), 2)
+        self.client.delete(reverse(self.url_detail, kwargs={'pk': self.donut_objs[0].id}))
+        self.response = self.client.get(url + 'glazed', format='json')
+        self.assertEqual([donut['donut_code'] for donut in self.response.json()['results']],
+                         ['THE_BART'])
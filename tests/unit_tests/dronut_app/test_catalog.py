@@ -0,0 +1,73 @@
+""" Price catalog test cases for Dronut App"""
+from decimal import Decimal
+from django.test import TestCase
+from dronut_app.catalog import PriceCatalog
+from dronut_app.models import Donuts
+from tests.data_setup import DonutsTestDataMixin
+
+
+class PriceCatalogTests(DonutsTestDataMixin, TestCase):
+    """ Class for testing the in-process price catalog"""
+
+    def setUp(self):
+        self.catalog = PriceCatalog()
+        super().setUp()
+
+    def test_catalog_lazy_load(self):
+        """
+        PriceCatalog: Test to verify the catalog loads once and then serves from memory
+        """
+        self.assertEqual(self.catalog.stats()['rebuilds'], 0)
+        with self.assertNumQueries(1):
+            self.catalog.lookup_units(['THE_HOMER'])
+        with self.assertNumQueries(0):
+            units = self.catalog.lookup_units(['THE_HOMER', 'THE_MARGIE', 'THE_BART'])
+        self.assertEqual(units, ({'THE_HOMER': 850, 'THE_MARGIE': 1050}, Decimal('0.01')))
+        stats = self.catalog.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['rebuilds']), (3, 1, 1))
+
+    def test_catalog_invalidated_on_save(self):
+        """
+        PriceCatalog: Test to verify a price change is picked up on the next read
+        """
+        self.catalog.lookup_units(['THE_HOMER'])
+        donut = self.donut_objs[0]
+        donut.price_per_unit = Decimal('9.00')
+        donut.save()
+        self.assertEqual(self.catalog.lookup_units(['THE_HOMER'])[0], {'THE_HOMER': 900})
+        self.assertEqual(self.catalog.stats()['rebuilds'], 2)
+
+    def test_catalog_invalidated_on_delete(self):
+        """
+        PriceCatalog: Test to verify a deleted donut leaves the catalog
+        """
+        self.catalog.lookup_units(['THE_MARGIE'])
+        Donuts.objects.filter(donut_code='THE_MARGIE').delete()
+        self.assertEqual(self.catalog.lookup_units(['THE_MARGIE'])[0], {})
+
+    def test_catalog_get_by_id(self):
+        """
+        PriceCatalog: Test to verify donuts are found by id and invalid ids are misses
+        """
+        entry = self.catalog.get_by_id(self.donut_objs[1].id)
+        self.assertEqual(entry.donut_code, 'THE_MARGIE')
+        self.assertIsNone(self.catalog.get_by_id('not-a-uuid'))
+        self.assertEqual(self.catalog.to_instance(entry).price_per_unit, Decimal('10.50'))
+
+    def test_catalog_autocomplete(self):
+        """
+        PriceCatalog: Test to verify prefix lookups on the sorted search keys
+        """
+        Donuts.objects.create(donut_code='the_bart', price_per_unit=Decimal('1.00'))
+        self.assertEqual(self.catalog.autocomplete('THE', 10),
+                         ['the_bart', 'THE_HOMER', 'THE_MARGIE'])
+        self.assertEqual(self.catalog.autocomplete('the_b', 10), ['the_bart'])
+        self.assertEqual(self.catalog.autocomplete('THE', 2), ['the_bart', 'THE_HOMER'])
+        self.assertEqual(self.catalog.autocomplete('X', 10), [])
+
+    def test_catalog_lookup_units(self):
+        """
+        PriceCatalog: Test to verify prices are also served as integer units
+        """
+        self.assertEqual(self.catalog.lookup_units(['THE_HOMER', 'THE_BART']),
+                         ({'THE_HOMER': 850}, Decimal('0.01')))
@@ -0,0 +1,151 @@
+""" Change feed test cases for Dronut App"""
+import asyncio
+import time
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from dronut_app.models import DonutChange, Donuts
+from tests.data_setup import DonutsTestDataMixin
+
+
+class DonutChangesTests(DonutsTestDataMixin, APITestCase):
+    """ Class for testing the donut change feed"""
+
+    def setUp(self):
+        self.url_changes = reverse('dronut_app:donuts-changes')
+        super().setUp()
+        self.since = DonutChange.objects.latest('seq').seq
+
+    def get_changes(self, **params):
+        """ Changes after self.since as (action, donut_code, price_per_unit) tuples"""
+        results = self.client.get(self.url_changes, {'since': self.since, **params}).data
+        return [(change['action'], change['donut_code'], change['price_per_unit'])
+                for change in results['results']]
+
+    def test_changes_recorded(self):
+        """
+        DronutsDataViewSet: Test to verify creates, updates and deletes are recorded in order
+        """
+        response = self.client.post(reverse('dronut_app:donuts-list'), data={
+            'donut_code': 'THE_BART', 'price_per_unit': '3.00'})
+        url_detail = reverse('dronut_app:donuts-detail', args=[response.data['id']])
+        self.client.patch(url_detail, data={'price_per_unit': '4.00'})
+        self.client.delete(url_detail)
+        self.assertEqual(self.get_changes(), [('create', 'THE_BART', '3.00'),
+                                              ('update', 'THE_BART', '4.00'),
+                                              ('delete', 'THE_BART', '4.00')])
+        changes = self.client.get(self.url_changes, {'since': self.since}).data['results']
+        self.assertEqual({change['donut_id'] for change in changes}, {response.data['id']})
+        self.assertEqual([change['seq'] for change in changes],
+                         sorted(change['seq'] for change in changes))
+
+    def test_changes_rolled_back_with_write(self):
+        """
+        DronutsDataViewSet: Test to verify a write is rolled back when its change is not recorded
+        """
+        url_detail = reverse('dronut_app:donuts-detail', args=[self.donut_objs[0].id])
+        with mock.patch.object(DonutChange, 'save', side_effect=DatabaseError('feed is down')):
+            with self.assertRaises(DatabaseError):
+                self.client.post(reverse('dronut_app:donuts-list'), data={
+                    'donut_code': 'THE_BART', 'price_per_unit': '3.00'})
+            with self.assertRaises(DatabaseError):
+                self.client.patch(url_detail, data={'price_per_unit': '4.00'})
+            with self.assertRaises(DatabaseError):
+                self.client.delete(url_detail)
+        self.assertFalse(Donuts.objects.filter(donut_code='THE_BART').exists())
+        self.assertEqual(Donuts.objects.get(pk=self.donut_objs[0].id).price_per_unit,
+                         self.donut_objs[0].price_per_unit)
+        self.assertEqual(self.get_changes(), [])
+
+    def test_changes_bulk_upsert(self):
+        """
+        bulk_upsert: Test to verify bulk creates and updates are recorded with the stored ids
+        """
+        self.client.post(reverse('dronut_app:donuts-bulk'), data={'donuts': [
+            {'donut_code': 'THE_HOMER', 'price_per_unit': '9.00'},
+            {'donut_code': 'THE_BART', 'price_per_unit': '2.00'}]}, format='json')
+        self.assertEqual(self.get_changes(), [('update', 'THE_HOMER', '9.00'),
+                                              ('create', 'THE_BART', '2.00')])
+        changes = DonutChange.objects.filter(seq__gt=self.since).order_by('seq')
+        self.assertEqual([change.donut_id for change in changes],
+                         list(Donuts.objects.filter(donut_code__in=['THE_HOMER', 'THE_BART'])
+                              .order_by('-donut_code').values_list('id', flat=True)))
+
+    def test_changes_pages(self):
+        """
+        DronutsDataViewSet: Test to verify changes are paged with last_seq and has_more
+        """
+        for price in ('1.00', '2.00', '3.00'):
+            donut = self.donut_objs[0]
+            donut.price_per_unit = price
+            donut.save()
+        first_page = self.client.get(self.url_changes, {'since': self.since, 'limit': 2}).data
+        self.assertEqual([change['price_per_unit'] for change in first_page['results']],
+                         ['1.00', '2.00'])
+        self.assertTrue(first_page['has_more'])
+        last_page = self.client.get(self.url_changes, {'since': first_page['last_seq']}).data
+        self.assertEqual([change['price_per_unit'] for change in last_page['results']],
+                         ['3.00'])
+        self.assertFalse(last_page['has_more'])
+        empty_page = self.client.get(self.url_changes, {'since': last_page['last_seq']}).data
+        self.assertEqual((empty_page['results'], empty_page['last_seq']),
+                         ([], last_page['last_seq']))
+        for params in ({'since': 'x'}, {'since': -1}):
+            response = self.client.get(self.url_changes, params)
+            self.assertEqual(response.data['info'], 'Error encountered')
+
+    def test_changes_admin(self):
+        """
+        DonutDatAdmin: Test to verify donuts changed in the admin are recorded
+        """
+        get_user_model().objects.create_superuser('admin', 'admin@example.com', 'secret')
+        self.client.login(username='admin', password='secret')
+        donut = self.donut_objs[1]
+        response = self.client.post(reverse('admin:dronut_app_donuts_change', args=[donut.id]),
+                                    {'donut_code': 'THE_MARGIE', 'description': '',
+                                     'price_per_unit': '11.00'})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.get_changes(), [('update', 'THE_MARGIE', '11.00')])
+
+
+class AsyncDonutChangesTests(DonutsTestDataMixin, TestCase):
+    """ Class for testing the long polled change feed"""
+
+    def setUp(self):
+        self.url_changes = reverse('dronut_app:donuts-changes-async')
+        super().setUp()
+        self.since = DonutChange.objects.latest('seq').seq
+
+    async def test_changes_long_poll(self):
+        """
+        changes_async: Test to verify a waiting request answers once a donut is written
+        """
+        async def write_later():
+            await asyncio.sleep(0.3)
+            await Donuts.objects.acreate(donut_code='THE_BART', price_per_unit='3.00')
+
+        started = time.monotonic()
+        response, _ = await asyncio.gather(
+            self.async_client.get(self.url_changes, {'since': self.since, 'wait': 10}),
+            write_later())
+        self.assertLess(time.monotonic() - started, 5)
+        changes = response.json()['results']
+        self.assertEqual([(change['action'], change['donut_code']) for change in changes],
+                         [('create', 'THE_BART')])
+        self.assertEqual(response.json()['last_seq'], changes[0]['seq'])
+
+    async def test_changes_long_poll_timeout(self):
+        """
+        changes_async: Test to verify a wait without changes ends with no results
+        """
+        response = await self.async_client.get(self.url_changes,
+                                               {'since': self.since, 'wait': 0.3})
+        self.assertEqual(response.json(), {'results': [], 'last_seq': self.since,
+                                           'has_more': False})
+        response = await self.async_client.get(self.url_changes, {'wait': 'soon'})
+        self.assertEqual(response.json()['info'], 'Error encountered')
+        response = await self.async_client.post(self.url_changes)
+        self.assertEqual(response.status_code, 405)
@@ -0,0 +1,54 @@
+""" Row encoder test cases for Dronut App"""
+from decimal import Decimal
+from unittest import mock
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from dronut_app.api import DronutsDataViewSet
+from dronut_app.encoders import RowEncoder
+from dronut_app.models import Donuts
+from dronut_app.serializers import DonutSerializer
+from tests.data_setup import DonutsTestDataMixin
+
+
+class RowEncoderTests(DonutsTestDataMixin, APITestCase):
+    """ Class for testing the lean read path against DonutSerializer output"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        Donuts.objects.create(donut_code='THE_"NED"', description=None,
+                              price_per_unit=Decimal('0.5'))
+        Donuts.objects.create(donut_code='THE_CAFÉ',
+                              description='crème brûlée\\ "🍩"\u2028',
+                              price_per_unit=Decimal('1234567890.99'))
+
+    def setUp(self):
+        self.row_encoder = RowEncoder(DonutSerializer())
+        super().setUp()
+
+    def test_encode_rows_byte_identical(self):
+        """
+        RowEncoder: Test to verify encoded rows match the serializer and JSON renderer output
+        """
+        queryset = Donuts.objects.order_by('donut_code')
+        expected = JSONRenderer().render(DonutSerializer(queryset, many=True).data)
+        rows = queryset.values_list(*self.row_encoder.fields, named=True)
+        self.assertEqual(self.row_encoder.to_bytes(self.row_encoder.encode_rows(rows)), expected)
+
+    def test_lean_reads_byte_identical(self):
+        """
+        DronutsDataViewSet: Test to verify lean list and detail responses match the serializer path
+        """
+        urls = [reverse('dronut_app:donuts-list'),
+                reverse('dronut_app:donuts-list') + '?page_size=2',
+                reverse('dronut_app:donuts-list') + '?limit=2&offset=1',
+                reverse('dronut_app:donuts-list') + '?q=the_c',
+                reverse('dronut_app:donuts-detail', kwargs={'pk': self.donut_objs[0].id})]
+        for url in urls:
+            lean = self.client.get(url, format='json')
+            with mock.patch.object(DronutsDataViewSet, 'lean_reads', False):
+                full = self.client.get(url, format='json')
+            self.assertEqual(lean.status_code, 200)
+            self.assertEqual(lean.content, full.content)
+            self.assertEqual(lean['Content-Type'], full['Content-Type'])
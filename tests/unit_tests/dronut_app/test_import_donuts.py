@@ -0,0 +1,77 @@
+""" import_donuts management command test cases for Dronut App"""
+import io
+import json
+import os
+import shutil
+import tempfile
+from decimal import Decimal
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from dronut_app.models import Donuts
+from tests.data_setup import DonutsTestDataMixin
+
+
+class ImportDonutsCommandTests(DonutsTestDataMixin, TestCase):
+    """ Class for testing the streaming donut import command"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        super().setUp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+        super().tearDown()
+
+    def write_file(self, name, content):
+        """ write an import file and return its path"""
+        path = os.path.join(self.tmp_dir, name)
+        with open(path, 'w', encoding='utf-8') as import_file:
+            import_file.write(content)
+        return path
+
+    def import_donuts(self, *args, **options):
+        """ run the command and return its stdout and stderr"""
+        stdout, stderr = io.StringIO(), io.StringIO()
+        call_command('import_donuts', *args, stdout=stdout, stderr=stderr, **options)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_import_csv(self):
+        """
+        import_donuts: Test to verify a CSV file creates and updates donuts in batches
+        """
+        path = self.write_file('donuts.csv', 'donut_code,description,price_per_unit\n'
+                                             'THE_HOMER,pink,9.00\n'
+                                             'THE_BART,,4.75\n'
+                                             'THE_LISA,vegan,free\n')
+        stdout, stderr = self.import_donuts(path, batch_size=2)
+        self.assertIn('1 created, 1 updated, 1 failed', stdout)
+        self.assertIn('rows/s', stdout)
+        self.assertIn('Record 3', stderr)
+        self.assertEqual(Donuts.objects.get(donut_code='THE_HOMER').price_per_unit, Decimal('9.00'))
+        self.assertEqual(Donuts.objects.get(donut_code='THE_BART').search_key, 'THE_BART')
+        self.assertFalse(os.path.exists(path + '.checkpoint'))
+
+    def test_import_ndjson_resume(self):
+        """
+        import_donuts: Test to verify an NDJSON import resumes after the checkpointed records
+        """
+        lines = [{'donut_code': 'THE_BART', 'price_per_unit': '4.75'},
+                 {'donut_code': 'THE_LISA', 'price_per_unit': '5.25'}]
+        path = self.write_file('donuts.ndjson', '\n'.join(json.dumps(line) for line in lines))
+        with open(path + '.checkpoint', 'w', encoding='utf-8') as checkpoint_file:
+            json.dump({'source': os.path.abspath(path), 'size': os.path.getsize(path),
+                       'records': 1}, checkpoint_file)
+        stdout, _ = self.import_donuts(path)
+        self.assertIn('Resuming', stdout)
+        self.assertFalse(Donuts.objects.filter(donut_code='THE_BART').exists())
+        self.assertTrue(Donuts.objects.filter(donut_code='THE_LISA').exists())
+
+    def test_import_checkpoint_mismatch(self):
+        """
+        import_donuts: Test to verify a checkpoint of another file is refused
+        """
+        path = self.write_file('donuts.ndjson', '{"donut_code": "THE_BART"}\n')
+        self.write_file('donuts.ndjson.checkpoint', '{"source": "other", "size": 1, "records": 1}')
+        with self.assertRaises(CommandError):
+            self.import_donuts(path)
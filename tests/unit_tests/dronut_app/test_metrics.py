@@ -0,0 +1,85 @@
+""" Request metrics test cases for Dronut App"""
+from django.test import TestCase
+from django.urls import reverse
+from dronut_app import metrics
+from tests.data_setup import DonutsTestDataMixin
+
+
+def series_values(names):
+    """ Current values of the named metric series, 0 for a series not recorded yet"""
+    values = dict(line.rsplit(' ', 1) for line in metrics.render_metrics().splitlines()
+                  if not line.startswith('#'))
+    return [float(values.get(name, 0)) for name in names]
+
+
+class MetricsTests(DonutsTestDataMixin, TestCase):
+    """ Class for testing the performance middleware and the metrics end point"""
+
+    def test_histogram_exposition(self):
+        """
+        Histogram: Test to verify cumulative buckets, sum and count in the text format
+        """
+        histogram = metrics.Histogram('test_seconds', 'Test histogram', (0.1, 1.0))
+        histogram.observe(0.05, view='a"b')
+        histogram.observe(0.5, view='a"b')
+        self.assertEqual(list(histogram.collect()), [
+            '# HELP test_seconds Test histogram',
+            '# TYPE test_seconds histogram',
+            'test_seconds_bucket{view="a\\"b",le="0.1"} 1',
+            'test_seconds_bucket{view="a\\"b",le="1.0"} 2',
+            'test_seconds_bucket{view="a\\"b",le="+Inf"} 2',
+            'test_seconds_sum{view="a\\"b"} 0.55',
+            'test_seconds_count{view="a\\"b"} 2',
+        ])
+
+    def test_server_timing_header(self):
+        """
+        performance_middleware: Test to verify the Server-Timing header reports the queries
+        """
+        donut_id = self.donut_objs[0].id
+        response = self.client.get(reverse('dronut_app:donuts-detail', args=[donut_id]))
+        self.assertEqual(response.status_code, 200)
+        total, database = response['Server-Timing'].split(', ')
+        self.assertTrue(total.startswith('total;dur='))
+        self.assertTrue(database.startswith('db;dur='))
+        self.assertNotIn('desc="0 queries"', database)
+
+    async def test_server_timing_header_async(self):
+        """
+        performance_middleware: Test to verify queries of async views are counted under ASGI
+        """
+        series = ('dronut_db_queries_sum{view="dronut_app:donuts-list-async"}',
+                  'dronut_db_queries_count{view="dronut_app:donuts-list-async"}')
+        before = series_values(series)
+        response = await self.async_client.get(reverse('dronut_app:donuts-list-async'))
+        self.assertEqual(len(response.json()['results']), 2)
+        self.assertIn('desc="1 queries"', response['Server-Timing'])
+        self.assertEqual([after - count for after, count in zip(series_values(series), before)],
+                         [1, 1])
+
+    def test_metrics_per_url_name(self):
+        """
+        metrics: Test to verify requests are recorded under their resolved URL name
+        """
+        self.client.post(reverse('dronut_app:donuts-quotes'),
+                         {'donuts': [{'donut_code': 'THE_HOMER', 'quantity': 2}]},
+                         content_type='application/json')
+        response = self.client.get(reverse('dronut_app:metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        document = response.content.decode()
+        self.assertIn('# TYPE dronut_request_duration_seconds histogram', document)
+        self.assertIn('dronut_request_duration_seconds_count{view="dronut_app:donuts-quotes"}',
+                      document)
+        self.assertIn('dronut_responses_total{status="200",view="dronut_app:donuts-quotes"}',
+                      document)
+        self.assertIn('dronut_catalog_rebuilds ', document)
+        self.assertIn('dronut_quote_cache_hit_rate ', document)
+
+    def test_unresolved_requests(self):
+        """
+        performance_middleware: Test to verify unknown paths are recorded as unresolved
+        """
+        self.client.get('/no-such-path/')
+        document = self.client.get(reverse('dronut_app:metrics')).content.decode()
+        self.assertIn('dronut_responses_total{status="404",view="unresolved"}', document)
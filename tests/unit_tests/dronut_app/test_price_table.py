@@ -0,0 +1,148 @@
+""" Shared price table test cases for Dronut App"""
+import os
+import shutil
+import tempfile
+from decimal import Decimal
+from unittest import mock
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from dronut_app.catalog import get_catalog_version, price_catalog
+from dronut_app.checks import check_price_table_cache
+from dronut_app.models import Donuts
+from dronut_app.price_table import PriceTable, SharedPriceTable, write_price_table
+from tests.data_setup import DonutsTestDataMixin
+
+
+class PriceTableTests(DonutsTestDataMixin, TestCase):
+    """ Class for testing the memory-mapped price table"""
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, 'prices.table')
+        self.table = SharedPriceTable(self.path)
+        super().setUp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+        super().tearDown()
+
+    def test_table_lookup(self):
+        """
+        SharedPriceTable: Test to verify prices are read from the table after one build
+        """
+        Donuts.objects.create(donut_code='THE_BÄRT', price_per_unit='0.05')
+        with self.assertNumQueries(1):
+            self.table.lookup_units(['THE_HOMER'])
+        with self.assertNumQueries(0):
+            units, scale = self.table.lookup_units(['THE_HOMER', 'THE_MARGIE', 'THE_BÄRT',
+                                                    'THE_HOMER_TOO_LONG_FOR_ANY_CODE', 'THE_H',
+                                                    ''])
+        self.assertEqual(units, {'THE_HOMER': 850, 'THE_MARGIE': 1050, 'THE_BÄRT': 5})
+        self.assertEqual(str(scale * units['THE_BÄRT']), '0.05')
+        stats = self.table.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['builds'], stats['size']),
+                         (4, 3, 1, 3))
+
+    def test_table_rows(self):
+        """
+        PriceTable: Test to verify rows are sorted by code and hold the donut ids
+        """
+        self.assertEqual(write_price_table(self.path, Donuts.objects.all(), 7), 2)
+        table = PriceTable.open(self.path)
+        self.assertEqual(table.version, 7)
+        index = table.index_of('THE_MARGIE')
+        self.assertEqual(index, 1)
+        self.assertEqual(table.id_at(index), self.donut_objs[1].id)
+        self.assertEqual(table.price_at(index), Decimal('10.50'))
+        self.assertIsNone(PriceTable.open(os.path.join(self.folder, 'missing.table')))
+
+    def test_table_swapped_on_new_version(self):
+        """
+        SharedPriceTable: Test to verify a price change publishes a new table
+        """
+        old_table = self.table.refresh()
+        donut = self.donut_objs[0]
+        donut.price_per_unit = Decimal('9.00')
+        donut.save()
+        self.assertEqual(self.table.lookup_units(['THE_HOMER']),
+                         ({'THE_HOMER': 900}, Decimal('0.01')))
+        self.assertEqual(self.table.stats()['version'], get_catalog_version())
+        # a reader holding the replaced table still sees a consistent old table
+        self.assertEqual(old_table.lookup_units(['THE_HOMER']), {'THE_HOMER': 850})
+
+    def test_table_needs_shared_cache(self):
+        """
+        check_price_table_cache: Test to verify the table is rejected with a process local cache
+        """
+        self.assertEqual(check_price_table_cache(None), [])
+        with override_settings(DRONUT_PRICE_TABLE=self.path):
+            errors = check_price_table_cache(None)
+            self.assertEqual([error.id for error in errors], ['dronut_app.E001'])
+            with override_settings(CACHES={'default': {
+                    'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+                    'LOCATION': 'dronut_cache'}}):
+                self.assertEqual(check_price_table_cache(None), [])
+
+    def test_table_shared_between_workers(self):
+        """
+        SharedPriceTable: Test to verify another worker maps the table without building it
+        """
+        self.table.refresh()
+        worker = SharedPriceTable(self.path)
+        with self.assertNumQueries(0):
+            self.assertEqual(worker.lookup_units(['THE_MARGIE']),
+                             ({'THE_MARGIE': 1050}, Decimal('0.01')))
+        self.assertEqual(worker.stats()['builds'], 0)
+        self.assertEqual(worker.stats()['version'], get_catalog_version())
+
+
+class PriceTableQuotesTests(DonutsTestDataMixin, APITestCase):
+    """ Class for testing quotes priced from the shared price table"""
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.table = SharedPriceTable(os.path.join(self.folder, 'prices.table'))
+        super().setUp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+        super().tearDown()
+
+    def test_quotes_from_table(self):
+        """
+        SharedPriceTable: Test to verify quotes read prices from the configured table
+        """
+        cart = {'donuts': [{'donut_code': 'THE_HOMER', 'quantity': 2},
+                           {'donut_code': 'THE_MARGIE', 'quantity': 1}]}
+        with mock.patch('dronut_app.price_table.shared_price_table', self.table):
+            response = self.client.post(reverse('dronut_app:donuts-quotes'), data=cart,
+                                        format='json')
+            metrics = self.client.get(reverse('dronut_app:metrics'))
+        self.assertEqual(response.data['quote_total'], Decimal('27.50'))
+        self.assertEqual(self.table.stats()['hits'], 2)
+        self.assertIn(b'dronut_price_table_builds 1', metrics.content)
+
+    def test_reads_without_worker_catalog(self):
+        """
+        SharedPriceTable: Test to verify detail reads and autocomplete skip the worker catalog
+        """
+        price_catalog.invalidate()
+        rebuilds = price_catalog.stats()['rebuilds']
+        url = reverse('dronut_app:donuts-detail', args=[self.donut_objs[1].id])
+        with mock.patch('dronut_app.price_table.shared_price_table', self.table):
+            with self.assertNumQueries(1):
+                response = self.client.get(url, format='json')
+            not_modified = self.client.get(url, format='json',
+                                           HTTP_IF_NONE_MATCH=response['ETag'])
+            missing = self.client.get(reverse('dronut_app:donuts-detail', args=['not-an-id']))
+            autocomplete = self.client.get(reverse('dronut_app:donuts-autocomplete'),
+                                           {'q': 'the_'})
+            detail_async = self.client.get(reverse('dronut_app:donuts-detail-async',
+                                                   args=[self.donut_objs[0].id]))
+        self.assertEqual(response.json()['price_per_unit'], '10.50')
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(missing.status_code, 404)
+        self.assertEqual(autocomplete.data['results'], ['THE_HOMER', 'THE_MARGIE'])
+        self.assertEqual(detail_async.json()['donut_code'], 'THE_HOMER')
+        self.assertEqual(price_catalog.stats()['rebuilds'], rebuilds)
@@ -0,0 +1,151 @@
+""" Pricing engine test cases for Dronut App"""
+import random
+from decimal import Decimal, localcontext
+from unittest import mock
+from django.test import SimpleTestCase, TestCase
+from dronut_app.pricing import ERROR_BAD_QUANTITY, PricingEngine
+from tests.data_setup import DonutsTestDataMixin
+
+
+class PricingEngineTests(DonutsTestDataMixin, TestCase):
+    """ Class for testing the quote pricing engine"""
+
+    def setUp(self):
+        self.pricing_engine = PricingEngine()
+        super().setUp()
+
+    def test_quote_single_query(self):
+        """
+        PricingEngine: Test to verify a cart is priced with one query whatever its size
+        """
+        for cart_size in (1, 100, 1000):
+            cart = [{'donut_code': 'THE_HOMER', 'quantity': 2}] * cart_size
+            with self.assertNumQueries(1):
+                quote = self.pricing_engine.quote(cart)
+            self.assertEqual(quote['quote_total'], Decimal('17.00') * cart_size)
+
+    def test_quote_lookup_batches(self):
+        """
+        PricingEngine: Test to verify lookups above the parameter limit are batched
+        """
+        codes = ['THE_HOMER', 'THE_MARGIE'] + [f'CODE_{index}' for index in range(1500)]
+        with self.assertNumQueries(2):
+            prices = self.pricing_engine.lookup_prices(codes)
+        self.assertEqual(prices, {'THE_HOMER': Decimal('8.50'), 'THE_MARGIE': Decimal('10.50')})
+
+    def test_quote_not_a_list(self):
+        """
+        PricingEngine: Test to verify a cart that is not a list is rejected
+        """
+        with self.assertRaises(TypeError):
+            self.pricing_engine.quote({'donut_code': 'THE_HOMER', 'quantity': 1})
+
+    def test_quote_database_units(self):
+        """
+        PricingEngine: Test to verify database prices are priced in integer units
+        """
+        self.assertEqual(self.pricing_engine.lookup_units(['THE_MARGIE', 'THE_BART']),
+                         ({'THE_MARGIE': 1050}, Decimal('0.01')))
+        quote = self.pricing_engine.quote([{'donut_code': 'THE_MARGIE', 'quantity': 3}])
+        self.assertEqual(quote['quote_line_item'][0]['line_value'].as_tuple(),
+                         Decimal('31.50').as_tuple())
+
+    async def test_aquote_database_lookup(self):
+        """
+        PricingEngine: Test to verify the async quote prices a cart from the database
+        """
+        quote = await self.pricing_engine.aquote([{'donut_code': 'THE_HOMER', 'quantity': 3},
+                                                  {'donut_code': 'THE_MARGIE', 'quantity': 10}])
+        self.assertEqual(quote['quote_total'], Decimal('130.50'))
+
+    def test_quote_batch_single_query(self):
+        """
+        PricingEngine: Test to verify all carts of a batch are priced with one query
+        """
+        carts = [{'donuts': [{'donut_code': 'THE_HOMER', 'quantity': cart + 1},
+                             {'donut_code': 'THE_MARGIE', 'quantity': 1}]}
+                 for cart in range(200)]
+        with self.assertNumQueries(1):
+            quotes = self.pricing_engine.quote_batch(carts)
+        self.assertEqual([quote['quote_total'] for quote in quotes[:2]],
+                         [Decimal('19.00'), Decimal('27.50')])
+
+
+def exact_form(quote):
+    """ A quote with its Decimals replaced by their sign, digits and exponent"""
+    if isinstance(quote, dict):
+        return {key: exact_form(value) for key, value in quote.items()}
+    if isinstance(quote, list):
+        return [exact_form(value) for value in quote]
+    if isinstance(quote, Decimal):
+        return quote.as_tuple()
+    return quote
+
+
+class IntegerPricingPropertyTests(SimpleTestCase):
+    """ Class for testing integer unit quotes against Decimal quotes on generated carts"""
+
+    def setUp(self):
+        self.random = random.Random(2022)
+        self.pricing_engine = PricingEngine()
+
+    def random_price(self, places=2):
+        """ A price of at most 12 digits, occasionally zero or negative"""
+        units = self.random.choice([0, 1, self.random.randrange(10 ** 12),
+                                    self.random.randrange(1000)])
+        if self.random.random() < 0.1:
+            units = -units
+        return Decimal(units).scaleb(-places) if units else Decimal((0, (0,), -places))
+
+    def random_cart(self, prices):
+        """ Parsed lines of known and unknown codes, small to huge quantities and errors"""
+        codes = list(prices) + ['UNKNOWN']
+        lines = []
+        for _ in range(self.random.randrange(30)):
+            quantity = self.random.choice([1, self.random.randrange(1, 100),
+                                           self.random.randrange(1, 10 ** 20)])
+            error = ERROR_BAD_QUANTITY if self.random.random() < 0.05 else None
+            lines.append((self.random.choice(codes), None if error else quantity, error))
+        return lines
+
+    def assertSameQuote(self, parsed_lines, prices):  # pylint: disable=invalid-name
+        """ Fail unless both pricing paths give bit-identical quotes"""
+        units, scale = self.pricing_engine.to_units(prices)
+        self.assertEqual(exact_form(PricingEngine.build_quote_units(parsed_lines, units, scale)),
+                         exact_form(PricingEngine.build_quote_decimal(parsed_lines, prices)))
+
+    def test_generated_carts(self):
+        """
+        PricingEngine: Test to verify integer unit quotes are identical to Decimal quotes
+        """
+        for example in range(500):
+            prices = {f'CODE_{index}': self.random_price() for index in range(5)}
+            with self.subTest(example=example):
+                self.assertSameQuote(self.random_cart(prices), prices)
+
+    def test_generated_carts_low_precision(self):
+        """
+        PricingEngine: Test to verify values beyond the Decimal precision round identically
+        """
+        for precision in (6, 12, 28):
+            with localcontext() as context:
+                context.prec = precision
+                for example in range(200):
+                    prices = {f'CODE_{index}': self.random_price() for index in range(5)}
+                    with self.subTest(precision=precision, example=example):
+                        self.assertSameQuote(self.random_cart(prices), prices)
+
+    def test_quote_batch_totals(self):
+        """
+        PricingEngine: Test to verify batch quotes are identical to Decimal quotes
+        """
+        prices = {f'CODE_{index}': self.random_price() for index in range(50)}
+        carts = [[{'donut_code': donut_code, 'quantity': quantity}
+                  for donut_code, quantity, _ in self.random_cart(prices)]
+                 for _ in range(100)]
+        engine = PricingEngine(catalog=mock.Mock(
+            lookup_units=lambda donut_codes: self.pricing_engine.to_units(prices)))
+        quotes = engine.quote_batch([{'donuts': cart} for cart in carts])
+        self.assertEqual(exact_form(quotes), exact_form([
+            PricingEngine.build_quote_decimal(PricingEngine.parse_cart(cart)[0], prices)
+            for cart in carts]))
@@ -0,0 +1,202 @@
+""" Query budget test cases for the Dronut App API"""
+import math
+from django.db import connection
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from dronut_app.api import DONUT_BATCH_MAX_KEYS
+from dronut_app.catalog import price_catalog
+from dronut_app.changes import CHANGES_LIMIT
+from dronut_app.models import DonutChange, Donuts
+from tests.data_setup import DonutsDataSetup, DonutsTestDataMixin
+from tests.query_budget import QueryBudgetMixin, query_budget
+
+CATALOG_SIZES = (10, 100, 1000)
+CART_SIZES = (1, 100, 1000)
+
+# most queries each DronutsDataViewSet route may run, whatever the catalog or cart size
+ROUTE_BUDGETS = {
+    'list': 1,
+    'list-offset': 2,
+    'list-search': 1,
+    'list-fulltext': 1,
+    'retrieve': 0,
+    'batch': 1,
+    'changes': 1,
+    # writes run in a transaction, a savepoint and its release inside the test's
+    'create': 5,
+    'update': 6,
+    'partial_update': 6,
+    'destroy': 5,
+    'quotes': 0,
+    'quotes-batch': 0,
+    'export': 3,
+    'autocomplete': 0,
+    'catalog-stats': 0,
+    'quote-cache-stats': 0,
+}
+
+
+def bulk_budget(rows):
+    """
+    Query budget of a bulk upsert of `rows` new or existing donuts, in one batch.
+    The code lookup and the insert are split at the backend's query parameter
+    limit, and so are the change feed inserts. The savepoint and its release are
+    the other two queries
+    """
+    lookups = math.ceil(rows / (connection.features.max_query_params or rows))
+    return 2 + lookups + bulk_inserts(Donuts, rows) + bulk_inserts(DonutChange, rows)
+
+
+def bulk_inserts(model, rows):
+    """ Number of inserts bulk_create splits `rows` new instances of `model` into"""
+    fields = [field for field in model._meta.concrete_fields if not field.primary_key
+              or field.has_default()]
+    return math.ceil(rows / connection.ops.bulk_batch_size(fields, [None] * rows))
+
+
+class QueryBudgetTests(DonutsTestDataMixin, QueryBudgetMixin, APITestCase):
+    """ Class for testing the database cost of every Dronuts Data View route"""
+
+    def setUp(self):
+        self.data_setup = DonutsDataSetup()
+        self.catalog_size = 0
+        super().setUp()
+
+    def grow_catalog(self, catalog_size):
+        """ Add catalog donuts up to `catalog_size` and load the price catalog"""
+        self.data_setup.setup_catalog_data(catalog_size, start=self.catalog_size)
+        self.catalog_size = catalog_size
+        # the first read after a write reloads the catalog with one query, keep
+        # that out of the budgets of the routes served from memory
+        price_catalog.refresh()
+
+    def assertRouteBudget(self, route, catalog_size, budget=None):  # pylint: disable=invalid-name
+        """ Query budget of a route, labelled with the catalog size"""
+        return self.assertQueryBudget(ROUTE_BUDGETS[route] if budget is None else budget,
+                                      label=f'{route} with {catalog_size} donuts')
+
+    def test_read_budgets(self):
+        """
+        DronutsDataViewSet: Test to verify every read route stays within budget
+        """
+        url_list = reverse('dronut_app:donuts-list')
+        for catalog_size in CATALOG_SIZES:
+            self.grow_catalog(catalog_size)
+            with self.assertRouteBudget('list', catalog_size):
+                response = self.client.get(url_list, {'page_size': 5})
+            next_page = response.json()['next']
+            with self.assertRouteBudget('list', catalog_size):
+                self.client.get(next_page)
+            with self.assertRouteBudget('list-offset', catalog_size):
+                self.client.get(url_list, {'limit': 50, 'offset': catalog_size - 50})
+            with self.assertRouteBudget('list-search', catalog_size):
+                self.client.get(url_list, {'q': 'catalog_0'})
+            with self.assertRouteBudget('list-fulltext', catalog_size):
+                self.client.get(url_list, {'search': 'catalog donut 1'})
+            donut_id = Donuts.objects.get(
+                donut_code=self.data_setup.catalog_code(catalog_size - 1)).id
+            with self.assertRouteBudget('retrieve', catalog_size):
+                response = self.client.get(reverse('dronut_app:donuts-detail', args=[donut_id]))
+            self.assertEqual(response.status_code, 200)
+            codes = [self.data_setup.catalog_code(index % catalog_size)
+                     for index in range(DONUT_BATCH_MAX_KEYS)]
+            with self.assertRouteBudget('batch', catalog_size):
+                response = self.client.get(reverse('dronut_app:donuts-batch'),
+                                           {'codes': ','.join(codes)})
+            self.assertEqual(len(response.json()['results']), DONUT_BATCH_MAX_KEYS)
+            with self.assertRouteBudget('changes', catalog_size):
+                response = self.client.get(reverse('dronut_app:donuts-changes'), {'since': 0})
+            self.assertEqual(len(response.data['results']),
+                             min(CHANGES_LIMIT, DonutChange.objects.count()))
+            with self.assertRouteBudget('export', catalog_size):
+                response = self.client.get(reverse('dronut_app:donuts-export'),
+                                           {'format': 'ndjson'})
+                lines = b''.join(response.streaming_content).splitlines()
+            self.assertEqual(len(lines), catalog_size + 2)
+            with self.assertRouteBudget('autocomplete', catalog_size):
+                response = self.client.get(reverse('dronut_app:donuts-autocomplete'),
+                                           {'q': 'cat'})
+            self.assertEqual(response.data['results'],
+                             [self.data_setup.catalog_code(index) for index in range(10)])
+            with self.assertRouteBudget('catalog-stats', catalog_size):
+                self.client.get(reverse('dronut_app:donuts-catalog-stats'))
+            with self.assertRouteBudget('quote-cache-stats', catalog_size):
+                self.client.get(reverse('dronut_app:donuts-quote-cache-stats'))
+
+    def test_write_budgets(self):
+        """
+        DronutsDataViewSet: Test to verify create, update and destroy stay within budget
+        """
+        for catalog_size in CATALOG_SIZES:
+            self.grow_catalog(catalog_size)
+            with self.assertRouteBudget('create', catalog_size):
+                response = self.client.post(reverse('dronut_app:donuts-list'), data={
+                    'donut_code': f'NEW_{catalog_size}', 'price_per_unit': '3.00'})
+            self.assertEqual(response.status_code, 201)
+            url_detail = reverse('dronut_app:donuts-detail', args=[response.data['id']])
+            with self.assertRouteBudget('update', catalog_size):
+                response = self.client.put(url_detail, data={
+                    'donut_code': f'NEW_{catalog_size}', 'price_per_unit': '3.50'})
+            self.assertEqual(response.status_code, 200)
+            with self.assertRouteBudget('partial_update', catalog_size):
+                response = self.client.patch(url_detail, data={'price_per_unit': '4.00'})
+            self.assertEqual(response.status_code, 200)
+            with self.assertRouteBudget('destroy', catalog_size):
+                response = self.client.delete(url_detail)
+            self.assertEqual(response.status_code, 204)
+
+    def test_quote_budgets(self):
+        """
+        DronutsDataViewSet: Test to verify quotes stay within budget for every cart size
+        """
+        for catalog_size in CATALOG_SIZES:
+            self.grow_catalog(catalog_size)
+            for cart_size in CART_SIZES:
+                cart = [{'donut_code': self.data_setup.catalog_code(line % catalog_size),
+                         'quantity': line + 1} for line in range(cart_size)]
+                with self.assertRouteBudget('quotes', catalog_size):
+                    response = self.client.post(reverse('dronut_app:donuts-quotes'),
+                                                data={'donuts': cart}, format='json')
+                self.assertEqual(len(response.data['quote_line_item']), cart_size)
+                with self.assertRouteBudget('quotes-batch', catalog_size):
+                    response = self.client.post(reverse('dronut_app:donuts-quotes-batch'),
+                                                data={'carts': [{'donuts': cart}] * 3},
+                                                format='json')
+                self.assertEqual(len(response.data['quotes']), 3)
+
+    def test_bulk_budgets(self):
+        """
+        DronutsDataViewSet: Test to verify bulk upserts of one batch stay within budget
+        """
+        for catalog_size in CATALOG_SIZES:
+            self.grow_catalog(catalog_size)
+            for rows in CART_SIZES:
+                # the first catalog size creates these donuts, the others update them
+                records = [{'donut_code': f'BULK_{index:05d}', 'price_per_unit': '2.00'}
+                           for index in range(rows)]
+                with self.assertRouteBudget('bulk', catalog_size, bulk_budget(rows)):
+                    response = self.client.post(reverse('dronut_app:donuts-bulk'),
+                                                data={'donuts': records}, format='json')
+                self.assertEqual(response.data['received'], rows)
+
+    def test_budget_failure_lists_sql(self):
+        """
+        QueryBudgetMixin: Test to verify an exceeded budget fails with the offending SQL
+        """
+        with self.assertRaises(AssertionError) as failure:
+            with self.assertQueryBudget(1, label='two reads'):
+                list(Donuts.objects.all())
+                Donuts.objects.count()
+        message = str(failure.exception)
+        self.assertIn('two reads: 2 queries executed, budget is 1', message)
+        self.assertIn('1. SELECT', message)
+        self.assertIn('2. SELECT COUNT(*)', message)
+
+    @query_budget(1)
+    def test_budget_decorator(self):
+        """
+        query_budget: Test to verify a test method can declare its budget with the decorator
+        """
+        price_catalog.invalidate()
+        for _ in range(3):
+            self.assertIn('THE_HOMER', price_catalog.lookup(['THE_HOMER']))
@@ -0,0 +1,79 @@
+""" Quote cache test cases for Dronut App"""
+from decimal import Decimal
+from django.test import TestCase, override_settings
+from dronut_app.catalog import PriceCatalog
+from dronut_app.pricing import PricingEngine
+from dronut_app.quote_cache import QuoteMemo
+from tests.data_setup import DonutsTestDataMixin
+
+TEST_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'quotes': {
+        'BACKEND': 'dronut_app.cache.MeteredLocMemCache',
+        'LOCATION': 'test-quotes',
+        'OPTIONS': {'MAX_ENTRIES': 2, 'CULL_FREQUENCY': 2},
+    },
+}
+
+
+@override_settings(CACHES=TEST_CACHES)
+class QuoteMemoTests(DonutsTestDataMixin, TestCase):
+    """ Class for testing memoized quotes"""
+
+    def setUp(self):
+        self.pricing_engine = PricingEngine(catalog=PriceCatalog())
+        self.quote_memo = QuoteMemo()
+        self.quote_memo.cache.clear()
+        super().setUp()
+
+    def test_quote_cache_hit_in_cart_order(self):
+        """
+        QuoteMemo: Test to verify a cart with the same lines in another order is a cache hit
+        """
+        cart = [{'donut_code': 'THE_HOMER', 'quantity': 3},
+                {'donut_code': 'THE_BART', 'quantity': 1},
+                {'donut_code': 'THE_MARGIE', 'quantity': 10}]
+        first = self.quote_memo.quote(self.pricing_engine, cart)
+        second = self.quote_memo.quote(self.pricing_engine, cart[::-1])
+        self.assertEqual((self.quote_memo.hits, self.quote_memo.misses), (1, 1))
+        self.assertEqual(first['quote_total'], Decimal('130.50'))
+        self.assertEqual(second['quote_total'], Decimal('130.50'))
+        self.assertEqual([item['donut_code'] for item in second['quote_line_item']],
+                         ['THE_MARGIE', 'THE_HOMER'])
+        self.assertEqual(second['quote_errors'],
+                         [{'line': 1, 'donut_code': 'THE_BART', 'error': 'Unknown donut code'}])
+
+    def test_quote_cache_invalidated_on_price_change(self):
+        """
+        QuoteMemo: Test to verify a price change retires the cached quotes
+        """
+        cart = [{'donut_code': 'THE_HOMER', 'quantity': 2}]
+        self.quote_memo.quote(self.pricing_engine, cart)
+        donut = self.donut_objs[0]
+        donut.price_per_unit = Decimal('9.00')
+        donut.save()
+        quote = self.quote_memo.quote(self.pricing_engine, cart)
+        self.assertEqual(quote['quote_total'], Decimal('18.00'))
+        self.assertEqual(self.quote_memo.misses, 2)
+
+    def test_quote_cache_skips_invalid_carts(self):
+        """
+        QuoteMemo: Test to verify carts with invalid lines are priced without the cache
+        """
+        cart = [{'donut_code': 'THE_HOMER', 'quantity': 'two'}]
+        self.quote_memo.quote(self.pricing_engine, cart)
+        self.assertEqual(self.quote_memo.stats()['entries'], 0)
+
+    def test_quote_cache_stats(self):
+        """
+        QuoteMemo: Test to verify the hit rate, eviction and memory counters
+        """
+        for quantity in (1, 2, 3, 1):
+            self.quote_memo.quote(self.pricing_engine,
+                                  [{'donut_code': 'THE_HOMER', 'quantity': quantity}])
+        stats = self.quote_memo.stats()
+        self.assertEqual(stats['misses'], 4)
+        self.assertEqual(stats['hit_rate'], 0.0)
+        self.assertEqual(stats['entries'], 2)
+        self.assertGreater(stats['evictions'], 0)
+        self.assertGreater(stats['memory_bytes'], 0)
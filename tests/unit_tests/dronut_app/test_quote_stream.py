@@ -0,0 +1,115 @@
+""" Streaming quote test cases for Dronut App"""
+import io
+import json
+import tracemalloc
+from decimal import Decimal
+from django.test import TestCase
+from django.urls import reverse
+from dronut_app.pricing import (ERROR_BAD_LINE, ERROR_BAD_QUANTITY, ERROR_UNKNOWN_CODE,
+                                PricingEngine)
+from dronut_app.quote_stream import ERROR_BAD_JSON, ERROR_LONG_LINE, read_lines, stream_quote
+from tests.data_setup import DonutsTestDataMixin
+
+
+def ndjson(items):
+    """ Encode cart line items as an NDJSON body"""
+    return b''.join(json.dumps(item).encode('utf-8') + b'\n' for item in items)
+
+
+class CartLines(io.RawIOBase):
+    """ Binary stream generating an NDJSON cart of `count` lines as it is read"""
+
+    def __init__(self, count):
+        super().__init__()
+        self.lines = (json.dumps({'donut_code': 'THE_HOMER', 'quantity': line % 9 + 1}
+                                 ).encode('utf-8') + b'\n' for line in range(count))
+
+    def readable(self):
+        return True
+
+    def readline(self, size=-1):  # pylint: disable=unused-argument
+        return next(self.lines, b'')
+
+
+class QuoteStreamTests(DonutsTestDataMixin, TestCase):
+    """ Class for testing the NDJSON streaming quote"""
+
+    def setUp(self):
+        self.url_stream = 'dronut_app:donuts-quotes-stream'
+        super().setUp()
+
+    def post_stream(self, body):
+        """ Post an NDJSON body, returns the parsed NDJSON response lines"""
+        response = self.client.post(reverse(self.url_stream), data=body,
+                                    content_type='application/x-ndjson')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        return [json.loads(line) for line in
+                b''.join(response.streaming_content).decode('utf-8').splitlines()]
+
+    def test_stream_quote(self):
+        """
+        quotes_stream: Test to verify a streamed cart is priced line by line with its total
+        """
+        lines = self.post_stream(ndjson([{'donut_code': 'THE_HOMER', 'quantity': 3},
+                                         {'donut_code': 'THE_MARGIE', 'quantity': 10}]))
+        self.assertEqual(lines, [
+            {'line': 0, 'donut_code': 'THE_HOMER', 'line_value': '25.50'},
+            {'line': 1, 'donut_code': 'THE_MARGIE', 'line_value': '105.00'},
+            {'quote_total': '130.50', 'lines': 2, 'errors': 0},
+        ])
+        self.assertEqual(self.post_stream(b''), [{'quote_total': '0', 'lines': 0, 'errors': 0}])
+        response = self.client.get(reverse(self.url_stream))
+        self.assertEqual(response.status_code, 405)
+
+    def test_stream_quote_line_errors(self):
+        """
+        quotes_stream: Test to verify bad lines are reported in place and blank lines skipped
+        """
+        body = (b'{"donut_code": "THE_HOMER", "quantity": 1}\n\n{"donut_code": \n'
+                b'{"donut_code": "THE_BART", "quantity": 1}\n[1]\n'
+                b'{"donut_code": "THE_MARGIE", "quantity": 0}')
+        lines = self.post_stream(body)
+        self.assertEqual([line.get('error') for line in lines[:-1]],
+                         [None, ERROR_BAD_JSON, ERROR_UNKNOWN_CODE, ERROR_BAD_LINE,
+                          ERROR_BAD_QUANTITY])
+        self.assertEqual([line['line'] for line in lines[:-1]], [0, 1, 2, 3, 4])
+        self.assertEqual(lines[-1], {'quote_total': '8.50', 'lines': 5, 'errors': 4})
+
+    def test_stream_quote_chunks(self):
+        """
+        stream_quote: Test to verify each chunk is priced with one query and matches quote
+        """
+        cart = [{'donut_code': code, 'quantity': line + 1}
+                for line, code in enumerate(['THE_HOMER', 'THE_MARGIE', 'THE_BART'] * 3)]
+        pricing_engine = PricingEngine()
+        with self.assertNumQueries(3):
+            chunks = list(stream_quote(pricing_engine, io.BytesIO(ndjson(cart)), chunk_size=4))
+        self.assertEqual(len(chunks), 4)
+        lines = [json.loads(line) for line in b''.join(chunks).splitlines()]
+        quote = pricing_engine.quote(cart)
+        self.assertEqual([Decimal(line['line_value']) for line in lines if 'line_value' in line],
+                         [item['line_value'] for item in quote['quote_line_item']])
+        self.assertEqual(lines[-1]['quote_total'], str(quote['quote_total']))
+
+    def test_stream_quote_bounded_memory(self):
+        """
+        stream_quote: Test to verify memory does not grow with the number of cart lines
+        """
+        peaks = []
+        for count in (1000, 10000):
+            tracemalloc.start()
+            for _ in stream_quote(PricingEngine(), CartLines(count), chunk_size=500):
+                pass
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        self.assertLess(peaks[1], peaks[0] * 1.5)
+
+    def test_read_lines_too_long(self):
+        """
+        read_lines: Test to verify an over long line is dropped without being buffered
+        """
+        stream = io.BytesIO(b'{"a": 1}\n' + b'x' * 100 + b'\n\n{"b": 2}')
+        self.assertEqual(list(read_lines(stream, max_line=16)), [b'{"a": 1}\n', None, b'{"b": 2}'])
+        self.assertEqual(list(stream_quote(PricingEngine(), io.BytesIO(b'x' * 70000)))[0],
+                         json.dumps({'line': 0, 'donut_code': None,
+                                     'error': ERROR_LONG_LINE}).encode('utf-8') + b'\n')
@@ -0,0 +1,64 @@
+""" Async view test cases for Dronut App"""
+import json
+from django.test import TestCase
+from django.urls import reverse
+from tests.data_setup import DonutsTestDataMixin
+
+
+class AsyncDonutViewsTests(DonutsTestDataMixin, TestCase):
+    """ Class for testing the native async donut views"""
+
+    def setUp(self):
+        self.url_list = 'dronut_app:donuts-list-async'
+        self.url_quotes = 'dronut_app:donuts-quotes-async'
+        self.url_detail = 'dronut_app:donuts-detail-async'
+        super().setUp()
+
+    async def test_get_donut_quote(self):
+        """
+        quotes_async: Test to verify the async quote matches the DRF quote response
+        """
+        data = {"donuts": [{"donut_code": "THE_HOMER", "quantity": 3},
+                           {"donut_code": "THE_MARGIE", "quantity": 10},
+                           {"donut_code": "THE_BART", "quantity": 1}]}
+        response = await self.async_client.post(reverse(self.url_quotes), data=data,
+                                                content_type='application/json')
+        drf_response = await self.async_client.post(reverse('dronut_app:donuts-quotes'),
+                                                    data=data, content_type='application/json')
+        self.assertEqual(response.json()['quote_total'], 130.5)
+        self.assertEqual(response.json(), drf_response.json())
+
+    async def test_get_donut_quote_error(self):
+        """
+        quotes_async: Test to verify the async quote reports errors and rejects GET
+        """
+        response = await self.async_client.post(reverse(self.url_quotes), data={},
+                                                content_type='application/json')
+        self.assertEqual(response.json()['info'], 'Error encountered')
+        response = await self.async_client.get(reverse(self.url_quotes))
+        self.assertEqual(response.status_code, 405)
+
+    async def test_get_donut_information(self):
+        """
+        donut_detail_async: Test to verify the async detail view and its 404
+        """
+        response = await self.async_client.get(reverse(self.url_detail,
+                                                       kwargs={'pk': self.donut_objs[1].id}))
+        self.assertEqual(response.json()['donut_code'], 'THE_MARGIE')
+        self.assertEqual(response.json()['price_per_unit'], '10.50')
+        response = await self.async_client.get(reverse(self.url_detail, kwargs={'pk': 'nope'}))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_retrieve_donuts_list(self):
+        """
+        donut_list_async: Test to verify the async list is paged by donut code
+        """
+        response = await self.async_client.get(reverse(self.url_list) + '?page_size=1')
+        self.assertEqual([donut['donut_code'] for donut in response.json()['results']],
+                         ['THE_HOMER'])
+        response = await self.async_client.get(response.json()['next'])
+        self.assertEqual([donut['donut_code'] for donut in response.json()['results']],
+                         ['THE_MARGIE'])
+        self.assertIsNone(response.json()['next'])
+        response = await self.async_client.get(reverse(self.url_list) + '?q=the_m')
+        self.assertEqual(json.loads(response.content)['results'][0]['donut_code'], 'THE_MARGIE')
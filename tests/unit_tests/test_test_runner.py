@@ -0,0 +1,61 @@
+""" Xunit test runner test cases"""
+import io
+import os
+import tempfile
+import unittest
+from xml.etree import ElementTree
+from django.test import SimpleTestCase
+from dronut.test_runner import XunitTestResult
+
+
+def sample_tests():
+    """ Tests with every outcome, built here so the test discovery does not run them"""
+
+    class SampleTests(unittest.TestCase):
+        """ Sample test case"""
+
+        def test_success(self):
+            """ passes"""
+
+        def test_failure(self):
+            """ fails"""
+            self.assertEqual(1, 2)
+
+        def test_error(self):
+            """ errors"""
+            raise ValueError('boom')
+
+        def test_skip(self):
+            """ is skipped"""
+            self.skipTest('not today')
+
+    return SampleTests
+
+
+class XunitTestResultTests(SimpleTestCase):
+    """ Class for testing the xunit report of the test runner"""
+
+    def test_xunit_report(self):
+        """
+        XunitTestResult: Test to verify every outcome is written like the nose xunit report
+        """
+        sample_case = sample_tests()
+        suite = unittest.defaultTestLoader.loadTestsFromTestCase(sample_case)
+        runner = unittest.TextTestRunner(stream=io.StringIO(), resultclass=XunitTestResult)
+        result = runner.run(suite)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'xunittest.xml')
+            result.write_xunit(path)
+            testsuite = ElementTree.parse(path).getroot()
+        self.assertEqual(testsuite.attrib, {'name': 'nosetests', 'tests': '4', 'errors': '1',
+                                            'failures': '1', 'skip': '1'})
+        outcomes = {case.get('name'): [(child.tag, child.get('message')) for child in case]
+                    for case in testsuite}
+        self.assertEqual(outcomes, {
+            'test_error': [('error', 'ValueError: boom')],
+            'test_failure': [('failure', 'AssertionError: 1 != 2')],
+            'test_skip': [('skipped', 'not today')],
+            'test_success': [],
+        })
+        self.assertEqual({case.get('classname') for case in testsuite},
+                         {f'{__name__}.sample_tests.<locals>.SampleTests'})
@@ -0,0 +1,85 @@
+""" Coverage XML report test cases"""
+import glob
+import io
+import os
+import re
+import tempfile
+from django.test import SimpleTestCase
+import coverage
+from xmlreporter import AnalysisCache, StreamingXmlReporter, XmlReporter, get_analysis_to_report
+
+
+class StreamingXmlReporterTests(SimpleTestCase):
+    """ Class for testing the streaming Cobertura writer against the DOM writer"""
+
+    def setUp(self):
+        self.files = [os.path.abspath(path)
+                      for path in sorted(glob.glob('dronut_app/**/*.py', recursive=True))]
+        super().setUp()
+
+    def assert_same_report(self, cov, files):
+        """ Report with both writers, compare everything but the timestamps"""
+        reports = []
+        for reporter_class in (XmlReporter, StreamingXmlReporter):
+            outfile = io.StringIO()
+            percent = reporter_class(cov).report(files, outfile=outfile)
+            reports.append((percent, re.sub(r'timestamp="\d+"', '', outfile.getvalue())))
+        self.assertEqual(reports[0], reports[1])
+        return reports[1][1]
+
+    def test_line_coverage_report(self):
+        """
+        StreamingXmlReporter: Test to verify a line coverage report matches the DOM writer
+        """
+        cov = coverage.Coverage(data_file=None, source=['dronut_app'])
+        cov.get_data().add_lines({path: [1, 2, 3, 5, 8] for path in self.files})
+        report = self.assert_same_report(cov, self.files)
+        self.assertIn('<package name="dronut_app.management.commands"', report)
+
+    def test_branch_coverage_report(self):
+        """
+        StreamingXmlReporter: Test to verify a branch coverage report matches the DOM writer
+        """
+        cov = coverage.Coverage(data_file=None, branch=True)
+        cov.get_data().add_arcs({path: [(-1, 1), (1, 2), (2, -1)] for path in self.files})
+        report = self.assert_same_report(cov, self.files)
+        self.assertIn('branch="true"', report)
+
+    def test_empty_report(self):
+        """
+        StreamingXmlReporter: Test to verify a report without files matches the DOM writer
+        """
+        cov = coverage.Coverage(data_file=None)
+        cov.get_data()
+        report = self.assert_same_report(cov, [])
+        self.assertIn('<packages/>', report)
+
+    def test_parallel_cached_analysis(self):
+        """
+        get_analysis_to_report: Test to verify pooled and cached analyses give the same report
+        """
+        cov = coverage.Coverage(data_file=None, branch=True)
+        cov.get_data().add_arcs({path: [(-1, 1), (1, 2), (2, -1)] for path in self.files})
+        expected = self.assert_same_report(cov, self.files)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            for jobs in (2, 1):
+                outfile = io.StringIO()
+                StreamingXmlReporter(cov, jobs=jobs, cache_dir=cache_dir).report(
+                    self.files, outfile=outfile)
+                self.assertEqual(re.sub(r'timestamp="\d+"', '', outfile.getvalue()), expected)
+
+    def test_analysis_cache_reuse(self):
+        """
+        AnalysisCache: Test to verify only files whose measured data changed are analyzed again
+        """
+        cov = coverage.Coverage(data_file=None)
+        cov.get_data().add_lines({path: [1, 2] for path in self.files})
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = AnalysisCache(cache_dir)
+            first = list(get_analysis_to_report(cov, self.files, cache=cache))
+            cache = AnalysisCache(cache_dir)
+            cov.get_data().add_lines({self.files[-1]: [3]})
+            second = list(get_analysis_to_report(cov, self.files, cache=cache))
+        self.assertEqual((cache.hits, cache.misses), (len(self.files) - 1, 1))
+        self.assertEqual([analysis.statements for _, analysis in first],
+                         [analysis.statements for _, analysis in second])
@@ -4,15 +4,28 @@
 
 """XML reporting for coverage.py"""
 
+import hashlib
+import io
+import json
+import multiprocessing
 import os
 import os.path
 import sys
+import tempfile
 import time
+from concurrent.futures import ProcessPoolExecutor
 import defusedxml.minidom
 
+from coverage import Coverage
 from coverage.misc import isolate_module
+from coverage.python import PythonFileReporter
+from coverage.version import __version__ as coverage_version
 from django.utils.module_loading import import_string
 
+INDENT = "\t"
+NEWLINE = "\n"
+# bump when AnalysisSummary or analysis_key change, to ignore older cache entries
+ANALYSIS_CACHE_VERSION = 1
 DTD_URL = 'https://raw.githubusercontent.com/cobertura/web/master/htdocs/xml/coverage-04.dtd'
 
 def abs_file(path):
@@ -48,25 +61,32 @@ def canonical_filename(filename):
 
 MAX_FLAT = 200
 
-def get_analysis_to_report(coverage, morfs):
+def get_analysis_to_report(coverage, morfs, jobs=1, cache=None):
     """Get the files to report on.
     For each morf in `morfs`, if it should be reported on (based on the omit
     and include configuration options), yield a pair, the `FileReporter` and
     `Analysis` for the morf.
+
+    With more than one of `jobs`, or an `AnalysisCache` as `cache`, Python
+    files are analyzed by `analyze_files` and an `AnalysisSummary` is yielded
+    in place of the `Analysis`.
     """
-    file_reporters = coverage._get_file_reporters(morfs)
-    config = coverage.config
+    file_reporters = sorted(coverage._get_file_reporters(morfs))
+    if jobs > 1 or cache is not None:
+        results = analyze_files(coverage, file_reporters, jobs, cache)
+    else:
+        results = ((fr, lambda fr=fr: coverage._analyze(fr)) for fr in file_reporters)
 
-    for fr in sorted(file_reporters):
+    for fr, get_analysis in results:
         try:
-            analysis = coverage._analyze(fr)
+            analysis = get_analysis()
         except Exception:
             # Only report errors for .py files, and only if we didn't
             # explicitly suppress those errors.
             # NotPython is only raised by PythonFileReporter, which has a
             # should_be_python() method.
             if fr.should_be_python():
-                if config.ignore_errors:
+                if coverage.config.ignore_errors:
                     msg = "Couldn't parse Python file '{}'".format(fr.filename)
                     coverage._warn(msg, slug="couldnt-parse")
                 else:
@@ -75,6 +95,191 @@ def get_analysis_to_report(coverage, morfs):
             yield (fr, analysis)
 
 
+class AnalysisSummary:
+    """The parts of an `Analysis` that the XML report reads.
+
+    Unlike an `Analysis` it holds no file reporter or coverage data, so it can
+    be sent back from a worker process and stored in an `AnalysisCache`.
+    """
+
+    def __init__(self, statements, missing, branch_stats, missing_branch_arcs):
+        self.statements = set(statements)
+        self.missing = set(missing)
+        self._branch_stats = branch_stats
+        self._missing_branch_arcs = missing_branch_arcs
+
+    @classmethod
+    def from_analysis(cls, analysis):
+        """Summarize an `Analysis`."""
+        return cls(analysis.statements, analysis.missing,
+                   analysis.branch_stats(), analysis.missing_branch_arcs())
+
+    @classmethod
+    def from_json(cls, data):
+        """Rebuild a summary from `to_json` data."""
+        return cls(data["statements"], data["missing"],
+                   dict((int(line), tuple(stats)) for line, stats in data["branch_stats"]),
+                   dict((int(line), arcs) for line, arcs in data["missing_branch_arcs"]))
+
+    def to_json(self):
+        """Return the summary as JSON serializable data."""
+        return {
+            "statements": sorted(self.statements),
+            "missing": sorted(self.missing),
+            "branch_stats": sorted(self._branch_stats.items()),
+            "missing_branch_arcs": sorted(self._missing_branch_arcs.items()),
+        }
+
+    def branch_stats(self):
+        """Return a dict of line -> (total branches, taken branches)."""
+        return self._branch_stats
+
+    def missing_branch_arcs(self):
+        """Return a dict of line -> list of branch destinations not taken."""
+        return self._missing_branch_arcs
+
+
+class AnalysisCache:
+    """An on-disk cache of `AnalysisSummary` objects, one JSON file per key.
+
+    Keys are made by `analysis_key` from a file's source and its measured data,
+    so an entry is reused for as long as neither changes.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.used = set()
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, key):
+        """Return the file name of an entry."""
+        return os.path.join(self.directory, key + ".json")
+
+    def get(self, key):
+        """Return the summary stored under `key`, or None."""
+        self.used.add(key)
+        try:
+            with open(self.path(key), encoding="utf-8") as entry:
+                summary = AnalysisSummary.from_json(json.load(entry))
+        except (OSError, ValueError, KeyError, TypeError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return summary
+
+    def put(self, key, summary):
+        """Store a summary under `key`, replacing the entry atomically."""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(key)
+        with open(path + ".tmp", "w", encoding="utf-8") as entry:
+            json.dump(summary.to_json(), entry)
+        os.replace(path + ".tmp", path)
+
+    def prune(self):
+        """Delete the entries that were not looked up since the cache was created."""
+        if not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            if name.endswith(".json") and name[:-len(".json")] not in self.used:
+                os.remove(os.path.join(self.directory, name))
+
+
+def analysis_key(coverage, fr, has_arcs):
+    """Return the cache key of a file's analysis.
+    It covers everything the analysis depends on: the source, the measured
+    lines or arcs, and the settings that change which lines count.
+    """
+    data = coverage.get_data()
+    measured = data.arcs(fr.filename) if has_arcs else data.lines(fr.filename)
+    config = coverage.config
+    digest = hashlib.sha256()
+    for part in (ANALYSIS_CACHE_VERSION, coverage_version, has_arcs, config.exclude_list,
+                 config.partial_list, config.partial_always_list, sorted(measured or [])):
+        digest.update(repr(part).encode("utf-8"))
+        digest.update(b"\0")
+    digest.update(fr.source().encode("utf-8"))
+    return digest.hexdigest()
+
+
+def analysis_task(coverage, fr, has_arcs):
+    """Return the arguments of `analyze_in_worker` for one file."""
+    data = coverage.get_data()
+    measured = data.arcs(fr.filename) if has_arcs else data.lines(fr.filename)
+    config = coverage.config
+    return (fr.filename, has_arcs, measured or [],
+            (config.exclude_list, config.partial_list, config.partial_always_list))
+
+
+def analyze_in_worker(filename, has_arcs, measured, exclusions):
+    """Analyze one file in a worker process, with its own `Coverage` object."""
+    worker_coverage = Coverage(data_file=None, branch=has_arcs, config_file=False)
+    for option, value in zip(("report:exclude_lines", "report:partial_branches",
+                              "report:partial_branches_always"), exclusions):
+        worker_coverage.set_option(option, value)
+    data = worker_coverage.get_data()
+    if has_arcs:
+        data.add_arcs({filename: measured})
+    else:
+        data.add_lines({filename: measured})
+    return AnalysisSummary.from_analysis(worker_coverage._analyze(filename))
+
+
+def analyze_files(coverage, file_reporters, jobs, cache):
+    """Analyze `file_reporters`, reusing cached analyses and fanning the others
+    out over a pool of `jobs` processes.
+    Yields pairs of the `FileReporter` and a callable returning its
+    `AnalysisSummary`, in the order of `file_reporters`.
+    """
+    has_arcs = coverage.get_data().has_arcs()
+    pending = []
+    for fr in file_reporters:
+        # plugin file reporters may not work in a fresh Coverage, keep them here
+        if not isinstance(fr, PythonFileReporter):
+            pending.append((fr, None, None))
+            continue
+        key = analysis_key(coverage, fr, has_arcs) if cache is not None else None
+        summary = cache.get(key) if cache is not None else None
+        pending.append((fr, key, summary))
+
+    misses = [fr for fr, _, summary in pending
+              if summary is None and isinstance(fr, PythonFileReporter)]
+    futures = {}
+    executor = None
+    # daemonic processes, like the workers of a parallel test run, cannot start a pool
+    if jobs > 1 and len(misses) > 1 and not multiprocessing.current_process().daemon:
+        executor = ProcessPoolExecutor(max_workers=min(jobs, len(misses)))
+        for fr in misses:
+            futures[fr.filename] = executor.submit(analyze_in_worker,
+                                                   *analysis_task(coverage, fr, has_arcs))
+    try:
+        for fr, key, summary in pending:
+            if summary is not None:
+                yield fr, lambda summary=summary: summary
+            elif not isinstance(fr, PythonFileReporter):
+                yield fr, lambda fr=fr: coverage._analyze(fr)
+            else:
+                yield fr, lambda fr=fr, key=key: analyze_and_store(coverage, fr, key,
+                                                                   futures, cache)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+    if cache is not None:
+        cache.prune()
+
+
+def analyze_and_store(coverage, fr, key, futures, cache):
+    """Return the summary of a file missing from the cache, and cache it."""
+    future = futures.get(fr.filename)
+    if future is not None:
+        summary = future.result()
+    else:
+        summary = AnalysisSummary.from_analysis(coverage._analyze(fr))
+    if cache is not None:
+        cache.put(key, summary)
+    return summary
+
+
 def rate(hit, num):
     """Return the fraction of `hit`/`num`, as a string."""
     if num == 0:
@@ -86,9 +291,12 @@ def rate(hit, num):
 class XmlReporter(object):
     """A reporter for writing Cobertura-style XML coverage results."""
 
-    def __init__(self, coverage):
+    def __init__(self, coverage, jobs=1, cache_dir=None):
+        """`jobs` processes analyze the files, analyses are cached in `cache_dir`."""
         self.coverage = coverage
         self.config = self.coverage.config
+        self.jobs = jobs
+        self.cache = AnalysisCache(cache_dir) if cache_dir else None
 
         self.source_paths = set()
         if self.config.source:
@@ -108,60 +316,81 @@ class XmlReporter(object):
         has_arcs = self.coverage.get_data().has_arcs()
 
         # Create the DOM that will store the data.
-        impl = import_string(defusedxml.minidom.__origin__).getDOMImplementation()
-        self.xml_out = impl.createDocument(None, "coverage", None)
-
-        # Write header stuff.
-        xcoverage = self.xml_out.documentElement
-        xcoverage.setAttribute("version", "1.0")
-        xcoverage.setAttribute("timestamp", str(int(time.time()*1000)))
-        xcoverage.appendChild(self.xml_out.createComment(" Based on %s " % DTD_URL))
+        xcoverage = self.xml_coverage()
 
         # Call xml_file for each file in the data.
-        for fr, analysis in get_analysis_to_report(self.coverage, morfs):
+        for fr, analysis in get_analysis_to_report(self.coverage, morfs, self.jobs,
+                                                   self.cache):
             self.xml_file(fr, analysis, has_arcs)
 
-        xsources = self.xml_out.createElement("sources")
-        xcoverage.appendChild(xsources)
-
         # Populate the XML DOM with the source info.
-        for path in sorted(self.source_paths):
-            rel_dir = os.path.normcase(os.path.abspath(os.curdir) + os.sep)
-            rel_name = path[len(rel_dir):]
-            xsource = self.xml_out.createElement("source")
-            xsources.appendChild(xsource)
-            txt = self.xml_out.createTextNode('./' + rel_name)
-            xsource.appendChild(txt)
+        xcoverage.appendChild(self.xml_sources())
 
-        lnum_tot, lhits_tot = 0, 0
-        bnum_tot, bhits_tot = 0, 0
+        totals = [0, 0, 0, 0]
 
         xpackages = self.xml_out.createElement("packages")
         xcoverage.appendChild(xpackages)
 
         # Populate the XML DOM with the package info.
         for pkg_name, pkg_data in sorted(self.packages.items()):
-            class_elts, lhits, lnum, bhits, bnum = pkg_data
-            xpackage = self.xml_out.createElement("package")
+            class_elts = pkg_data[0]
+            xpackage = self.xml_package(pkg_name, pkg_data, has_arcs)
             xpackages.appendChild(xpackage)
             xclasses = self.xml_out.createElement("classes")
             xpackage.appendChild(xclasses)
             for _, class_elt in sorted(class_elts.items()):
                 xclasses.appendChild(class_elt)
-            xpackage.setAttribute("name", pkg_name.replace(os.sep, '.'))
-            xpackage.setAttribute("line-rate", rate(lhits, lnum))
-            if has_arcs:
-                branch_rate = rate(bhits, bnum)
-            else:
-                branch_rate = "0"
-            xpackage.setAttribute("branch-rate", branch_rate)
-            xpackage.setAttribute("complexity", "0")
+            add_totals(totals, pkg_data)
+
+        self.set_totals(xcoverage, totals, has_arcs)
+
+        # Write the output file.
+        outfile.write(serialize_xml(self.xml_out))
 
-            lnum_tot += lnum
-            lhits_tot += lhits
-            bnum_tot += bnum
-            bhits_tot += bhits
+        # Return the total percentage.
+        return percent(totals)
+
+    def xml_coverage(self):
+        """Create the document and its 'coverage' element with the header stuff."""
+        impl = import_string(defusedxml.minidom.__origin__).getDOMImplementation()
+        self.xml_out = impl.createDocument(None, "coverage", None)
+
+        xcoverage = self.xml_out.documentElement
+        xcoverage.setAttribute("version", "1.0")
+        xcoverage.setAttribute("timestamp", str(int(time.time()*1000)))
+        xcoverage.appendChild(self.xml_out.createComment(" Based on %s " % DTD_URL))
+        return xcoverage
 
+    def xml_sources(self):
+        """Create the 'sources' element."""
+        xsources = self.xml_out.createElement("sources")
+        for path in sorted(self.source_paths):
+            rel_dir = os.path.normcase(os.path.abspath(os.curdir) + os.sep)
+            rel_name = path[len(rel_dir):]
+            xsource = self.xml_out.createElement("source")
+            xsources.appendChild(xsource)
+            txt = self.xml_out.createTextNode('./' + rel_name)
+            xsource.appendChild(txt)
+        return xsources
+
+    def xml_package(self, pkg_name, pkg_data, has_arcs):
+        """Create a 'package' element with its statistics, but no classes."""
+        _, lhits, lnum, bhits, bnum = pkg_data
+        xpackage = self.xml_out.createElement("package")
+        xpackage.setAttribute("name", pkg_name.replace(os.sep, '.'))
+        xpackage.setAttribute("line-rate", rate(lhits, lnum))
+        if has_arcs:
+            branch_rate = rate(bhits, bnum)
+        else:
+            branch_rate = "0"
+        xpackage.setAttribute("branch-rate", branch_rate)
+        xpackage.setAttribute("complexity", "0")
+        return xpackage
+
+    @staticmethod
+    def set_totals(xcoverage, totals, has_arcs):
+        """Set the statistics of the whole report on the 'coverage' element."""
+        lhits_tot, lnum_tot, bhits_tot, bnum_tot = totals
         xcoverage.setAttribute("lines-valid", str(lnum_tot))
         xcoverage.setAttribute("lines-covered", str(lhits_tot))
         xcoverage.setAttribute("line-rate", rate(lhits_tot, lnum_tot))
@@ -175,16 +404,9 @@ class XmlReporter(object):
             xcoverage.setAttribute("branch-rate", "0")
         xcoverage.setAttribute("complexity", "0")
 
-        # Write the output file.
-        outfile.write(serialize_xml(self.xml_out))
-
-        # Return the total percentage.
-        denom = lnum_tot + bnum_tot
-        if denom == 0:
-            pct = 0.0
-        else:
-            pct = 100.0 * (lhits_tot + bhits_tot) / denom
-        return pct
+    def store_class(self, xclass):
+        """Keep a finished 'class' element until the packages are written."""
+        return xclass
 
     def xml_file(self, fr, analysis, has_arcs):
         """Add to the XML report for a single file."""
@@ -253,14 +475,126 @@ class XmlReporter(object):
             branch_rate = "0"
         xclass.setAttribute("branch-rate", branch_rate)
 
-        package[0][rel_name] = xclass
+        package[0][rel_name] = self.store_class(xclass)
         package[1] += class_hits
         package[2] += class_lines
         package[3] += class_br_hits
         package[4] += class_branches
 
 
+class StreamingXmlReporter(XmlReporter):
+    """A Cobertura XML reporter that never holds the whole document in memory.
+
+    Each file's 'class' element is serialized as soon as its analysis is
+    produced and spooled to a temporary file, only its offset is kept. The
+    'coverage' and 'package' statistics are known once every file has been
+    analyzed, so the document is then written by copying the classes from the
+    spool in package order. The output is identical to `XmlReporter`'s.
+    """
+
+    # indentation of the class elements in the pretty printed document
+    CLASS_INDENT = INDENT * 4
+
+    def __init__(self, coverage, jobs=1, cache_dir=None):
+        super(StreamingXmlReporter, self).__init__(coverage, jobs, cache_dir)
+        self.spool = None
+
+    def report(self, morfs, outfile=None):
+        """Generate a Cobertura-compatible XML report for `morfs`.
+        `morfs` is a list of modules or file names.
+        `outfile` is a file object to write the XML to.
+        """
+        outfile = outfile or sys.stdout
+        has_arcs = self.coverage.get_data().has_arcs()
+        xcoverage = self.xml_coverage()
+
+        with tempfile.TemporaryFile() as self.spool:
+            for fr, analysis in get_analysis_to_report(self.coverage, morfs, self.jobs,
+                                                       self.cache):
+                self.xml_file(fr, analysis, has_arcs)
+
+            totals = [0, 0, 0, 0]
+            for pkg_data in self.packages.values():
+                add_totals(totals, pkg_data)
+            self.set_totals(xcoverage, totals, has_arcs)
+
+            outfile.write(serialize_xml(self.xml_out.implementation.createDocument(
+                None, None, None)))
+            outfile.write(start_tag(xcoverage, ""))
+            for node in xcoverage.childNodes:
+                node.writexml(outfile, INDENT, INDENT, NEWLINE)
+            xsources = self.xml_sources()
+            xsources.writexml(outfile, INDENT, INDENT, NEWLINE)
+            xsources.unlink()
+
+            xpackages = self.xml_out.createElement("packages")
+            if not self.packages:
+                xpackages.writexml(outfile, INDENT, INDENT, NEWLINE)
+            else:
+                outfile.write(start_tag(xpackages, INDENT))
+                for pkg_name, pkg_data in sorted(self.packages.items()):
+                    self.write_package(outfile, pkg_name, pkg_data, has_arcs)
+                outfile.write(end_tag(xpackages, INDENT))
+            outfile.write(end_tag(xcoverage, ""))
+        self.spool = None
+
+        return percent(totals)
+
+    def write_package(self, outfile, pkg_name, pkg_data, has_arcs):
+        """Write a 'package' element, copying its classes from the spool."""
+        xpackage = self.xml_package(pkg_name, pkg_data, has_arcs)
+        xclasses = self.xml_out.createElement("classes")
+        outfile.write(start_tag(xpackage, INDENT * 2))
+        outfile.write(start_tag(xclasses, INDENT * 3))
+        for _, (offset, size) in sorted(pkg_data[0].items()):
+            self.spool.seek(offset)
+            outfile.write(self.spool.read(size).decode("utf-8"))
+        outfile.write(end_tag(xclasses, INDENT * 3))
+        outfile.write(end_tag(xpackage, INDENT * 2))
+
+    def store_class(self, xclass):
+        """Serialize a finished 'class' element to the spool, returns its location."""
+        out = io.StringIO()
+        xclass.writexml(out, self.CLASS_INDENT, INDENT, NEWLINE)
+        xclass.unlink()
+        data = out.getvalue().encode("utf-8")
+        self.spool.seek(0, os.SEEK_END)
+        offset = self.spool.tell()
+        self.spool.write(data)
+        return offset, len(data)
+
+
+def add_totals(totals, pkg_data):
+    """Add the line and branch counts of a package to `totals`."""
+    for index, count in enumerate(pkg_data[1:]):
+        totals[index] += count
+
+
+def percent(totals):
+    """Return the total percentage of lines and branches covered."""
+    lhits_tot, lnum_tot, bhits_tot, bnum_tot = totals
+    denom = lnum_tot + bnum_tot
+    if denom == 0:
+        pct = 0.0
+    else:
+        pct = 100.0 * (lhits_tot + bhits_tot) / denom
+    return pct
+
+
+def start_tag(element, indent):
+    """Serialize the start tag of `element` the way `toprettyxml` writes it."""
+    out = io.StringIO()
+    element.cloneNode(False).writexml(out, indent, INDENT, NEWLINE)
+    # a childless element is written as <name .../>, reopen it
+    return out.getvalue()[:-len("/>" + NEWLINE)] + ">" + NEWLINE
+
+
+def end_tag(element, indent):
+    """Serialize the end tag of `element` the way `toprettyxml` writes it."""
+    return "%s</%s>%s" % (indent, element.tagName, NEWLINE)
+
+
 def serialize_xml(dom):
     """Serialize a minidom node to XML."""
-    out = dom.toprettyxml()
+    out = dom.toprettyxml(indent=INDENT, newl=NEWLINE)
     return out